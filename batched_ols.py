@@ -0,0 +1,176 @@
+"""
+Batched ordinary least squares with classical and heteroskedasticity-robust
+standard errors.
+
+Many regressions (bootstrap replicates, leave-one-video-out fits, one fit per
+subset) are solved at once: the designs are stacked into a (B, n, p) array
+and each fit gets a (B, n) row weight. Weights are frequency weights, so
+
+  - a bootstrap replicate is the full design with its draw counts,
+  - leaving out video i is weight 0 on row i,
+  - designs of different sizes are padded to a common n with weight-0 rows
+    (see pad_designs).
+
+Each fit is one batched QR decomposition of sqrt(w) * X; the coefficient,
+covariance and leverage computations are then batched matrix products.
+Fits whose design is rank-deficient (e.g. a subset where a predictor is
+constant, or fewer rows than coefficients) are returned as NaN instead of
+raising; exact fits (no residual degrees of freedom) get NaN standard errors,
+as in statsmodels.
+
+Results follow the statsmodels OLS conventions (params, bse, tvalues,
+pvalues, rsquared, rsquared_adj, fvalue, f_pvalue, df_model, df_resid) for a
+model whose first column is the intercept.
+"""
+
+from typing import NamedTuple
+
+import numpy as np
+
+COV_TYPES = ("nonrobust", "HC0", "HC1", "HC2", "HC3")
+# Fits per QR batch, so memory stays bounded for large B × n
+CHUNK_FITS = 256
+
+
+class OLSResults(NamedTuple):
+    """Per-fit results; leading dimension B (one entry per fit)."""
+    params: np.ndarray        # (B, p)
+    bse: np.ndarray           # (B, p)
+    tvalues: np.ndarray       # (B, p)
+    pvalues: np.ndarray       # (B, p)
+    rsquared: np.ndarray      # (B,)
+    rsquared_adj: np.ndarray  # (B,)
+    fvalue: np.ndarray        # (B,)
+    f_pvalue: np.ndarray      # (B,)
+    df_model: int
+    df_resid: np.ndarray      # (B,)
+    nobs: np.ndarray          # (B,)
+
+
+def add_constant(X) -> np.ndarray:
+    """Prepend an intercept column to a (..., n, k) design."""
+    X = np.asarray(X, dtype=float)
+    return np.concatenate([np.ones(X.shape[:-1] + (1,)), X], axis=-1)
+
+
+def pad_designs(designs):
+    """
+    Stack (X, y) pairs with different numbers of rows into (B, n_max, p) and
+    (B, n_max) arrays plus (B, n_max) weights that are 0 on padding rows.
+    """
+    n_max = max(len(y) for _, y in designs)
+    p = np.asarray(designs[0][0]).shape[1]
+    X = np.zeros((len(designs), n_max, p))
+    y = np.zeros((len(designs), n_max))
+    weights = np.zeros((len(designs), n_max))
+    for b, (Xb, yb) in enumerate(designs):
+        X[b, :len(yb)] = Xb
+        y[b, :len(yb)] = yb
+        weights[b, :len(yb)] = 1.0
+    return X, y, weights
+
+
+def _fit_chunk(X, y, w, cov_type):
+    """Coefficients, covariance and fit statistics for one chunk of fits."""
+    n_fits, n, p = X.shape
+    if n < p:
+        # Fewer rows than coefficients: pad with weight-0 rows so R is square
+        # (and singular, so the fit is reported as NaN below)
+        X = np.concatenate([X, np.zeros((n_fits, p - n, p))], axis=1)
+        y = np.concatenate([y, np.zeros((n_fits, p - n))], axis=1)
+        w = np.concatenate([w, np.zeros((n_fits, p - n))], axis=1)
+    sw = np.sqrt(w)
+    Q, R = np.linalg.qr(X * sw[..., None])
+
+    # Rank-deficient fits: solve against the identity, report NaN
+    diag = np.abs(np.diagonal(R, axis1=-2, axis2=-1))
+    singular = (diag <= 1e-10 * diag.max(axis=-1, keepdims=True)).any(axis=-1)
+    R = np.where(singular[:, None, None], np.eye(p), R)
+
+    R_inv = np.linalg.solve(R, np.broadcast_to(np.eye(p), R.shape))
+    params = np.einsum("bij,bnj,bn->bi", R_inv, Q, y * sw)
+    xtx_inv = R_inv @ np.swapaxes(R_inv, -1, -2)
+
+    resid = y - np.einsum("bnp,bp->bn", X, params)
+    nobs = w.sum(axis=1)
+    df_resid = nobs - p
+    ssr = (w * resid ** 2).sum(axis=1)
+
+    # Exact fits (df_resid <= 0) and singular ones divide by zero here;
+    # their standard errors are reported as NaN below
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if cov_type == "nonrobust":
+            cov = xtx_inv * (ssr / df_resid)[:, None, None]
+        else:
+            # Leverage of a single copy of each row: x_i' (X'WX)^-1 x_i
+            h = np.einsum("bni,bij,bnj->bn", X, xtx_inv, X)
+            scale = w * resid ** 2
+            if cov_type == "HC1":
+                scale = scale * (nobs / df_resid)[:, None]
+            elif cov_type == "HC2":
+                scale = scale / (1 - h)
+            elif cov_type == "HC3":
+                scale = scale / (1 - h) ** 2
+            meat = np.einsum("bn,bni,bnj->bij", np.where(w > 0, scale, 0.0), X, X)
+            cov = xtx_inv @ meat @ xtx_inv
+        bse = np.sqrt(np.diagonal(cov, axis1=-2, axis2=-1))
+    bse = np.where((df_resid > 0)[:, None], bse, np.nan)
+
+    y_mean = (w * y).sum(axis=1) / nobs
+    tss = (w * (y - y_mean[:, None]) ** 2).sum(axis=1)
+
+    out = {
+        "params": params,
+        "bse": bse,
+        "ssr": ssr,
+        "tss": tss,
+        "df_resid": df_resid,
+        "nobs": nobs,
+    }
+    for key in ("params", "bse", "ssr", "tss"):
+        out[key] = np.where(singular.reshape((-1,) + (1,) * (out[key].ndim - 1)),
+                            np.nan, out[key])
+    return out
+
+
+def batched_ols(X, y, weights=None, cov_type="nonrobust",
+                chunk=CHUNK_FITS) -> OLSResults:
+    """
+    Fit B regressions at once.
+
+    X: (B, n, p) or shared (n, p) design, first column the intercept
+       (see add_constant); y: (B, n) or (n,); weights: (B, n) frequency
+       weights (0 = row not in the fit), default all 1.
+    cov_type: one of COV_TYPES ("nonrobust" matches statsmodels' default,
+       "HC3" is the usual small-sample robust choice).
+    """
+    from scipy import stats
+
+    if cov_type not in COV_TYPES:
+        raise ValueError(f"unknown cov_type {cov_type!r} (expected one of {COV_TYPES})")
+    X = np.asarray(X, dtype=float)
+    y = np.asarray(y, dtype=float)
+    if weights is None:
+        weights = np.ones(y.shape if y.ndim == 2 else (1,) + y.shape)
+    weights = np.asarray(weights, dtype=float)
+    n_fits, n = weights.shape
+    p = X.shape[-1]
+    X = np.broadcast_to(X, (n_fits, n, p))
+    y = np.broadcast_to(y, (n_fits, n))
+
+    parts = [_fit_chunk(X[s:s + chunk], y[s:s + chunk], weights[s:s + chunk], cov_type)
+             for s in range(0, n_fits, chunk)]
+    fit = {key: np.concatenate([part[key] for part in parts]) for key in parts[0]}
+
+    params, bse, df_resid = fit["params"], fit["bse"], fit["df_resid"]
+    df_model = p - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tvalues = params / bse
+        rsquared = 1 - fit["ssr"] / fit["tss"]
+        rsquared_adj = 1 - (1 - rsquared) * (fit["nobs"] - 1) / df_resid
+        fvalue = ((fit["tss"] - fit["ssr"]) / df_model) / (fit["ssr"] / df_resid)
+    pvalues = 2 * stats.t.sf(np.abs(tvalues), df_resid[:, None])
+    f_pvalue = stats.f.sf(fvalue, df_model, df_resid)
+
+    return OLSResults(params, bse, tvalues, pvalues, rsquared, rsquared_adj,
+                      fvalue, f_pvalue, df_model, df_resid, fit["nobs"])
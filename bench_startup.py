@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Startup benchmark for the CLI (cli.py).
+
+Runs each case in a fresh interpreter, best of --repeat wall-clock times, and
+records which modules it imported (python -X importtime). A case fails if it
+is slower than its budget or imports a module it should not need: --help must
+not load torch, whisperx, pyannote, Gemini or matplotlib, and a tables-only
+paper build must not load matplotlib.
+
+Usage:
+    python bench_startup.py
+    python bench_startup.py --data-dir results --budget 1.5 --repeat 5
+
+Exits non-zero if any case fails, so it can be used as a CI check.
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from cli import COMMANDS, ROOT
+
+CLI = ROOT / "cli.py"
+
+# Seconds, per case; generous enough for a cold laptop, tight enough to catch
+# a heavy import creeping back in (matplotlib alone costs ~0.5 s)
+HELP_BUDGET = 1.5
+TABLES_BUDGET = 6.0
+
+HEAVY_MODULES = ("torch", "whisperx", "pyannote", "google.generativeai",
+                 "matplotlib", "seaborn")
+PLOTTING_MODULES = ("matplotlib", "seaborn")
+
+
+def imported_modules(stderr: str) -> set:
+    """Module names from `python -X importtime` output."""
+    names = set()
+    for line in stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            name = line.rsplit("|", 1)[1].strip()
+            if name != "imported package":
+                names.add(name)
+    return names
+
+
+def run_case(args, repeat, cwd=ROOT):
+    """Best wall time over `repeat` runs and the modules imported by the last."""
+    best, modules = float("inf"), set()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-X", "importtime", str(CLI)] + args,
+                              cwd=cwd, capture_output=True, text=True)
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            tail = "\n".join(proc.stderr.splitlines()[-5:])
+            raise RuntimeError(f"cli.py {' '.join(args)} exited {proc.returncode}:\n{tail}")
+        best = min(best, elapsed)
+        modules = imported_modules(proc.stderr)
+    return best, modules
+
+
+def forbidden(modules, banned) -> list:
+    return sorted(m for m in modules
+                  if any(m == b or m.startswith(b + ".") for b in banned))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup time")
+    parser.add_argument("--data-dir", type=str, default=str(ROOT / "results"),
+                        help="Results CSVs for the tables-only case (skipped if missing)")
+    parser.add_argument("--budget", type=float, default=HELP_BUDGET,
+                        help="Seconds allowed for each --help case")
+    parser.add_argument("--tables-budget", type=float, default=TABLES_BUDGET,
+                        help="Seconds allowed for the tables-only paper build")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Runs per case (the best time is reported)")
+    args = parser.parse_args()
+
+    cases = [("--help", ["--help"], args.budget, HEAVY_MODULES)]
+    cases += [(f"{name} --help", [name, "--help"], args.budget, HEAVY_MODULES)
+              for name in COMMANDS]
+
+    tmp = tempfile.TemporaryDirectory()
+    if Path(args.data_dir).is_dir():
+        cases.append(("figures (tables only)",
+                      ["figures", "--data-dir", args.data_dir, "--output-dir", tmp.name,
+                       "--only", "table", "--force", "--no-data-cache"],
+                      args.tables_budget, PLOTTING_MODULES))
+    else:
+        print(f"No data in {args.data_dir}; skipping the tables-only case")
+
+    failures = 0
+    print(f"{'case':<26} {'time (s)':>9} {'budget':>7}  result")
+    for label, cli_args, budget, banned in cases:
+        elapsed, modules = run_case(cli_args, args.repeat)
+        problems = []
+        if elapsed > budget:
+            problems.append("over budget")
+        loaded = forbidden(modules, banned)
+        if loaded:
+            top = sorted({m.split(".")[0] for m in loaded})
+            problems.append(f"imports {', '.join(top)}")
+        failures += bool(problems)
+        print(f"{label:<26} {elapsed:>9.2f} {budget:>7.1f}  "
+              f"{'; '.join(problems) if problems else 'ok'}")
+    tmp.cleanup()
+
+    if failures:
+        print(f"\n{failures} case(s) failed")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
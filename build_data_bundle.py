@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Build precompressed, content-hashed JSON bundles of the survey app's data.
+
+server.js otherwise re-parses videos.csv on every /api/videos request and
+reads a narrative and a fact file per video shown. This turns survey-app/data
+into static assets under survey-app/bundles/:
+
+    manifest.json              the videos.csv rows (as /api/videos returns
+                               them), each with the name of its bundle
+    video_NN.<hash>.json       {"videoId", "narrative", "facts"} of one video
+    etags.json                 file name -> ETag, read by server.js (weak
+                               ETags: one per content, whatever the encoding)
+
+Every JSON file is written next to a .gz (and a .br when the brotli package is
+installed) copy, so server.js only picks the encoding the browser accepts and
+streams the file. Video bundles are named by the hash of their contents and
+served as immutable; the manifest keeps its name and is revalidated by ETag,
+so after a data change coders fetch the new manifest and only the bundles
+whose contents changed. The bundles of the previous build are kept until the
+next one, for pages that still hold the old manifest. Older bundles are
+deleted; other files in the output directory are never touched.
+
+Usage:
+    python build_data_bundle.py
+    python build_data_bundle.py --data-dir survey-app/data --output-dir survey-app/bundles
+"""
+
+import argparse
+import gzip
+import hashlib
+import importlib.util
+import json
+import re
+import time
+from pathlib import Path
+
+from corpus import split_facts, video_sources
+
+MANIFEST = "manifest.json"
+ETAGS = "etags.json"
+HASH_LENGTH = 16
+# Files this script writes; cleanup never touches anything else in the directory
+OWNED_FILE = re.compile(rf"(?:{re.escape(MANIFEST)}|[^.]+\.[0-9a-f]{{{HASH_LENGTH}}}\.json)"
+                        r"(?:\.gz|\.br)?(?:\.tmp)?")
+# Optional: .br copies are only written when brotli is installed
+HAVE_BROTLI = importlib.util.find_spec("brotli") is not None
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def encode(obj) -> bytes:
+    """Canonical JSON bytes (sorted keys, no whitespace), so equal data hashes equally."""
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True,
+                      separators=(",", ":")).encode("utf-8")
+
+
+def content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def _write_atomic(path: Path, data: bytes):
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    tmp.replace(path)
+
+
+def write_asset(output_dir: Path, name: str, data: bytes) -> list:
+    """
+    Write `name` and its compressed copies (skipped when the file with these
+    contents already exists); returns the file names written or kept.
+    """
+    names = [name, name + ".gz"] + ([name + ".br"] if HAVE_BROTLI else [])
+    path = output_dir / name
+    if all((output_dir / n).exists() for n in names) and path.read_bytes() == data:
+        return names
+    # mtime=0 keeps the .gz byte-identical across builds
+    _write_atomic(output_dir / (name + ".gz"), gzip.compress(data, compresslevel=9, mtime=0))
+    if HAVE_BROTLI:
+        import brotli
+        _write_atomic(output_dir / (name + ".br"), brotli.compress(data, quality=11))
+    _write_atomic(path, data)
+    return names
+
+
+def build_bundles(data_dir: Path, output_dir: Path) -> dict:
+    """Write all bundles, the manifest and the ETag table; returns build statistics."""
+    videos, narratives, facts, meta = video_sources(
+        data_dir / "Narratives", data_dir / "Atomic Facts", data_dir / "videos.csv")
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    etags, files = {}, []
+    rows = []
+    for number in videos:
+        if number not in meta:
+            continue  # the app only lists the videos in videos.csv
+        row = dict(meta[number])
+        video_id = row["VideoID"].strip()
+        narrative = (narratives[number].read_text(encoding="utf-8-sig")
+                     if number in narratives else None)
+        fact_list = (split_facts(facts[number].read_text(encoding="utf-8-sig"))
+                     if number in facts else None)
+        data = encode({"videoId": video_id, "narrative": narrative, "facts": fact_list})
+        digest = content_hash(data)
+        name = f"{video_id}.{digest}.json"
+        files += write_asset(output_dir, name, data)
+        etags[name] = f'W/"{digest}"'
+        rows.append({**row, "bundle": name})
+
+    manifest = encode({"version": content_hash(encode(rows)), "videos": rows})
+    files += write_asset(output_dir, MANIFEST, manifest)
+    etags[MANIFEST] = f'W/"{content_hash(manifest)}"'
+
+    # Keep the previous build's bundles for pages still holding its manifest
+    previous = {}
+    if (output_dir / ETAGS).exists():
+        try:
+            previous = json.loads((output_dir / ETAGS).read_text())
+        except (OSError, json.JSONDecodeError):
+            previous = {}
+    # (an unchanged rebuild keeps the generation before it)
+    if previous.get("current") != etags:
+        previous = {"previous": previous.get("current", {})}
+    kept = {name: etag for name, etag in previous.get("previous", {}).items()
+            if name not in etags and (output_dir / name).exists()}
+    _write_atomic(output_dir / ETAGS, encode({"current": etags, "previous": kept}) + b"\n")
+
+    live = set(files) | {ETAGS}
+    live |= {f"{name}{ext}" for name in kept for ext in ("", ".gz", ".br")}
+    removed = 0
+    for path in output_dir.iterdir():
+        if path.is_file() and path.name not in live and OWNED_FILE.fullmatch(path.name):
+            path.unlink()
+            removed += 1
+
+    return {
+        "videos": len(rows),
+        "bytes": sum((output_dir / n).stat().st_size for n in files if n.endswith(".json")),
+        "gzip_bytes": sum((output_dir / n).stat().st_size for n in files if n.endswith(".gz")),
+        "removed": removed,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Build precompressed, content-hashed JSON bundles of the survey data."
+    )
+    parser.add_argument("--data-dir", type=str, default=None,
+                        help="survey-app data directory (default: survey-app/data/)")
+    parser.add_argument("--output-dir", type=str, default=None,
+                        help="Where to write the bundles (default: survey-app/bundles/, "
+                             "served by server.js)")
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir) if args.data_dir else (_SCRIPT_DIR / "survey-app" / "data")
+    output_dir = (Path(args.output_dir) if args.output_dir
+                  else _SCRIPT_DIR / "survey-app" / "bundles")
+
+    start = time.perf_counter()
+    stats = build_bundles(data_dir, output_dir)
+    print(f"Bundled {stats['videos']} videos into {output_dir}: "
+          f"{stats['bytes'] / 1024:.0f} KiB JSON, {stats['gzip_bytes'] / 1024:.0f} KiB gzip"
+          + ("" if HAVE_BROTLI else " (brotli not installed, no .br copies)")
+          + (f", {stats['removed']} stale files removed" if stats["removed"] else "")
+          + f" in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the pipeline scripts.
+
+Each subcommand runs one script as if it had been invoked directly, with the
+remaining arguments passed through, so `python cli.py figures --only "tab*"`
+is the same as `python generate_paper_figures.py --only "tab*"`. Only the
+standard library is imported here; each script imports its own heavy
+dependencies (torch, whisperx, matplotlib, ...) lazily, in the code paths that
+need them, so `--help` and tables-only runs start quickly (see
+bench_startup.py).
+
+Usage:
+    python cli.py --help
+    python cli.py rediarize --videos 2 5 8
+    python cli.py compare --pairwise
+    python cli.py figures --data-dir results --jobs 4
+"""
+
+import runpy
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent
+ABLATION = ROOT / "diarization-ablation"
+
+# name -> (script, one-line help)
+COMMANDS = {
+    "rediarize": (ABLATION / "01_rediarize.py",
+                  "Re-run ASR + diarization with each pyannote model"),
+    "regenerate": (ABLATION / "02_regenerate_narratives.py",
+                   "Regenerate narratives and atomic facts from the new transcripts"),
+    "compare": (ABLATION / "03_compare_diarization.py",
+                "Compare diarization quality across models"),
+    "analyze": (ABLATION / "04_analyze_results.py",
+                "Speaker swaps, narrative/fact diffs, power and accuracy analysis"),
+    "features": (ABLATION / "05_extract_features.py",
+                 "Extract transcript features per video and model"),
+    "corpus": (ROOT / "corpus.py",
+               "Pack the narratives, atomic facts and videos.csv into one indexed file"),
+    "bundle": (ROOT / "build_data_bundle.py",
+               "Build the survey app's precompressed data bundles"),
+    "ingest": (ROOT / "ingest_responses.py",
+               "Ingest survey-app coder responses into the label tables"),
+    "ground": (ABLATION / "06_ground_facts.py",
+               "Ground atomic facts in transcript segments (BM25 top-k)"),
+    "dedupe": (ABLATION / "07_dedupe_facts.py",
+               "Cluster near-duplicate atomic facts across videos and models (MinHash LSH)"),
+    "scores": (ROOT / "derive_scores.py",
+               "Derive per-video scores from the raw fact and Likert labels"),
+    "figures": (ROOT / "generate_paper_figures.py",
+                "Generate the paper figures and LaTeX tables"),
+}
+
+
+def usage() -> str:
+    width = max(map(len, COMMANDS))
+    lines = [f"usage: {Path(sys.argv[0]).name} <command> [args ...]", "", "commands:"]
+    lines += [f"  {name:<{width}}  {help_}" for name, (_, help_) in COMMANDS.items()]
+    lines += ["", "Run '<command> --help' for the options of each command."]
+    return "\n".join(lines)
+
+
+def run(command: str, args: list) -> None:
+    """Run a command's script as __main__ with `args` as its argv."""
+    script, _ = COMMANDS[command]
+    # Scripts import their helper modules (config, paper_metrics, ...) from
+    # their own directory
+    sys.path.insert(0, str(script.parent))
+    sys.argv = [str(script)] + list(args)
+    runpy.run_path(str(script), run_name="__main__")
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if not argv or argv[0] in ("-h", "--help"):
+        print(usage())
+        return 0
+    if argv[0] not in COMMANDS:
+        print(f"unknown command {argv[0]!r}\n\n{usage()}", file=sys.stderr)
+        return 2
+    run(argv[0], argv[1:])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
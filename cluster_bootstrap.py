@@ -0,0 +1,165 @@
+"""
+Bootstrap confidence intervals for summary statistics, resampling videos.
+
+Facts are clustered within videos, so resampling facts independently
+understates the uncertainty; the resampling unit here is the video. Every
+statistic is written as a ratio of per-video sums,
+
+    theta = sum_v w_v * numerator_v / sum_v w_v * denominator_v,
+
+where w_v is how often video v is drawn. The mean over videos of a per-video
+rate is numerator = rate, denominator = 1; a rate pooled over facts is
+numerator = label count, denominator = facts coded. The per-video sums are
+computed once from the fact-level data, and all B resamples are then one
+(B × videos) @ (videos × statistics) product. A video with no value for a
+statistic has numerator = denominator = 0 and does not affect it.
+
+Two intervals are reported: the percentile interval and the BCa interval
+(bias-corrected and accelerated; the acceleration comes from the
+leave-one-video-out jackknife), which corrects for the skew of bounded rates
+near 0 or 1.
+"""
+
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+N_BOOTSTRAP = 2000
+CONFIDENCE = 0.95
+
+_NORMAL = NormalDist()
+
+
+def cluster_weights(n_clusters, n_resamples, rng=None) -> np.ndarray:
+    """(n_resamples × n_clusters) draw counts of a bootstrap over clusters."""
+    rng = np.random.default_rng(rng)
+    p = np.full(n_clusters, 1.0 / n_clusters)
+    return rng.multinomial(n_clusters, p, size=n_resamples).astype(float)
+
+
+def per_video_counts(codes, clusters, n_categories):
+    """
+    Label counts per cluster and coder from a units × coders code matrix
+    (-1 = not coded).
+
+    Returns (clusters, counts, coded): the cluster labels, a (V, C, K) array
+    of how many units coder c gave category k in cluster v, and the (V, C)
+    number of units coder c coded in cluster v.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    cluster_codes, labels = pd.factorize(np.asarray(clusters))
+    n_clusters, n_coders = len(labels), codes.shape[1]
+    counts = np.zeros((n_clusters, n_coders, n_categories))
+    for c in range(n_coders):
+        valid = codes[:, c] >= 0
+        flat = cluster_codes[valid] * n_categories + codes[valid, c]
+        counts[:, c] = np.bincount(flat, minlength=n_clusters * n_categories).reshape(
+            n_clusters, n_categories)
+    return labels, counts, counts.sum(axis=2)
+
+
+def mean_of_coders_rates(counts, coded) -> np.ndarray:
+    """(V, K) per-video rate of each category, averaged over the coders who
+    coded the video (NaN for a video nobody coded)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_coder = counts / coded[:, :, None]
+        return np.nanmean(np.where(coded[:, :, None] > 0, per_coder, np.nan), axis=1)
+
+
+# ===================================================================
+# RATIO STATISTICS
+# ===================================================================
+
+class RatioStatistics:
+    """
+    Statistics w @ numerators / w @ denominators over V clusters.
+
+    numerators, denominators: (V, k) per-cluster sums, one column per
+    statistic. NaN numerators (missing values) are treated as absent.
+    """
+
+    def __init__(self, numerators, denominators, names):
+        numerators = np.asarray(numerators, dtype=float)
+        denominators = np.broadcast_to(np.asarray(denominators, dtype=float),
+                                       numerators.shape)
+        present = ~np.isnan(numerators) & (denominators > 0)
+        self.numerators = np.where(present, numerators, 0.0)
+        self.denominators = np.where(present, denominators, 0.0)
+        self.present = present
+        self.names = list(names)
+
+    def estimates(self, weights=None) -> np.ndarray:
+        """Statistics for cluster weights ((V,) or (B, V); None = each once)."""
+        if weights is None:
+            weights = np.ones(len(self.numerators))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return (weights @ self.numerators) / (weights @ self.denominators)
+
+    def jackknife(self) -> np.ndarray:
+        """(V, k) leave-one-cluster-out estimates (NaN where the cluster has
+        no value for the statistic)."""
+        num = self.numerators.sum(axis=0) - self.numerators
+        den = self.denominators.sum(axis=0) - self.denominators
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(self.present, num / den, np.nan)
+
+
+def percentile_interval(boot, confidence=CONFIDENCE):
+    """Percentile interval of each column of a (B, k) bootstrap sample."""
+    tail = (1 - confidence) / 2
+    return tuple(np.nanquantile(boot, [tail, 1 - tail], axis=0))
+
+
+def bca_interval(boot, estimate, jackknife, confidence=CONFIDENCE):
+    """
+    BCa interval of each column: percentile levels shifted by the bias
+    correction z0 (share of bootstrap estimates below the point estimate)
+    and the jackknife acceleration a. NaN where z0 is infinite (every
+    resample on one side of the estimate).
+    """
+    tail = (1 - confidence) / 2
+    z = np.array([_NORMAL.inv_cdf(tail), _NORMAL.inv_cdf(1 - tail)])
+    lo, hi = np.full(len(estimate), np.nan), np.full(len(estimate), np.nan)
+
+    for j in range(len(estimate)):
+        samples = boot[:, j][~np.isnan(boot[:, j])]
+        jack = jackknife[:, j][~np.isnan(jackknife[:, j])]
+        if not len(samples) or np.isnan(estimate[j]):
+            continue
+        below = (np.mean(samples < estimate[j])
+                 + 0.5 * np.mean(samples == estimate[j]))
+        if not 0 < below < 1:
+            continue
+        z0 = _NORMAL.inv_cdf(below)
+
+        d = jack.mean() - jack
+        spread = (d ** 2).sum()
+        a = (d ** 3).sum() / (6 * spread ** 1.5) if spread > 0 else 0.0
+
+        levels = [_NORMAL.cdf(z0 + (z0 + zq) / (1 - a * (z0 + zq))) for zq in z]
+        lo[j], hi[j] = np.quantile(samples, levels)
+    return lo, hi
+
+
+def cluster_bootstrap(stats: RatioStatistics, n_resamples=N_BOOTSTRAP,
+                      confidence=CONFIDENCE, rng=0) -> pd.DataFrame:
+    """
+    Point estimate, percentile and BCa interval of every statistic.
+
+    Returns a DataFrame indexed by statistic name with columns estimate,
+    pct_low, pct_high, bca_low, bca_high and n_clusters (clusters with a
+    value for the statistic).
+    """
+    estimate = stats.estimates()
+    boot = stats.estimates(cluster_weights(len(stats.numerators), n_resamples, rng))
+    pct_low, pct_high = percentile_interval(boot, confidence)
+    bca_low, bca_high = bca_interval(boot, estimate, stats.jackknife(), confidence)
+    return pd.DataFrame({
+        "estimate": estimate,
+        "pct_low": pct_low,
+        "pct_high": pct_high,
+        "bca_low": bca_low,
+        "bca_high": bca_high,
+        "n_clusters": stats.present.sum(axis=0),
+    }, index=stats.names)
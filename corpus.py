@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Packed corpus of the narratives, atomic-fact lists and video metadata.
+
+survey-app/data keeps one narrative_NN.txt and one atomic_facts_NN.txt per
+video (zero-padded to two digits, three from 100 on) plus videos.csv. This
+module packs them into a single file:
+
+    header   magic, format version, number of videos, index offset
+    blobs    each narrative / atomic-facts file, byte for byte, and each
+             video's videos.csv row as JSON
+    index    one fixed-width record per video, sorted by video number:
+             video, n_facts, and (offset, length) of its narrative, facts
+             and metadata blobs (offset -1 where the video has none)
+
+Corpus memory-maps the file and reads the index as a NumPy view, so opening it
+parses nothing; looking up a video is a binary search in the index and
+decoding only touches that video's blobs. Because the blobs are the original
+file contents, Corpus.raw() hashes to the same SHA-256 as the file it came
+from (e.g. for the 04 result cache).
+
+Usage:
+    python corpus.py
+    python corpus.py --data-dir survey-app/data --output ../results/corpus.pack
+"""
+
+import argparse
+import csv
+import json
+import mmap
+import re
+import struct
+import time
+from pathlib import Path
+
+import numpy as np
+
+MAGIC = b"RPTCORP\0"
+VERSION = 1
+CORPUS_FILE = "corpus.pack"
+# magic, version, n_videos, index offset
+HEADER = struct.Struct("<8sIIQ")
+PARTS = ("narrative", "facts", "meta")
+INDEX_DTYPE = np.dtype([
+    ("video", "<u4"),
+    ("n_facts", "<u4"),
+    *[(part, "<i8", (2,)) for part in PARTS],   # (offset, length)
+])
+
+NARRATIVE_PATTERN = re.compile(r"narrative_(\d+)\.txt")
+FACTS_PATTERN = re.compile(r"atomic_facts_(\d+)\.txt")
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+def video_number(video) -> int:
+    """Video number of 7, "7", "07" or "video_07"."""
+    if isinstance(video, (int, np.integer)):
+        return int(video)
+    match = re.fullmatch(r"(?:video_)?(\d+)", str(video))
+    if not match:
+        raise KeyError(video)
+    return int(match.group(1))
+
+
+def split_facts(text: str) -> list:
+    """Non-empty, stripped lines of an atomic-facts file."""
+    return [line.strip() for line in text.splitlines() if line.strip()]
+
+
+# ===================================================================
+# READING
+# ===================================================================
+
+class Corpus:
+    """
+    Read-only view of a packed corpus file.
+
+        corpus = Corpus("results/corpus.pack")
+        corpus.narrative(7)            # str, or None if video 7 has none
+        corpus.facts("video_07")       # list of facts, or None
+        corpus.n_facts(7)              # from the index, nothing decoded
+        corpus.metadata(7)             # videos.csv row as a dict
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, n_videos, index_offset = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a corpus file")
+        if version != VERSION:
+            raise ValueError(f"{self.path}: corpus format {version}, expected {VERSION} "
+                             f"(rebuild it with corpus.py)")
+        self.index = np.frombuffer(self._mm, INDEX_DTYPE, n_videos, index_offset)
+        self.videos = self.index["video"]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.videos.tolist())
+
+    def __contains__(self, video):
+        try:
+            self._row(video)
+        except KeyError:
+            return False
+        return True
+
+    def _row(self, video):
+        number = video_number(video)
+        i = np.searchsorted(self.videos, number)
+        if i == len(self.videos) or self.videos[i] != number:
+            raise KeyError(video)
+        return self.index[i]
+
+    def raw(self, video, part: str):
+        """Bytes of one blob of a video (None if it has none)."""
+        offset, length = self._row(video)[part]
+        if offset < 0:
+            return None
+        return self._mm[offset:offset + length]
+
+    def _text(self, video, part):
+        try:
+            blob = self.raw(video, part)
+        except KeyError:
+            return None
+        return None if blob is None else blob.decode("utf-8-sig")
+
+    def narrative(self, video):
+        return self._text(video, "narrative")
+
+    def facts(self, video):
+        text = self._text(video, "facts")
+        return None if text is None else split_facts(text)
+
+    def n_facts(self, video) -> int:
+        return int(self._row(video)["n_facts"])
+
+    def metadata(self, video) -> dict:
+        text = self._text(video, "meta")
+        return {} if text is None else json.loads(text)
+
+    def close(self):
+        self.index = self.videos = None
+        self._mm.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ===================================================================
+# BUILDING
+# ===================================================================
+
+def numbered_files(directory: Path, pattern) -> dict:
+    """Video number -> path of the files in `directory` matching `pattern`."""
+    files = {}
+    for path in sorted(directory.glob("*.txt")) if directory.exists() else []:
+        match = pattern.fullmatch(path.name)
+        if not match:
+            continue
+        number = int(match.group(1))
+        if number in files:
+            raise ValueError(f"{files[number].name} and {path.name} are the same video")
+        files[number] = path
+    return files
+
+
+def read_videos_csv(path: Path) -> dict:
+    """Video number -> videos.csv row (rows without a VideoID are skipped)."""
+    if not path.exists():
+        return {}
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        rows = [row for row in csv.DictReader(f) if (row.get("VideoID") or "").strip()]
+    return {video_number(row["VideoID"].strip()): row for row in rows}
+
+
+def video_sources(narratives_dir: Path, facts_dir: Path, videos_csv: Path):
+    """
+    (videos, narratives, facts, meta): the sorted video numbers and, by video
+    number, the narrative path, the atomic-facts path and the videos.csv row.
+
+    Narratives are matched to videos through videos.csv's Police Report ID
+    where it is given, else by number.
+    """
+    narrative_files = numbered_files(narratives_dir, NARRATIVE_PATTERN)
+    facts = numbered_files(facts_dir, FACTS_PATTERN)
+    meta = read_videos_csv(videos_csv)
+
+    narrative_of = {number: number for number in narrative_files}
+    for number, row in meta.items():
+        report = (row.get("Police Report ID") or "").strip()
+        if report:
+            narrative_of[number] = video_number(report.replace("narrative_", ""))
+    narratives = {number: narrative_files[n] for number, n in narrative_of.items()
+                  if n in narrative_files}
+
+    videos = sorted(set(facts) | set(meta) | set(narrative_of))
+    return videos, narratives, facts, meta
+
+
+def build_corpus(narratives_dir: Path, facts_dir: Path, videos_csv: Path,
+                 output: Path) -> int:
+    """
+    Pack a narratives directory, an atomic-facts directory and videos.csv
+    into `output` (written atomically); returns the number of videos.
+    """
+    videos, narratives, facts, meta = video_sources(narratives_dir, facts_dir, videos_csv)
+    index = np.zeros(len(videos), dtype=INDEX_DTYPE)
+    index["video"] = videos
+    for part in PARTS:
+        index[part] = -1
+
+    tmp = output.with_suffix(".tmp")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(tmp, "wb") as f:
+        f.write(bytes(HEADER.size))
+
+        def write_blob(i, part, data):
+            index[part][i] = (f.tell(), len(data))
+            f.write(data)
+
+        for i, number in enumerate(videos):
+            if number in narratives:
+                write_blob(i, "narrative", narratives[number].read_bytes())
+            if number in facts:
+                data = facts[number].read_bytes()
+                write_blob(i, "facts", data)
+                index["n_facts"][i] = len(split_facts(data.decode("utf-8-sig")))
+            if number in meta:
+                write_blob(i, "meta", json.dumps(meta[number], ensure_ascii=False).encode())
+
+        f.write(bytes(-f.tell() % INDEX_DTYPE.alignment))
+        index_offset = f.tell()
+        f.write(index.tobytes())
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, len(videos), index_offset))
+    tmp.replace(output)
+    return len(videos)
+
+
+# ===================================================================
+# MAIN
+# ===================================================================
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pack the narratives, atomic facts and videos.csv into one indexed file."
+    )
+    parser.add_argument(
+        "--data-dir", type=str, default=None,
+        help="Directory with Narratives/, Atomic Facts/ and videos.csv "
+             "(default: survey-app/data/ next to this script)",
+    )
+    parser.add_argument("--narratives-dir", type=str, default=None,
+                        help="Narratives directory (default: <data-dir>/Narratives)")
+    parser.add_argument("--facts-dir", type=str, default=None,
+                        help="Atomic facts directory (default: <data-dir>/Atomic Facts)")
+    parser.add_argument(
+        "--output", type=str, default=None,
+        help=f"Corpus file to write (default: ../results/{CORPUS_FILE} relative "
+             f"to this script, where generate_paper_figures.py looks for it)",
+    )
+    args = parser.parse_args()
+
+    data_dir = Path(args.data_dir) if args.data_dir else (_SCRIPT_DIR / "survey-app" / "data")
+    narratives_dir = Path(args.narratives_dir) if args.narratives_dir else data_dir / "Narratives"
+    facts_dir = Path(args.facts_dir) if args.facts_dir else data_dir / "Atomic Facts"
+    output = Path(args.output) if args.output else (_SCRIPT_DIR.parent / "results" / CORPUS_FILE)
+
+    start = time.perf_counter()
+    n_videos = build_corpus(narratives_dir, facts_dir, data_dir / "videos.csv", output)
+    with Corpus(output) as corpus:
+        n_narratives = int((corpus.index["narrative"][:, 0] >= 0).sum())
+        n_facts = int(corpus.index["n_facts"].sum())
+    print(f"Packed {n_videos} videos ({n_narratives} narratives, {n_facts} atomic facts) "
+          f"into {output} ({output.stat().st_size / 1024:.0f} KiB) "
+          f"in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
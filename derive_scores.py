@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Derive the per-video score tables from the raw coder labels.
+
+Reads all_fact_labels.csv (one row per atomic fact, a `<coder>_label` column
+per coder) and all_likert_labels.csv (one row per video × Likert item, a
+`<coder>_value` column per coder) and computes, per video:
+
+  - <coder>_accuracy / _inaccuracy / _hallucination: share of the facts the
+    coder labelled that they labelled accurate / inaccurate / unsupported,
+  - mean_accuracy / mean_inaccuracy / mean_hallucination: the mean of those
+    over the coders who coded the video,
+  - narrative_quality: mean over Likert items of the mean-of-coders score
+    (strongly_disagree = 1 ... strongly_agree = 4; not_applicable ignored).
+
+All label counts come from one vectorised pass over the label matrix (see
+cluster_bootstrap.per_video_counts) and the Likert scores from one groupby,
+so rerunning after every new batch of coding takes well under a second.
+
+The derived columns are written into per_video_scores.csv and
+merged_analysis.csv. Columns this script does not derive (transcript
+features, error_type, ...) are kept as they are; videos missing from an
+existing table are added.
+
+Usage:
+    python derive_scores.py
+    python derive_scores.py --data-dir /path/to/results
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cluster_bootstrap import mean_of_coders_rates, per_video_counts
+from label_resolution import LABELS, RATE_NAMES, LabelMatrix
+from paper_metrics import LIKERT_SCALE
+
+FACTS_FILE = "all_fact_labels.csv"
+LIKERT_FILE = "all_likert_labels.csv"
+OUTPUT_FILES = ("per_video_scores.csv", "merged_analysis.csv")
+
+VALUE_SUFFIX = "_value"
+# Likert answer -> score; anything else (not_applicable) is missing
+LIKERT_SCORES = {answer: i + 1 for i, answer in enumerate(LIKERT_SCALE)}
+
+
+# ===================================================================
+# DERIVATION
+# ===================================================================
+
+def fact_rates(facts: pd.DataFrame) -> pd.DataFrame:
+    """Per-coder and mean-of-coders rates, one row per video (index video_id)."""
+    matrix = LabelMatrix.from_frame(facts)
+    videos, counts, coded = per_video_counts(matrix.codes, facts["video_id"], len(LABELS))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        per_coder = np.where(coded[:, :, None] > 0, counts / coded[:, :, None], np.nan)
+    mean = mean_of_coders_rates(counts, coded)
+
+    columns = {}
+    for k, rate in enumerate(RATE_NAMES):
+        for c, coder in enumerate(matrix.coders):
+            columns[f"{coder}_{rate}"] = per_coder[:, c, k]
+        columns[f"mean_{rate}"] = mean[:, k]
+    return pd.DataFrame(columns, index=pd.Index(videos, name="video_id"))
+
+
+def narrative_quality(likert: pd.DataFrame) -> pd.Series:
+    """Mean over items of the mean-of-coders Likert score (1-4), per video."""
+    coders = [c for c in likert.columns if c.endswith(VALUE_SUFFIX)]
+    scores = likert[coders].apply(lambda values: values.map(LIKERT_SCORES))
+    item_mean = scores.mean(axis=1)
+    return item_mean.groupby(likert["video_id"]).mean().rename("narrative_quality")
+
+
+def derive_scores(facts: pd.DataFrame, likert: pd.DataFrame = None) -> pd.DataFrame:
+    """All derived per-video columns, one row per coded video."""
+    scores = fact_rates(facts)
+    if likert is not None:
+        scores = scores.join(narrative_quality(likert), how="left")
+    return scores.sort_index().reset_index()
+
+
+def update_table(existing: pd.DataFrame, derived: pd.DataFrame) -> pd.DataFrame:
+    """
+    `existing` with its derived columns replaced by `derived` (joined on
+    video_id); other columns keep their values and position, new derived
+    columns are appended.
+    """
+    if existing is None:
+        return derived
+    kept = [c for c in existing.columns if c == "video_id" or c not in derived.columns]
+    table = existing[kept].merge(derived, on="video_id", how="outer")
+    order = [c for c in existing.columns if c in table.columns]
+    return table[order + [c for c in table.columns if c not in order]]
+
+
+# ===================================================================
+# MAIN
+# ===================================================================
+
+def _read(path: Path):
+    return pd.read_csv(path, dtype={"video_id": str}) if path.exists() else None
+
+
+def write_scores(derived: pd.DataFrame, output_dir: Path):
+    """Update each of OUTPUT_FILES in `output_dir` with the derived columns."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    for name in OUTPUT_FILES:
+        path = output_dir / name
+        existing = _read(path)
+        table = update_table(existing, derived)
+        tmp = path.with_suffix(".tmp")
+        table.to_csv(tmp, index=False)
+        tmp.replace(path)
+        added = len(table) - (len(existing) if existing is not None else 0)
+        print(f"  {name}: {len(table)} videos ({added} new)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Derive per-video scores from the raw fact and Likert labels."
+    )
+    parser.add_argument(
+        "--data-dir", type=str, default=None,
+        help="Path to results/ directory with the label CSVs "
+             "(default: ../results/ relative to this script)",
+    )
+    parser.add_argument(
+        "--output-dir", type=str, default=None,
+        help="Where to write the score tables (default: the data directory)",
+    )
+    args = parser.parse_args()
+
+    script_dir = Path(__file__).resolve().parent
+    data_dir = Path(args.data_dir) if args.data_dir else (script_dir.parent / "results")
+    output_dir = Path(args.output_dir) if args.output_dir else data_dir
+
+    start = time.perf_counter()
+    facts = _read(data_dir / FACTS_FILE)
+    if facts is None:
+        print(f"ERROR: {data_dir / FACTS_FILE} not found")
+        sys.exit(1)
+    likert = _read(data_dir / LIKERT_FILE)
+    if likert is None:
+        print(f"  WARNING: {LIKERT_FILE} not found, skipping narrative_quality")
+
+    derived = derive_scores(facts, likert)
+    print(f"Derived scores for {len(derived)} videos from {len(facts)} facts"
+          + (f" and {len(likert)} Likert ratings" if likert is not None else ""))
+
+    write_scores(derived, output_dir)
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,9 +21,6 @@ import sys
 import time
 from pathlib import Path
 
-import torch
-import whisperx
-from pyannote.audio import Pipeline as DiarizationPipeline
 from tqdm import tqdm
 
 from config import (
@@ -47,6 +44,8 @@ def get_video_ids():
 
 def load_whisper_model():
     """Load WhisperX ASR model (same for all diarization comparisons)."""
+    import whisperx
+
     print(f"Loading Whisper model: {WHISPER_MODEL} on {DEVICE}")
     compute_type = "float16" if DEVICE == "cuda" else "int8"
     model = whisperx.load_model(
@@ -66,6 +65,8 @@ def transcribe_and_diarize(audio_path, whisper_model, diar_pipeline, model_label
         diar_result: pyannote diarization Annotation object
         timing: dict with processing times
     """
+    import whisperx
+
     timing = {}
     audio_file = str(audio_path)
 
@@ -130,6 +131,10 @@ def main():
                         help="Video IDs to process (default: from config)")
     args = parser.parse_args()
 
+    # Heavy imports only once we know there is work to do (keeps --help fast)
+    import torch
+    from pyannote.audio import Pipeline as DiarizationPipeline
+
     # Resolve which models and videos to run
     models_to_run = DIARIZATION_MODELS
     if args.models:
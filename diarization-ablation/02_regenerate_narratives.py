@@ -14,7 +14,6 @@ import json
 import time
 from pathlib import Path
 
-import google.generativeai as genai
 from tqdm import tqdm
 
 from config import (
@@ -102,6 +101,8 @@ def main():
     args = parser.parse_args()
 
     # Setup Gemini
+    import google.generativeai as genai
+
     genai.configure(api_key=GEMINI_API_KEY)
     model = genai.GenerativeModel(GEMINI_MODEL)
 
@@ -8,46 +8,60 @@ the transcripts and diarization outputs. It measures:
 1. Speaker count accuracy (do we detect the right number of speakers?)
 2. Diarization agreement between models (how much do speaker assignments differ?)
 3. Speaker entropy / dominance (are speaker proportions reasonable?)
-4. Transcript-level differences (how much does the text change with new diarization?)
+4. Transcript-level differences (how much does the text change with new diarization?),
+   as bag-of-words similarity and as WER/CER with substitution/insertion/deletion counts
+
+With --pairwise it also compares every pair of models (including the original
+WhisperX transcripts) per video, writing a long-form pairwise_comparison.csv and
+a model x model agreement heatmap.
 
 For a subset of videos where we have human-coded accuracy labels, it also
 correlates diarization quality metrics with factual accuracy.
 
+Results are cached per (video, model, metric) under output/cache/, keyed by the
+hashes of the input transcripts and of the metric code, so re-runs only compute
+rows whose inputs changed.
+
 Usage:
-    python 03_compare_diarization.py
+    python 03_compare_diarization.py [--pairwise] [--no-cache]
 """
 
+import argparse
 import json
 import os
 from collections import Counter
 from pathlib import Path
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from scipy import stats
-from scipy.optimize import linear_sum_assignment
 
 from config import (
     ORIGINAL_TRANSCRIPTS_DIR, NEW_TRANSCRIPTS_DIR,
-    NEW_DIARIZATION_DIR, OUTPUT_DIR, COMPARISON_DIR,
+    NEW_DIARIZATION_DIR, OUTPUT_DIR, COMPARISON_DIR, CACHE_DIR,
     DIARIZATION_MODELS, AUDIO_DIR
 )
+from result_cache import ResultCache, code_version
+from text_metrics import word_error_rate, char_error_rate
+from transcripts import (
+    NON_SPEAKERS, ParsedTranscript, load_transcript, parse_transcript,
+    overlap_matrix, speaker_mapping, speaker_agreement,
+)
 
 
-def load_transcript(path):
-    """Load a transcript JSON file."""
-    with open(path) as f:
-        return json.load(f)
+def _pyplot():
+    """matplotlib.pyplot on the Agg backend, imported only when plotting."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
 
 
 def get_speaker_stats(transcript):
     """Compute speaker statistics from a transcript."""
     speakers = [seg.get('speaker', 'UNKNOWN') for seg in transcript]
     speaker_counts = Counter(speakers)
-    n_speakers = len([s for s in speaker_counts if s != 'UNKNOWN'])
+    # Same definition as ParsedTranscript.n_speakers: UNKNOWN / '' are not speakers
+    n_speakers = len([s for s in speaker_counts if s not in NON_SPEAKERS])
 
     # Speaker time proportions (approximate from segment count)
     total = sum(speaker_counts.values())
@@ -69,74 +83,27 @@ def get_speaker_stats(transcript):
     }
 
 
-def compute_speaker_mapping(trans_a, trans_b):
+def compute_speaker_mapping(trans_a, trans_b, overlap=None):
     """
     Find the best speaker-to-speaker mapping between two transcripts
     using the Hungarian algorithm on temporal overlap.
 
+    Accepts raw or parsed transcripts (see transcripts.py); pass a precomputed
+    label overlap matrix to avoid repeating the sweep.
+
     Returns a dict mapping speaker labels in B to their best match in A.
     """
-    speakers_a = set(seg.get('speaker', '') for seg in trans_a) - {'UNKNOWN', ''}
-    speakers_b = set(seg.get('speaker', '') for seg in trans_b) - {'UNKNOWN', ''}
-
-    if not speakers_a or not speakers_b:
-        return {}
-
-    speakers_a = sorted(speakers_a)
-    speakers_b = sorted(speakers_b)
-
-    # Build overlap matrix: for each pair (sa, sb), count how many segments
-    # overlap temporally AND have those speaker assignments
-    overlap = np.zeros((len(speakers_a), len(speakers_b)))
+    pa, pb = parse_transcript(trans_a), parse_transcript(trans_b)
+    return speaker_mapping(pa, pb, overlap)
 
-    for seg_a in trans_a:
-        for seg_b in trans_b:
-            # Check temporal overlap
-            start = max(seg_a['start'], seg_b['start'])
-            end = min(seg_a['end'], seg_b['end'])
-            if end > start:
-                sa_idx = speakers_a.index(seg_a.get('speaker', '')) if seg_a.get('speaker', '') in speakers_a else -1
-                sb_idx = speakers_b.index(seg_b.get('speaker', '')) if seg_b.get('speaker', '') in speakers_b else -1
-                if sa_idx >= 0 and sb_idx >= 0:
-                    overlap[sa_idx, sb_idx] += (end - start)
 
-    # Pad to square if needed
-    n = max(len(speakers_a), len(speakers_b))
-    padded = np.zeros((n, n))
-    padded[:len(speakers_a), :len(speakers_b)] = overlap
-
-    # Hungarian algorithm (maximize overlap = minimize negative)
-    row_ind, col_ind = linear_sum_assignment(-padded)
-
-    mapping = {}
-    for r, c in zip(row_ind, col_ind):
-        if c < len(speakers_b) and r < len(speakers_a):
-            mapping[speakers_b[c]] = speakers_a[r]
-
-    return mapping
-
-
-def compute_speaker_agreement(trans_a, trans_b, mapping):
+def compute_speaker_agreement(trans_a, trans_b, mapping, overlap=None):
     """
     After aligning speakers via mapping, compute what fraction of
     speech time has matching speaker labels.
     """
-    total_overlap = 0
-    matching_overlap = 0
-
-    for seg_a in trans_a:
-        for seg_b in trans_b:
-            start = max(seg_a['start'], seg_b['start'])
-            end = min(seg_a['end'], seg_b['end'])
-            if end > start:
-                duration = end - start
-                total_overlap += duration
-                sp_a = seg_a.get('speaker', '')
-                sp_b = mapping.get(seg_b.get('speaker', ''), '')
-                if sp_a == sp_b:
-                    matching_overlap += duration
-
-    return matching_overlap / total_overlap if total_overlap > 0 else 0
+    pa, pb = parse_transcript(trans_a), parse_transcript(trans_b)
+    return speaker_agreement(pa, pb, mapping, overlap)
 
 
 def text_similarity(trans_a, trans_b):
@@ -144,12 +111,9 @@ def text_similarity(trans_a, trans_b):
     Compare the actual text content of two transcripts.
     Since ASR is the same, differences come from segmentation/alignment changes.
     """
-    text_a = ' '.join(seg['text'].strip() for seg in trans_a)
-    text_b = ' '.join(seg['text'].strip() for seg in trans_b)
-
     # Simple word-level overlap
-    words_a = set(text_a.lower().split())
-    words_b = set(text_b.lower().split())
+    words_a = parse_transcript(trans_a).words
+    words_b = parse_transcript(trans_b).words
 
     if not words_a and not words_b:
         return 1.0
@@ -157,8 +121,144 @@ def text_similarity(trans_a, trans_b):
     return jaccard
 
 
+def transcript_error_rates(ref, hyp):
+    """
+    WER (with S/I/D counts) and CER of transcript `hyp` against reference `ref`,
+    computed on the interned token-id arrays of the parsed transcripts.
+    """
+    pr, ph = parse_transcript(ref), parse_transcript(hyp)
+    rates = word_error_rate(pr.token_ids, ph.token_ids)
+    rates['cer'] = char_error_rate(pr.tokens, ph.tokens)
+    return rates
+
+
+def compare_transcripts(trans_orig, trans_new):
+    """All agreement metrics for one (original, new) transcript pair."""
+    p_orig, p_new = parse_transcript(trans_orig), parse_transcript(trans_new)
+
+    # Align speakers and compute agreement (one overlap sweep for both)
+    overlap = overlap_matrix(p_orig, p_new)
+    mapping = compute_speaker_mapping(p_orig, p_new, overlap)
+    agreement = compute_speaker_agreement(p_orig, p_new, mapping, overlap)
+    text_sim = text_similarity(p_orig, p_new)
+
+    error_rates = transcript_error_rates(p_orig, p_new)
+
+    orig_stats = get_speaker_stats(trans_orig)
+    new_stats = get_speaker_stats(trans_new)
+
+    return {
+        'speaker_agreement': agreement,
+        'text_similarity': text_sim,
+        **error_rates,
+        'orig_n_speakers': orig_stats['n_speakers'],
+        'new_n_speakers': new_stats['n_speakers'],
+        'speaker_count_diff': new_stats['n_speakers'] - orig_stats['n_speakers'],
+        'orig_dominance': orig_stats['dominance'],
+        'new_dominance': new_stats['dominance'],
+    }
+
+
+def compare_pair(parsed_a, parsed_b):
+    """
+    Agreement metrics for one model pair on one video, from parsed transcripts.
+
+    Parsing/sorting happens once per transcript; per pair only the overlap
+    sweep, a small Hungarian assignment and a set intersection are done.
+    """
+    overlap = overlap_matrix(parsed_a, parsed_b)
+    mapping = speaker_mapping(parsed_a, parsed_b, overlap)
+    error_rates = transcript_error_rates(parsed_a, parsed_b)
+    return {
+        'speaker_agreement': speaker_agreement(parsed_a, parsed_b, mapping, overlap),
+        'text_similarity': text_similarity(parsed_a, parsed_b),
+        'wer': error_rates['wer'],
+        'cer': error_rates['cer'],
+        'n_speakers_a': parsed_a.n_speakers,
+        'n_speakers_b': parsed_b.n_speakers,
+        'speaker_count_diff': parsed_b.n_speakers - parsed_a.n_speakers,
+    }
+
+
+def pairwise_comparison(video_ids, transcript_paths, cache):
+    """
+    Compare every pair of models on every video.
+
+    transcript_paths maps model label -> function(vid) -> Path. Each transcript
+    is loaded and parsed at most once (and not at all if every pair involving
+    it is cached).
+
+    Returns a long-form DataFrame: one row per (video, model_a, model_b).
+    """
+    models = list(transcript_paths)
+    # code_version follows the helpers (speaker mapping, WER/CER, ...) itself
+    pair_code = code_version(compare_pair, ParsedTranscript)
+    rows = []
+
+    for vid in video_ids:
+        paths = {m: transcript_paths[m](vid) for m in models}
+        paths = {m: p for m, p in paths.items() if p.exists()}
+        parsed = {}
+
+        def _parsed(model):
+            if model not in parsed:
+                parsed[model] = parse_transcript(load_transcript(paths[model]))
+            return parsed[model]
+
+        present = [m for m in models if m in paths]
+        for ia, model_a in enumerate(present):
+            for model_b in present[ia + 1:]:
+                row = cache.get_or_compute(
+                    'pairwise', vid, f"{model_a}|{model_b}",
+                    inputs=[paths[model_a], paths[model_b]], code=pair_code,
+                    compute=lambda: compare_pair(_parsed(model_a), _parsed(model_b)),
+                )
+                rows.append({'video_id': vid, 'model_a': model_a,
+                             'model_b': model_b, **row})
+
+    return pd.DataFrame(rows)
+
+
+def plot_pairwise_heatmap(pair_df, models, metric, path_stem):
+    """Symmetric model x model heatmap of the mean of `metric` across videos."""
+    means = pair_df.groupby(['model_a', 'model_b'])[metric].mean()
+    n = len(models)
+    matrix = np.full((n, n), np.nan)
+    np.fill_diagonal(matrix, 1.0)
+    index = {m: k for k, m in enumerate(models)}
+    for (a, b), value in means.items():
+        matrix[index[a], index[b]] = matrix[index[b], index[a]] = value
+
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(1.6 * n + 3, 1.3 * n + 2))
+    im = ax.imshow(matrix, cmap='viridis', vmin=np.nanmin(matrix), vmax=1.0)
+    ax.set_xticks(range(n))
+    ax.set_yticks(range(n))
+    ax.set_xticklabels(models, rotation=30, ha='right')
+    ax.set_yticklabels(models)
+    for i in range(n):
+        for j in range(n):
+            if not np.isnan(matrix[i, j]):
+                ax.text(j, i, f"{matrix[i, j]:.3f}", ha='center', va='center',
+                        color='white' if matrix[i, j] < np.nanmean(matrix) else 'black')
+    fig.colorbar(im, ax=ax, label=f"Mean {metric.replace('_', ' ')}")
+    ax.set_title(f"Pairwise {metric.replace('_', ' ').title()} Across Models")
+    plt.tight_layout()
+    plt.savefig(f"{path_stem}.pdf", dpi=300)
+    plt.savefig(f"{path_stem}.png", dpi=300)
+    plt.close()
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Compare diarization quality across models")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore and don't update the per-video result cache")
+    parser.add_argument("--pairwise", action="store_true",
+                        help="Also compare every pair of models (not just each vs. original)")
+    args = parser.parse_args()
+
     COMPARISON_DIR.mkdir(parents=True, exist_ok=True)
+    cache = ResultCache(CACHE_DIR, enabled=not args.no_cache)
 
     # Get all video IDs
     video_ids = sorted([
@@ -174,6 +274,18 @@ def main():
     # ============================================================
     # 1. Per-video speaker statistics for each model
     # ============================================================
+    stats_code = code_version(get_speaker_stats)
+
+    def _stats_row(trans_path, vid, model_label):
+        row = cache.get_or_compute(
+            'speaker_stats', vid, model_label,
+            inputs=[trans_path], code=stats_code,
+            compute=lambda: get_speaker_stats(load_transcript(trans_path)),
+        )
+        row['video_id'] = vid
+        row['model'] = model_label
+        return row
+
     all_stats = []
 
     for model_label in model_labels:
@@ -186,12 +298,7 @@ def main():
             trans_path = trans_dir / f"transcript_{vid:02d}.json"
             if not trans_path.exists():
                 continue
-
-            transcript = load_transcript(trans_path)
-            stats_dict = get_speaker_stats(transcript)
-            stats_dict['video_id'] = vid
-            stats_dict['model'] = model_label
-            all_stats.append(stats_dict)
+            all_stats.append(_stats_row(trans_path, vid, model_label))
 
     stats_df = pd.DataFrame(all_stats)
 
@@ -201,11 +308,7 @@ def main():
         orig_path = ORIGINAL_TRANSCRIPTS_DIR / f"transcript_{vid:02d}.json"
         if not orig_path.exists():
             continue
-        transcript = load_transcript(orig_path)
-        s = get_speaker_stats(transcript)
-        s['video_id'] = vid
-        s['model'] = 'original-whisperx'
-        orig_stats.append(s)
+        orig_stats.append(_stats_row(orig_path, vid, 'original-whisperx'))
 
     orig_df = pd.DataFrame(orig_stats)
     stats_df = pd.concat([orig_df, stats_df], ignore_index=True)
@@ -221,6 +324,7 @@ def main():
     # ============================================================
     print("\nComputing cross-model speaker agreement...")
 
+    agreement_code = code_version(compare_transcripts, ParsedTranscript)
     agreement_rows = []
     # Compare each new model against the original
     for model_label in model_labels:
@@ -233,28 +337,13 @@ def main():
             if not orig_path.exists() or not new_path.exists():
                 continue
 
-            trans_orig = load_transcript(orig_path)
-            trans_new = load_transcript(new_path)
-
-            # Align speakers and compute agreement
-            mapping = compute_speaker_mapping(trans_orig, trans_new)
-            agreement = compute_speaker_agreement(trans_orig, trans_new, mapping)
-            text_sim = text_similarity(trans_orig, trans_new)
-
-            orig_stats = get_speaker_stats(trans_orig)
-            new_stats = get_speaker_stats(trans_new)
-
-            agreement_rows.append({
-                'video_id': vid,
-                'model': model_label,
-                'speaker_agreement': agreement,
-                'text_similarity': text_sim,
-                'orig_n_speakers': orig_stats['n_speakers'],
-                'new_n_speakers': new_stats['n_speakers'],
-                'speaker_count_diff': new_stats['n_speakers'] - orig_stats['n_speakers'],
-                'orig_dominance': orig_stats['dominance'],
-                'new_dominance': new_stats['dominance'],
-            })
+            row = cache.get_or_compute(
+                'agreement', vid, model_label,
+                inputs=[orig_path, new_path], code=agreement_code,
+                compute=lambda: compare_transcripts(
+                    load_transcript(orig_path), load_transcript(new_path)),
+            )
+            agreement_rows.append({'video_id': vid, 'model': model_label, **row})
 
     agreement_df = pd.DataFrame(agreement_rows)
     agreement_df.to_csv(COMPARISON_DIR / 'diarization_agreement.csv', index=False)
@@ -270,10 +359,43 @@ def main():
             print(f"    Speaker agreement: {subset['speaker_agreement'].mean():.3f} "
                   f"(±{subset['speaker_agreement'].std():.3f})")
             print(f"    Text similarity:   {subset['text_similarity'].mean():.3f}")
+            print(f"    WER vs. original:  {subset['wer'].mean():.3f} "
+                  f"(S={subset['word_substitutions'].sum()}, "
+                  f"I={subset['word_insertions'].sum()}, "
+                  f"D={subset['word_deletions'].sum()}), "
+                  f"CER: {subset['cer'].mean():.3f}")
             print(f"    Speaker count diff: {subset['speaker_count_diff'].mean():+.2f} "
                   f"(orig avg: {subset['orig_n_speakers'].mean():.1f}, "
                   f"new avg: {subset['new_n_speakers'].mean():.1f})")
 
+    # ============================================================
+    # 2b. All-pairs model comparison (optional)
+    # ============================================================
+    pair_df = None
+    if args.pairwise:
+        print("\nComputing pairwise agreement for every model pair...")
+        transcript_paths = {
+            'original-whisperx': lambda v: ORIGINAL_TRANSCRIPTS_DIR / f"transcript_{v:02d}.json",
+        }
+        for model_label in model_labels:
+            transcript_paths[model_label] = (
+                lambda v, m=model_label: NEW_TRANSCRIPTS_DIR / m / f"transcript_{v:02d}.json")
+
+        pair_df = pairwise_comparison(video_ids, transcript_paths, cache)
+        pair_df.to_csv(COMPARISON_DIR / 'pairwise_comparison.csv', index=False)
+        print(f"  Pairwise comparison saved ({len(pair_df)} rows)")
+
+        if len(pair_df) > 0:
+            summary = pair_df.groupby(['model_a', 'model_b'])[
+                ['speaker_agreement', 'text_similarity', 'wer', 'speaker_count_diff']].mean()
+            for (a, b), r in summary.iterrows():
+                print(f"    {a} ↔ {b}: agreement={r['speaker_agreement']:.3f}, "
+                      f"text={r['text_similarity']:.3f}, WER={r['wer']:.3f}, "
+                      f"count diff={r['speaker_count_diff']:+.2f}")
+
+    cache.save()
+    print(f"\n  Result cache: {cache.summary()}")
+
     # ============================================================
     # 3. Correlation with accuracy (if we have coded data)
     # ============================================================
@@ -292,6 +414,7 @@ def main():
                                   left_on='video_id', right_on='video_num', how='inner')
 
             if len(merged) > 5:
+                from scipy import stats
                 r_agree, p_agree = stats.pearsonr(merged['speaker_agreement'],
                                                    merged['mean_accuracy'])
                 r_count, p_count = stats.pearsonr(merged['speaker_count_diff'].abs(),
@@ -304,6 +427,7 @@ def main():
     # 4. Generate figures
     # ============================================================
     print("\nGenerating figures...")
+    plt = _pyplot()
 
     if len(agreement_df) > 0:
         # Figure: Speaker agreement distribution
@@ -351,6 +475,13 @@ def main():
             plt.savefig(COMPARISON_DIR / 'speaker_count_comparison.png', dpi=300)
             plt.close()
 
+    if pair_df is not None and len(pair_df) > 0:
+        heatmap_models = ['original-whisperx'] + model_labels
+        heatmap_models = [m for m in heatmap_models
+                          if m in set(pair_df['model_a']) | set(pair_df['model_b'])]
+        plot_pairwise_heatmap(pair_df, heatmap_models, 'speaker_agreement',
+                              COMPARISON_DIR / 'pairwise_agreement_heatmap')
+
     print(f"\nAll comparison outputs saved to: {COMPARISON_DIR}")
     print("Done!")
 
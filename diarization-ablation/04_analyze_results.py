@@ -10,29 +10,53 @@ If human coding hasn't been done yet, it still produces useful intermediate
 analyses: transcript-level diarization quality comparisons, speaker assignment
 differences, and predicted accuracy improvements based on the error taxonomy.
 
+Narrative and atomic-fact comparisons are cached per (video, model, metric)
+under output/cache/ (see result_cache.py), so adding a video or a model only
+computes the new rows. With --corpus, the original narratives and atomic facts
+are read from a packed corpus file (see corpus.py in the repository root)
+instead of one file per video.
+
 Usage:
-    python 04_analyze_results.py [--coded-data path/to/new_coded_responses.csv]
+    python 04_analyze_results.py [--coded-data path/to/new_coded_responses.csv] [--no-cache]
+    python 04_analyze_results.py --corpus ../results/corpus.pack
 """
 
 import argparse
 import json
+import sys
 from pathlib import Path
-from difflib import SequenceMatcher
 
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
-from scipy import stats
 
 from config import (
     ORIGINAL_TRANSCRIPTS_DIR, NEW_TRANSCRIPTS_DIR,
     ORIGINAL_NARRATIVES_DIR, NEW_NARRATIVES_DIR,
     ORIGINAL_FACTS_DIR, NEW_FACTS_DIR,
-    COMPARISON_DIR, OUTPUT_DIR,
+    COMPARISON_DIR, OUTPUT_DIR, CACHE_DIR, PROJECT_ROOT,
     DIARIZATION_MODELS, AUDIO_DIR
 )
+from transcripts import (
+    NON_SPEAKERS, ParsedTranscript, load_transcript, parse_transcript,
+    overlap_pairs, overlap_matrix, speaker_mapping, mapped_codes,
+)
+from narrative_diff import (
+    TokenizedNarrative, diff_narratives, lcs_alignment,
+)
+from fact_matching import MATCH_THRESHOLD, match_facts
+from resampling import N_RESAMPLES, paired_resampling
+from power import (
+    N_SIMULATIONS, TARGET_POWER, estimate_noise_sd, required_sample_size, simulate_power,
+)
+from result_cache import ResultCache, code_version
+
+
+def _pyplot():
+    """matplotlib.pyplot on the Agg backend, imported only when plotting."""
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
 
 
 def count_speaker_swaps(orig_transcript, new_transcript):
@@ -42,87 +66,104 @@ def count_speaker_swaps(orig_transcript, new_transcript):
 
     This is the key metric: how many utterances get re-attributed to a
     different speaker when diarization improves?
-    """
-    from collections import Counter
-
-    # Build time-aligned comparison
-    swaps = 0
-    total = 0
-
-    for orig_seg in orig_transcript:
-        # Find the best-matching segment in the new transcript
-        best_overlap = 0
-        best_new_speaker = None
-
-        for new_seg in new_transcript:
-            start = max(orig_seg['start'], new_seg['start'])
-            end = min(orig_seg['end'], new_seg['end'])
-            overlap = max(0, end - start)
-
-            if overlap > best_overlap:
-                best_overlap = overlap
-                best_new_speaker = new_seg.get('speaker', '')
-
-        if best_new_speaker is not None:
-            total += 1
-            # We can't directly compare labels (SPEAKER_00 in one might be SPEAKER_01
-            # in another), so we track the pattern of changes
-            # This will be resolved in the analysis via Hungarian matching
 
-    return total
+    Speakers of the new transcript are mapped onto the original's with the
+    Hungarian algorithm on temporal overlap (labels are arbitrary: SPEAKER_00 in
+    one run may be SPEAKER_01 in another). Each original segment is then
+    compared with its best-overlapping new segment; it counts as swapped when
+    the mapped new speaker differs (including new speakers with no
+    counterpart). Everything comes from one sorted sweep over both transcripts.
 
-
-def compare_narratives(orig_path, new_path):
-    """Compare original and new narratives at the text level."""
-    if not orig_path.exists() or not new_path.exists():
-        return None
-
-    with open(orig_path) as f:
-        orig = f.read().strip()
-    with open(new_path) as f:
-        new = f.read().strip()
-
-    # Sequence similarity
-    sim = SequenceMatcher(None, orig, new).ratio()
-
-    # Word-level comparison
-    orig_words = orig.lower().split()
-    new_words = new.lower().split()
-    word_sim = SequenceMatcher(None, orig_words, new_words).ratio()
-
-    # Length comparison
-    len_diff = len(new_words) - len(orig_words)
+    Returns a dict with the number of aligned and swapped segments, the swap
+    rate, the misattributed speech duration (all overlapping time whose mapped
+    labels disagree) and the indices of the swapped original segments.
+    """
+    po = parse_transcript(orig_transcript)
+    pn = parse_transcript(new_transcript)
+
+    i, j, ov = overlap_pairs(po, pn)
+    overlap = overlap_matrix(po, pn, (i, j, ov))
+    mapping = speaker_mapping(po, pn, overlap)
+    target = mapped_codes(po, pn, mapping)  # new label code -> original label code (-1 = none)
+
+    # Only original segments with a real speaker label can be swapped
+    real = np.array([label not in NON_SPEAKERS for label in po.labels], dtype=bool)
+    keep = real[po.codes[i]]
+    i, j, ov = i[keep], j[keep], ov[keep]
+    disagree = target[pn.codes[j]] != po.codes[i]
+
+    # Best-overlapping new segment for every original segment
+    order = np.lexsort((-ov, i))
+    best_i, best_j = i[order], j[order]
+    first = np.r_[True, best_i[1:] != best_i[:-1]] if len(best_i) else np.zeros(0, dtype=bool)
+    best_i, best_j = best_i[first], best_j[first]
+    swapped = target[pn.codes[best_j]] != po.codes[best_i]
+
+    n_aligned = len(best_i)
+    total_time = ov.sum()
+    swapped_time = ov[disagree].sum()
 
     return {
-        'char_similarity': sim,
-        'word_similarity': word_sim,
-        'orig_words': len(orig_words),
-        'new_words': len(new_words),
-        'word_count_diff': len_diff,
+        'n_orig_segments': len(po),
+        'n_aligned': n_aligned,
+        'n_swapped': int(swapped.sum()),
+        'swap_rate': swapped.sum() / n_aligned if n_aligned else 0.0,
+        'swapped_duration': float(swapped_time),
+        'swapped_duration_rate': float(swapped_time / total_time) if total_time > 0 else 0.0,
+        'swapped_segments': sorted(po.order[best_i[swapped]].tolist()),
     }
 
 
-def compare_atomic_facts(orig_path, new_path):
-    """Compare atomic facts extracted from original vs new narratives."""
-    if not orig_path.exists() or not new_path.exists():
-        return None
+class OriginalTexts:
+    """
+    The original narratives and atomic-fact files by video number, read from
+    ORIGINAL_NARRATIVES_DIR / ORIGINAL_FACTS_DIR or from a packed corpus.
+
+    source() returns (cache input, loader) for a video: the file path, or the
+    corpus blob (which hashes like the file it was packed from), and a
+    function returning its text; None if the video has no such file.
+    """
 
-    with open(orig_path) as f:
-        orig_facts = [l.strip() for l in f.readlines() if l.strip()]
-    with open(new_path) as f:
-        new_facts = [l.strip() for l in f.readlines() if l.strip()]
+    def __init__(self, corpus_path=None):
+        self.corpus = None
+        if corpus_path is not None:
+            # corpus.py lives in the repository root, next to the figure scripts
+            sys.path.append(str(PROJECT_ROOT))
+            from corpus import Corpus
+            self.corpus = Corpus(corpus_path)
+
+    def source(self, kind, vid):
+        if self.corpus is None:
+            path = (ORIGINAL_NARRATIVES_DIR / f"narrative_{vid:02d}.txt" if kind == 'narrative'
+                    else ORIGINAL_FACTS_DIR / f"atomic_facts_{vid:02d}.txt")
+            if not path.exists():
+                return None
+            return path, path.read_text
+        blob = self.corpus.raw(vid, kind) if vid in self.corpus else None
+        if blob is None:
+            return None
+        return blob, lambda: blob.decode('utf-8')
+
+
+def compare_narratives(orig, new):
+    """Compare original and new narrative texts at the text level."""
+    # Word-level LCS diff with change hunks; the character-level metric is
+    # only computed on the changed hunks (see narrative_diff.py)
+    return diff_narratives(orig.strip(), new.strip())
+
+
+def compare_atomic_facts(orig, new):
+    """Compare atomic facts (file contents) from original vs new narratives."""
+    orig_facts = [l.strip() for l in orig.splitlines() if l.strip()]
+    new_facts = [l.strip() for l in new.splitlines() if l.strip()]
 
     # Count of facts
     n_orig = len(orig_facts)
     n_new = len(new_facts)
 
-    # Find matching facts (fuzzy)
-    matched = 0
-    for of in orig_facts:
-        for nf in new_facts:
-            if SequenceMatcher(None, of.lower(), nf.lower()).ratio() > 0.8:
-                matched += 1
-                break
+    # Optimal one-to-one fuzzy matching (see fact_matching.py)
+    matches = match_facts(orig_facts, new_facts, threshold=MATCH_THRESHOLD)
+    matched = len(matches)
 
     return {
         'orig_n_facts': n_orig,
@@ -130,6 +171,12 @@ def compare_atomic_facts(orig_path, new_path):
         'n_matched': matched,
         'fact_retention_rate': matched / n_orig if n_orig > 0 else 0,
         'fact_count_diff': n_new - n_orig,
+        'mean_match_score': float(np.mean([m[2] for m in matches])) if matches else np.nan,
+        'matches': [
+            {'orig_index': i, 'new_index': j, 'score': score,
+             'orig_fact': orig_facts[i], 'new_fact': new_facts[j]}
+            for i, j, score in matches
+        ],
     }
 
 
@@ -169,13 +216,73 @@ def estimate_accuracy_improvement(error_taxonomy_path, agreement_df):
     }
 
 
+def resample_paired_metrics(comparison, metrics, n_resamples, seed, group_col=None):
+    """
+    Bootstrap CIs and permutation p-values of new - original for each metric,
+    over all videos and (optionally) within each group of `group_col`.
+
+    `comparison` holds the merged per-video data with `<metric>_orig` and
+    `<metric>_new` columns.
+    """
+    rng = np.random.default_rng(seed)
+    groups = [('all', comparison)]
+    if group_col is not None:
+        groups += list(comparison.groupby(group_col))
+
+    frames = []
+    for name, subset in groups:
+        orig = subset[[f'{m}_orig' for m in metrics]].set_axis(metrics, axis=1)
+        new = subset[[f'{m}_new' for m in metrics]].set_axis(metrics, axis=1)
+        result = paired_resampling(orig, new, n_resamples=n_resamples, rng=rng)
+        if len(result) > 0:
+            result.insert(0, 'group', name)
+            frames.append(result)
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def plot_power_curves(power_df, noise_sd, out_stem):
+    """Power vs number of coded videos, one line per fix rate."""
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(7, 5))
+    for fix, sub in power_df.groupby('fix_rate'):
+        gain = sub['expected_improvement'].iloc[0]
+        ax.plot(sub['n_videos'], sub['power'], marker='o',
+                label=f'{fix:.0%} fixed (+{gain:.3f} acc.)')
+    ax.axhline(TARGET_POWER, color='gray', linestyle='--', linewidth=1)
+    ax.set_xlabel('Videos coded')
+    ax.set_ylabel('Power (paired t-test, α = 0.05)')
+    ax.set_ylim(0, 1.02)
+    ax.set_title(f'Simulated power (noise SD = {noise_sd:.3f})')
+    ax.legend(title='Misattributions fixed', fontsize=8)
+    plt.tight_layout()
+    plt.savefig(out_stem.with_suffix('.pdf'), dpi=300)
+    plt.savefig(out_stem.with_suffix('.png'), dpi=300)
+    plt.close()
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--coded-data", type=str, default=None,
                         help="Path to CSV with human-coded accuracy for new narratives")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore and don't update the per-video result cache")
+    parser.add_argument("--n-resamples", type=int, default=N_RESAMPLES,
+                        help="Bootstrap / permutation resamples for the coded-data comparison")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Random seed for resampling")
+    parser.add_argument("--power-sims", type=int, default=N_SIMULATIONS,
+                        help="Simulated studies per (sample size, effect size) in the power analysis")
+    parser.add_argument("--power-noise-sd", type=float, default=None,
+                        help="Measurement-noise SD of a per-video accuracy delta "
+                             "(default: estimated from coder disagreement)")
+    parser.add_argument("--corpus", type=str, default=None,
+                        help="Packed corpus (built by corpus.py) to read the original "
+                             "narratives and atomic facts from")
     args = parser.parse_args()
 
     COMPARISON_DIR.mkdir(parents=True, exist_ok=True)
+    cache = ResultCache(CACHE_DIR, enabled=not args.no_cache)
+    originals = OriginalTexts(args.corpus)
 
     video_ids = sorted([
         int(f.stem.replace("audio_", ""))
@@ -193,17 +300,33 @@ def main():
     # ============================================================
     print("\n1. Comparing narratives...")
 
+    # Follows lcs_alignment's Hirschberg/LCS helpers and _SENTENCE_RE itself
+    narr_code = code_version(compare_narratives, diff_narratives, TokenizedNarrative)
     narr_rows = []
+    hunk_rows = []
     for model_label in model_labels:
         new_narr_dir = NEW_NARRATIVES_DIR / model_label
         if not new_narr_dir.exists():
             continue
 
         for vid in video_ids:
-            orig_path = ORIGINAL_NARRATIVES_DIR / f"narrative_{vid:02d}.txt"
+            orig = originals.source('narrative', vid)
             new_path = new_narr_dir / f"narrative_{vid:02d}.txt"
-            result = compare_narratives(orig_path, new_path)
+            if orig is None or not new_path.exists():
+                continue
+            orig_input, orig_text = orig
+            result = cache.get_or_compute(
+                'narratives', vid, model_label,
+                inputs=[orig_input, new_path], code=narr_code,
+                compute=lambda: compare_narratives(orig_text(), new_path.read_text()),
+            )
             if result:
+                for k, hunk in enumerate(result.pop('hunks')):
+                    hunk_rows.append({
+                        'video_id': vid, 'model': model_label, 'hunk': k, **hunk,
+                        'orig_sentences': ' || '.join(hunk['orig_sentences']),
+                        'new_sentences': ' || '.join(hunk['new_sentences']),
+                    })
                 result['video_id'] = vid
                 result['model'] = model_label
                 narr_rows.append(result)
@@ -211,6 +334,7 @@ def main():
     if narr_rows:
         narr_df = pd.DataFrame(narr_rows)
         narr_df.to_csv(COMPARISON_DIR / 'narrative_comparison.csv', index=False)
+        pd.DataFrame(hunk_rows).to_csv(COMPARISON_DIR / 'narrative_hunks.csv', index=False)
 
         print("\n  Narrative similarity (original vs re-generated):")
         for model_label in model_labels:
@@ -228,17 +352,29 @@ def main():
     # ============================================================
     print("\n2. Comparing atomic facts...")
 
+    # Includes _ngrams, MATCH_THRESHOLD and MIN_BLOCKING_LENGTH via match_facts
+    facts_code = code_version(compare_atomic_facts, match_facts)
     facts_rows = []
+    match_rows = []
     for model_label in model_labels:
         new_facts_dir = NEW_FACTS_DIR / model_label
         if not new_facts_dir.exists():
             continue
 
         for vid in video_ids:
-            orig_path = ORIGINAL_FACTS_DIR / f"atomic_facts_{vid:02d}.txt"
+            orig = originals.source('facts', vid)
             new_path = new_facts_dir / f"atomic_facts_{vid:02d}.txt"
-            result = compare_atomic_facts(orig_path, new_path)
+            if orig is None or not new_path.exists():
+                continue
+            orig_input, orig_text = orig
+            result = cache.get_or_compute(
+                'atomic_facts', vid, model_label,
+                inputs=[orig_input, new_path], code=facts_code,
+                compute=lambda: compare_atomic_facts(orig_text(), new_path.read_text()),
+            )
             if result:
+                for m in result.pop('matches'):
+                    match_rows.append({'video_id': vid, 'model': model_label, **m})
                 result['video_id'] = vid
                 result['model'] = model_label
                 facts_rows.append(result)
@@ -246,6 +382,7 @@ def main():
     if facts_rows:
         facts_df = pd.DataFrame(facts_rows)
         facts_df.to_csv(COMPARISON_DIR / 'facts_comparison.csv', index=False)
+        pd.DataFrame(match_rows).to_csv(COMPARISON_DIR / 'fact_matches.csv', index=False)
 
         print("\n  Atomic facts comparison:")
         for model_label in model_labels:
@@ -255,6 +392,46 @@ def main():
                 print(f"      Fact retention: {subset['fact_retention_rate'].mean():.3f}")
                 print(f"      Fact count diff: {subset['fact_count_diff'].mean():+.1f}")
 
+    # ============================================================
+    # 2b. Speaker swaps between original and re-diarized transcripts
+    # ============================================================
+    print("\n2b. Counting speaker swaps...")
+
+    swaps_code = code_version(count_speaker_swaps, ParsedTranscript)
+    swap_rows = []
+    for model_label in model_labels:
+        for vid in video_ids:
+            orig_path = ORIGINAL_TRANSCRIPTS_DIR / f"transcript_{vid:02d}.json"
+            new_path = NEW_TRANSCRIPTS_DIR / model_label / f"transcript_{vid:02d}.json"
+            if not orig_path.exists() or not new_path.exists():
+                continue
+            result = cache.get_or_compute(
+                'speaker_swaps', vid, model_label,
+                inputs=[orig_path, new_path], code=swaps_code,
+                compute=lambda: count_speaker_swaps(load_transcript(orig_path),
+                                                    load_transcript(new_path)),
+            )
+            result['swapped_segments'] = ';'.join(map(str, result['swapped_segments']))
+            swap_rows.append({'video_id': vid, 'model': model_label, **result})
+
+    swaps_df = pd.DataFrame(swap_rows)
+    if len(swaps_df) > 0:
+        swaps_df.to_csv(COMPARISON_DIR / 'speaker_swaps.csv', index=False)
+        for model_label in model_labels:
+            subset = swaps_df[swaps_df['model'] == model_label]
+            if len(subset) > 0:
+                print(f"\n    {model_label}:")
+                print(f"      Swapped segments: {subset['n_swapped'].sum()}/"
+                      f"{subset['n_aligned'].sum()} "
+                      f"(mean swap rate {subset['swap_rate'].mean():.3f})")
+                print(f"      Swapped speech: {subset['swapped_duration'].sum():.0f}s "
+                      f"({subset['swapped_duration_rate'].mean():.1%} of overlapping time)")
+    else:
+        print("  No re-diarized transcripts — run 01_rediarize.py first")
+
+    cache.save()
+    print(f"\n  Result cache: {cache.summary()}")
+
     # ============================================================
     # 3. Predicted accuracy improvement from error taxonomy
     # ============================================================
@@ -286,6 +463,25 @@ def main():
             print(f"  → Potential accuracy improvement: +{potential_fix:.3f} ({potential_fix/orig_inaccuracy:.1%} of errors)")
             print(f"  → Inaccuracy STILL {predicted_inaccuracy/original['mean_hallucination'].mean():.1f}× hallucination rate")
 
+            # Power: how many videos must be re-coded to detect a partial fix?
+            noise_sd = (args.power_noise_sd if args.power_noise_sd is not None
+                        else estimate_noise_sd(original))
+            power_df = simulate_power(
+                original['mean_inaccuracy'], estimate['diarization_error_fraction'],
+                noise_sd=noise_sd, n_simulations=args.power_sims, rng=args.seed,
+            )
+            power_df.to_csv(COMPARISON_DIR / 'power_curves.csv', index=False)
+            plot_power_curves(power_df, noise_sd, COMPARISON_DIR / 'power_curves')
+
+            print(f"\n  Power analysis ({args.power_sims} simulated studies per cell, "
+                  f"noise SD = {noise_sd:.3f}):")
+            for fix, n_needed in required_sample_size(power_df).items():
+                needed = f"{int(n_needed)} videos" if pd.notna(n_needed) else \
+                    f"> {power_df['n_videos'].max()} videos"
+                print(f"    {fix:.0%} of misattributions fixed: {needed} for "
+                      f"{TARGET_POWER:.0%} power")
+            print(f"  Saved power_curves.csv / power_curves.pdf")
+
     # ============================================================
     # 4. If human-coded data for new narratives is available
     # ============================================================
@@ -305,6 +501,7 @@ def main():
 
         if len(comparison) > 0:
             # Paired t-test on accuracy
+            from scipy import stats
             t_stat, p_val = stats.ttest_rel(
                 comparison['mean_accuracy_new'],
                 comparison['mean_accuracy_orig']
@@ -326,7 +523,23 @@ def main():
                     improvement = subset['mean_accuracy_new'].mean() - subset['mean_accuracy_orig'].mean()
                     print(f"    {etype}: {improvement:+.3f}")
 
+            # Bootstrap CIs + permutation tests for every coded rate
+            metrics = [m for m in ('mean_accuracy', 'mean_inaccuracy', 'mean_hallucination')
+                       if f'{m}_orig' in comparison.columns and f'{m}_new' in comparison.columns]
+            group_col = 'error_type_orig' if 'error_type_orig' in comparison.columns else None
+            resampled = resample_paired_metrics(comparison, metrics, args.n_resamples,
+                                                args.seed, group_col)
+            if len(resampled) > 0:
+                resampled.to_csv(COMPARISON_DIR / 'paired_resampling.csv', index=False)
+                print(f"\n  Resampling ({args.n_resamples:,} bootstrap resamples, "
+                      f"{resampled['permutation_method'].iloc[0]} permutation test):")
+                for _, r in resampled[resampled['group'] == 'all'].iterrows():
+                    print(f"    {r['metric']}: {r['delta']:+.3f} "
+                          f"[95% CI {r['ci_low']:+.3f}, {r['ci_high']:+.3f}], "
+                          f"p_perm={r['p_permutation']:.4f}")
+
             # Generate comparison figure
+            plt = _pyplot()
             fig, axes = plt.subplots(1, 3, figsize=(15, 5))
 
             # Panel A: Paired accuracy
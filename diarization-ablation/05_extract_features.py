@@ -0,0 +1,238 @@
+#!/usr/bin/env python3
+"""
+Step 5: Extract transcript features for every video and transcript variant.
+
+For the original WhisperX transcripts and each re-diarized model, computes per
+(video, model):
+  - n_segments, n_speakers (excluding UNKNOWN), n_turns (runs of consecutive
+    segments by the same speaker)
+  - total_transcript_words, transcript_duration_sec (first start to last end),
+    speech_sec (time covered by at least one segment)
+  - speech_rate_wpm (words per minute of speech)
+  - overlap_ratio (share of speech time covered by two or more segments)
+  - speaker_entropy (bits, over each speaker's share of speaking time)
+  - n_atomic_facts (non-empty lines of the matching atomic-facts file)
+
+All transcripts are concatenated into one segment table and every feature is a
+grouped array operation over it (bincount / groupby per transcript), so
+the cost is one pass over the segments regardless of how many variants exist.
+Speech and overlap time come from a single coverage sweep over the segment
+start/end events of all transcripts.
+
+Writes comparison/transcript_features.csv (one row per video x model) and joins
+the features of the original transcripts onto results/merged_analysis.csv,
+replacing those columns and keeping every other column.
+
+Usage:
+    python 05_extract_features.py
+    python 05_extract_features.py --no-merge
+    python 05_extract_features.py --merged path/to/merged_analysis.csv
+"""
+
+import argparse
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from config import (
+    AUDIO_DIR, ORIGINAL_TRANSCRIPTS_DIR, ORIGINAL_FACTS_DIR,
+    NEW_TRANSCRIPTS_DIR, NEW_FACTS_DIR, COMPARISON_DIR, PROJECT_ROOT,
+    DIARIZATION_MODELS, VIDEO_SUBSET
+)
+from transcripts import NON_SPEAKERS, load_transcript
+
+ORIGINAL_MODEL = 'original-whisperx'
+
+FEATURES = [
+    'n_segments', 'n_speakers', 'n_turns', 'total_transcript_words',
+    'transcript_duration_sec', 'speech_sec', 'speech_rate_wpm',
+    'overlap_ratio', 'speaker_entropy', 'n_atomic_facts',
+]
+# Written as integers (missing stays empty) in merged_analysis.csv
+COUNT_FEATURES = ['n_segments', 'n_speakers', 'n_turns', 'total_transcript_words',
+                  'n_atomic_facts']
+
+
+def transcript_variants(video_ids, model_labels):
+    """(video_id, model, transcript_path, facts_path) for every existing transcript."""
+    sources = [(ORIGINAL_MODEL, ORIGINAL_TRANSCRIPTS_DIR, ORIGINAL_FACTS_DIR)]
+    sources += [(label, NEW_TRANSCRIPTS_DIR / label, NEW_FACTS_DIR / label)
+                for label in model_labels]
+    variants = []
+    for model, trans_dir, facts_dir in sources:
+        for vid in video_ids:
+            trans_path = trans_dir / f"transcript_{vid:02d}.json"
+            if trans_path.exists():
+                variants.append((vid, model, trans_path,
+                                 facts_dir / f"atomic_facts_{vid:02d}.txt"))
+    return variants
+
+
+def segment_table(transcripts):
+    """
+    All segments of all transcripts as one DataFrame sorted by (transcript,
+    start), with columns t (transcript index), start, end, speaker, words.
+    """
+    lengths = [len(tr) for tr in transcripts]
+    segments = [seg for tr in transcripts for seg in tr]
+    table = pd.DataFrame({
+        't': np.repeat(np.arange(len(transcripts)), lengths),
+        'start': np.array([seg['start'] for seg in segments], dtype=float),
+        'end': np.array([seg['end'] for seg in segments], dtype=float),
+        'speaker': [seg.get('speaker', 'UNKNOWN') or '' for seg in segments],
+        'words': np.array([len((seg.get('text') or '').split()) for seg in segments],
+                          dtype=int),
+    })
+    return table.sort_values(['t', 'start'], kind='stable', ignore_index=True)
+
+
+def transcript_features(transcripts):
+    """Feature rows (DataFrame, one per transcript, same order) of parsed JSON transcripts."""
+    n = len(transcripts)
+    seg = segment_table(transcripts)
+    t = seg['t'].to_numpy()
+    start, end = seg['start'].to_numpy(), seg['end'].to_numpy()
+    duration = np.clip(end - start, 0, None)
+
+    n_segments = np.bincount(t, minlength=n)
+    words = np.bincount(t, weights=seg['words'].to_numpy(float), minlength=n)
+
+    # Coverage sweep: +1 at each segment start, -1 at each end (ends first on
+    # ties), sorted by (transcript, time). The running sum is the number of
+    # segments active until the next event; each transcript nets to zero.
+    ev_t = np.concatenate([t, t])
+    ev_time = np.concatenate([start, np.maximum(start, end)])
+    ev_delta = np.concatenate([np.ones(len(seg)), -np.ones(len(seg))])
+    order = np.lexsort((ev_delta, ev_time, ev_t))
+    ev_t, ev_time, depth = ev_t[order], ev_time[order], np.cumsum(ev_delta[order])
+    gap = np.diff(ev_time, append=ev_time[-1:]) * (np.diff(ev_t, append=-1) == 0)
+    speech = np.bincount(ev_t, weights=gap * (depth >= 1), minlength=n)
+    overlap = np.bincount(ev_t, weights=gap * (depth >= 2), minlength=n)
+
+    first = seg.groupby('t')['start'].min().reindex(range(n)).to_numpy()
+    last = seg.groupby('t')['end'].max().reindex(range(n)).to_numpy()
+
+    # Turns: segments whose speaker differs from the previous segment's
+    real = ~seg['speaker'].isin(NON_SPEAKERS).to_numpy()
+    spk = seg['speaker'].to_numpy()
+    new_turn = np.ones(len(seg), dtype=bool)
+    new_turn[1:] = (t[1:] != t[:-1]) | (spk[1:] != spk[:-1])
+    n_turns = np.bincount(t[new_turn & real], minlength=n)
+
+    # Speaking time per (transcript, speaker) -> speaker count and entropy
+    talk = (pd.DataFrame({'t': t[real], 'speaker': spk[real], 'sec': duration[real]})
+            .groupby(['t', 'speaker'])['sec'].sum())
+    share = talk / talk.groupby(level='t').transform('sum')
+    entropy = (-(share * np.log2(share.where(share > 0))).groupby(level='t').sum())
+    n_speakers = talk.groupby(level='t').size()
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return pd.DataFrame({
+            'n_segments': n_segments,
+            'n_speakers': n_speakers.reindex(range(n), fill_value=0).to_numpy(),
+            'n_turns': n_turns,
+            'total_transcript_words': words.astype(int),
+            'transcript_duration_sec': np.nan_to_num(last - first),
+            'speech_sec': speech,
+            'speech_rate_wpm': np.where(speech > 0, words / (speech / 60), np.nan),
+            'overlap_ratio': np.where(speech > 0, overlap / speech, np.nan),
+            'speaker_entropy': entropy.reindex(range(n), fill_value=0.0).to_numpy(),
+        })
+
+
+def count_facts(path):
+    """Non-empty lines of an atomic-facts file (NaN if it does not exist)."""
+    if not path.exists():
+        return np.nan
+    with open(path) as f:
+        return sum(1 for line in f if line.strip())
+
+
+def merge_features(merged_path, features):
+    """
+    Replace the feature columns of merged_analysis.csv with the original
+    transcripts' features (matched on the video number); other columns and
+    the row order are kept.
+    """
+    merged = pd.read_csv(merged_path, dtype={'video_id': str})
+    original = (features[features['model'] == ORIGINAL_MODEL]
+                .drop(columns='model').set_index('video_id'))
+    video_num = merged['video_id'].str.extract(r'(\d+)', expand=False).astype(int)
+
+    for col in FEATURES:
+        values = video_num.map(original[col])
+        if col in merged.columns:
+            # Keep the existing value where there is no transcript
+            merged[col] = values.where(values.notna(), merged[col])
+        else:
+            merged[col] = values
+    for col in COUNT_FEATURES:
+        merged[col] = merged[col].round().astype('Int64')
+    tmp = merged_path.with_suffix('.tmp')
+    merged.to_csv(tmp, index=False)
+    tmp.replace(merged_path)
+    return int(video_num.isin(original.index).sum()), len(merged)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract transcript features per video and model")
+    parser.add_argument('--merged', type=str, default=None,
+                        help="merged_analysis.csv to join the original transcripts' "
+                             "features onto (default: ../results/merged_analysis.csv, as for "
+                             "generate_paper_figures.py)")
+    parser.add_argument('--no-merge', action='store_true',
+                        help="Only write comparison/transcript_features.csv")
+    args = parser.parse_args()
+
+    COMPARISON_DIR.mkdir(parents=True, exist_ok=True)
+
+    video_ids = sorted([
+        int(f.stem.replace("audio_", ""))
+        for f in AUDIO_DIR.glob("audio_*.mp3")
+    ])
+    if VIDEO_SUBSET is not None:
+        video_ids = [v for v in video_ids if v in VIDEO_SUBSET]
+    model_labels = [label for label, _ in DIARIZATION_MODELS]
+
+    variants = transcript_variants(video_ids, model_labels)
+    if not variants:
+        print("No transcripts found")
+        return
+    print(f"Extracting features from {len(variants)} transcripts "
+          f"({len(video_ids)} videos x {1 + len(model_labels)} variants)...")
+
+    # ============================================================
+    # 1. One pass over all segments of all transcripts
+    # ============================================================
+    transcripts = [load_transcript(trans_path) for _, _, trans_path, _ in variants]
+    features = transcript_features(transcripts)
+    features.insert(0, 'video_id', [vid for vid, *_ in variants])
+    features.insert(1, 'model', [model for _, model, *_ in variants])
+    features['n_atomic_facts'] = [count_facts(facts_path) for *_, facts_path in variants]
+
+    out_path = COMPARISON_DIR / 'transcript_features.csv'
+    features.to_csv(out_path, index=False)
+    print(f"  Saved {out_path} ({len(features)} rows)")
+
+    summary = features.groupby('model')[['n_speakers', 'n_turns', 'overlap_ratio',
+                                         'speaker_entropy']].mean()
+    print("\n  Mean features by model:")
+    print(summary.round(3).to_string())
+
+    # ============================================================
+    # 2. Join onto merged_analysis.csv
+    # ============================================================
+    if args.no_merge:
+        return
+    merged_path = (Path(args.merged) if args.merged
+                   else PROJECT_ROOT.parent / "results" / "merged_analysis.csv")
+    if not merged_path.exists():
+        print(f"\n  {merged_path} not found, skipping the merge")
+        return
+    n_matched, n_rows = merge_features(merged_path, features)
+    print(f"\n  Updated {merged_path}: features for {n_matched}/{n_rows} videos")
+
+
+if __name__ == "__main__":
+    main()
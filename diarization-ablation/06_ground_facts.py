@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Step 6: Ground every atomic fact in the transcript it was generated from.
+
+For the original WhisperX pipeline and each re-diarized model, each video's
+transcript is indexed with BM25 (see grounding.py) and all facts of the
+matching atomic-facts file are scored against all its segments in one sparse
+matrix product. The top-k segments per fact are kept, with their speaker
+label and time span, so e.g. a fact attributed to the officer can be checked
+against who actually said the supporting line.
+
+Writes comparison/fact_grounding.csv (one row per video x model x fact x
+rank). With --taxonomy, the match_text / match_score / match_speaker columns
+of an error-taxonomy CSV (e.g. results/grounded_error_taxonomy.csv) are
+replaced by the top-1 grounding of the original pipeline's facts.
+
+Usage:
+    python 06_ground_facts.py
+    python 06_ground_facts.py --top-k 5
+    python 06_ground_facts.py --taxonomy ../../results/grounded_error_taxonomy.csv
+"""
+
+import argparse
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from config import (
+    AUDIO_DIR, ORIGINAL_TRANSCRIPTS_DIR, ORIGINAL_FACTS_DIR,
+    NEW_TRANSCRIPTS_DIR, NEW_FACTS_DIR, COMPARISON_DIR,
+    DIARIZATION_MODELS, VIDEO_SUBSET
+)
+from grounding import TOP_K, ground_facts
+from transcripts import load_transcript
+
+ORIGINAL_MODEL = 'original-whisperx'
+
+
+def read_facts(path):
+    """Non-empty, stripped lines of an atomic-facts file."""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def ground_variant(video_ids, model, trans_dir, facts_dir, k):
+    """Grounding rows of every video of one transcript variant."""
+    frames = []
+    for vid in video_ids:
+        trans_path = trans_dir / f"transcript_{vid:02d}.json"
+        facts_path = facts_dir / f"atomic_facts_{vid:02d}.txt"
+        if not trans_path.exists() or not facts_path.exists():
+            continue
+        facts = read_facts(facts_path)
+        matches = ground_facts(load_transcript(trans_path), facts, k)
+        matches.insert(0, 'video_id', vid)
+        matches.insert(1, 'model', model)
+        matches.insert(2, 'fact_id', matches.pop('query'))
+        matches.insert(3, 'fact_text', [facts[i] for i in matches['fact_id']])
+        frames.append(matches)
+    return frames
+
+
+def update_taxonomy(path, grounding):
+    """
+    Replace the match_* columns of a taxonomy CSV with the original pipeline's
+    top-1 grounding. Rows are matched by (video, fact_id), or by (video,
+    fact_text) when the taxonomy has no fact_id column.
+    """
+    taxonomy = pd.read_csv(path, dtype={'video_id': str})
+    top = grounding[(grounding['model'] == ORIGINAL_MODEL) & (grounding['rank'] == 1)]
+    video = taxonomy['video_id'].str.extract(r'(\d+)', expand=False).astype(int)
+    if 'fact_id' in taxonomy.columns:
+        top = top.set_index(['video_id', 'fact_id'])
+        key = pd.MultiIndex.from_arrays([video, taxonomy['fact_id'].astype(int)])
+    else:
+        # A fact text repeated within a video takes its first occurrence's match
+        top = (top.assign(fact_text=top['fact_text'].str.strip())
+               .drop_duplicates(['video_id', 'fact_text'])
+               .set_index(['video_id', 'fact_text']))
+        key = pd.MultiIndex.from_arrays([video, taxonomy['fact_text'].astype(str).str.strip()])
+    found = key.isin(top.index)
+    for col in ('match_score', 'match_text', 'match_speaker'):
+        values = top[col].reindex(key).to_numpy()
+        if col in taxonomy.columns:
+            taxonomy[col] = taxonomy[col].where(~found, values)
+        else:
+            taxonomy[col] = values
+    tmp = path.with_suffix('.tmp')
+    taxonomy.to_csv(tmp, index=False)
+    tmp.replace(path)
+    return int(found.sum()), len(taxonomy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ground atomic facts in transcript segments")
+    parser.add_argument('--top-k', type=int, default=TOP_K,
+                        help=f"Supporting segments kept per fact (default: {TOP_K})")
+    parser.add_argument('--taxonomy', type=str, default=None,
+                        help="Error-taxonomy CSV whose match_text/match_score/match_speaker "
+                             "columns to refresh from the original pipeline's grounding")
+    args = parser.parse_args()
+
+    COMPARISON_DIR.mkdir(parents=True, exist_ok=True)
+
+    video_ids = sorted([
+        int(f.stem.replace("audio_", ""))
+        for f in AUDIO_DIR.glob("audio_*.mp3")
+    ])
+    if VIDEO_SUBSET is not None:
+        video_ids = [v for v in video_ids if v in VIDEO_SUBSET]
+
+    sources = [(ORIGINAL_MODEL, ORIGINAL_TRANSCRIPTS_DIR, ORIGINAL_FACTS_DIR)]
+    sources += [(label, NEW_TRANSCRIPTS_DIR / label, NEW_FACTS_DIR / label)
+                for label, _ in DIARIZATION_MODELS]
+
+    start = time.perf_counter()
+    frames = []
+    for model, trans_dir, facts_dir in sources:
+        frames += ground_variant(video_ids, model, trans_dir, facts_dir, args.top_k)
+    if not frames:
+        print("No transcript / atomic-facts pairs found")
+        return
+    grounding = pd.concat(frames, ignore_index=True)
+
+    out_path = COMPARISON_DIR / 'fact_grounding.csv'
+    grounding.to_csv(out_path, index=False)
+    n_facts = grounding[['video_id', 'model', 'fact_id']].drop_duplicates().shape[0]
+    print(f"Grounded {n_facts} facts ({len(frames)} transcripts) in "
+          f"{time.perf_counter() - start:.2f}s")
+    print(f"  Saved {out_path} ({len(grounding)} rows)")
+
+    top1 = grounding[grounding['rank'] == 1]
+    print("\n  Top-1 match score by model:")
+    print(top1.groupby('model')['match_score'].describe()[['count', 'mean', '50%']]
+          .round(3).to_string())
+
+    if args.taxonomy:
+        taxonomy_path = Path(args.taxonomy)
+        n_found, n_rows = update_taxonomy(taxonomy_path, grounding)
+        print(f"\n  Updated {taxonomy_path}: grounding for {n_found}/{n_rows} facts")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Step 7: Find near-duplicate atomic facts across all videos and models.
+
+Fact lists repeat themselves ("the registration was revoked" next to "the
+registration was suspended"), and a re-diarized model mostly regenerates the
+facts of the original pipeline. All facts of the original pipeline and of
+every re-diarized model are clustered in one pass with MinHash + LSH (see
+near_duplicates.py), so near-duplicates are found in roughly linear time
+instead of comparing every pair of facts.
+
+Writes:
+    comparison/fact_clusters.csv     one row per video x model x fact, with its
+                                     cluster and how many facts, models and
+                                     videos the cluster spans
+    comparison/fact_redundancy.csv   per model: facts, distinct facts within
+                                     each list, redundancy rate, and the share
+                                     of facts that recur in the original
+                                     pipeline's list for the same video
+
+and prints how many distinct (video, cluster) units a coder would have to
+label instead of every fact of every variant.
+
+Usage:
+    python 07_dedupe_facts.py
+    python 07_dedupe_facts.py --threshold 0.6
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from config import (
+    AUDIO_DIR, ORIGINAL_FACTS_DIR, NEW_FACTS_DIR, COMPARISON_DIR,
+    DIARIZATION_MODELS, VIDEO_SUBSET
+)
+from near_duplicates import THRESHOLD, near_duplicate_clusters
+
+ORIGINAL_MODEL = 'original-whisperx'
+
+
+def read_facts(path):
+    """Non-empty, stripped lines of an atomic-facts file."""
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def collect_facts(video_ids, sources):
+    """One row per (video_id, model, fact_id, fact_text) over all fact files found."""
+    rows = []
+    for model, facts_dir in sources:
+        for vid in video_ids:
+            path = facts_dir / f"atomic_facts_{vid:02d}.txt"
+            if path.exists():
+                rows += [(vid, model, i, fact) for i, fact in enumerate(read_facts(path))]
+    return pd.DataFrame(rows, columns=['video_id', 'model', 'fact_id', 'fact_text'])
+
+
+def redundancy_summary(facts):
+    """Per-model redundancy within fact lists and overlap with the original pipeline."""
+    per_list = facts.groupby(['model', 'video_id'])['cluster']
+    facts = facts.assign(
+        # More than one fact of the same list in the cluster
+        redundant=per_list.transform(lambda c: c.duplicated(keep=False)),
+    )
+    original = facts.loc[facts['model'] == ORIGINAL_MODEL, ['video_id', 'cluster']]
+    shared = pd.MultiIndex.from_frame(original.drop_duplicates())
+    facts['in_original'] = pd.MultiIndex.from_frame(facts[['video_id', 'cluster']]).isin(shared)
+
+    summary = facts.groupby('model').agg(
+        n_videos=('video_id', 'nunique'),
+        n_facts=('fact_id', 'size'),
+        redundant_facts=('redundant', 'sum'),
+        shared_with_original=('in_original', 'mean'),
+    )
+    summary['n_distinct'] = facts.groupby('model').apply(
+        lambda g: g[['video_id', 'cluster']].drop_duplicates().shape[0])
+    summary['redundancy_rate'] = summary['redundant_facts'] / summary['n_facts']
+    summary.loc[summary.index == ORIGINAL_MODEL, 'shared_with_original'] = float('nan')
+    return summary[['n_videos', 'n_facts', 'n_distinct', 'redundant_facts',
+                    'redundancy_rate', 'shared_with_original']].reset_index()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cluster near-duplicate atomic facts (MinHash LSH)")
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help=f"Estimated shingle Jaccard at which two facts count as "
+                             f"near-duplicates (default: {THRESHOLD})")
+    args = parser.parse_args()
+
+    COMPARISON_DIR.mkdir(parents=True, exist_ok=True)
+
+    video_ids = sorted([
+        int(f.stem.replace("audio_", ""))
+        for f in AUDIO_DIR.glob("audio_*.mp3")
+    ])
+    if VIDEO_SUBSET is not None:
+        video_ids = [v for v in video_ids if v in VIDEO_SUBSET]
+
+    sources = [(ORIGINAL_MODEL, ORIGINAL_FACTS_DIR)]
+    sources += [(label, NEW_FACTS_DIR / label) for label, _ in DIARIZATION_MODELS]
+
+    facts = collect_facts(video_ids, sources)
+    if facts.empty:
+        print("No atomic-facts files found")
+        return
+
+    start = time.perf_counter()
+    labels, (_, _, similarity) = near_duplicate_clusters(facts['fact_text'].tolist(),
+                                                         threshold=args.threshold)
+    elapsed = time.perf_counter() - start
+    facts['cluster'] = labels
+    clusters = facts.groupby('cluster')
+    facts['cluster_size'] = clusters['fact_id'].transform('size')
+    facts['cluster_models'] = clusters['model'].transform('nunique')
+    facts['cluster_videos'] = clusters['video_id'].transform('nunique')
+
+    out_path = COMPARISON_DIR / 'fact_clusters.csv'
+    facts.to_csv(out_path, index=False)
+    n_clusters = facts['cluster'].nunique()
+    print(f"Clustered {len(facts)} facts into {n_clusters} near-duplicate clusters "
+          f"({len(similarity)} verified pairs) in {elapsed:.2f}s")
+    print(f"  Saved {out_path}")
+
+    summary = redundancy_summary(facts)
+    summary_path = COMPARISON_DIR / 'fact_redundancy.csv'
+    summary.to_csv(summary_path, index=False)
+    print(f"  Saved {summary_path}")
+    print("\n  Redundancy by model:")
+    print(summary.round(3).to_string(index=False))
+
+    units = facts[['video_id', 'cluster']].drop_duplicates().shape[0]
+    print(f"\n  Coding work: {units} distinct (video, cluster) units instead of "
+          f"{len(facts)} facts ({1 - units / len(facts):.1%} fewer)")
+
+
+if __name__ == "__main__":
+    main()
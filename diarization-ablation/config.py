@@ -24,6 +24,7 @@ NEW_TRANSCRIPTS_DIR = OUTPUT_DIR / "transcripts"
 NEW_NARRATIVES_DIR = OUTPUT_DIR / "narratives"
 NEW_FACTS_DIR = OUTPUT_DIR / "atomic_facts"
 COMPARISON_DIR = OUTPUT_DIR / "comparison"
+CACHE_DIR = OUTPUT_DIR / "cache"  # per-(video, model, metric) result cache for 03/04
 
 # ============================================================
 # API KEYS
@@ -0,0 +1,125 @@
+"""
+One-to-one fuzzy alignment of atomic facts between two fact lists.
+
+The old approach scored every original x new pair with SequenceMatcher.ratio()
+and let one new fact match any number of originals. Here candidate pairs are
+pruned with cheap upper bounds before any full ratio() is computed:
+
+1. Character n-gram blocking: only pairs sharing at least one trigram are
+   considered (short facts bypass blocking and are compared with everything).
+2. Length bound: ratio() <= 2 * min(len) / (len_a + len_b).
+3. SequenceMatcher.real_quick_ratio() and quick_ratio(), both upper bounds on
+   ratio().
+
+Surviving pairs above the threshold are then assigned optimally one-to-one
+with the Hungarian algorithm, cardinality first: every admissible pair gets a
+bonus larger than any total similarity, so the assignment matches as many
+facts as possible and, among those, maximises the total similarity.
+(Maximising the similarity alone could prefer two pairs at 1.0 to three at
+0.85.)
+"""
+
+from collections import defaultdict
+from difflib import SequenceMatcher
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+MATCH_THRESHOLD = 0.8
+NGRAM = 3
+# Facts shorter than this are not blocked on n-grams (too few to be reliable)
+MIN_BLOCKING_LENGTH = 4 * NGRAM
+
+
+def _ngrams(text, n=NGRAM):
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def candidate_pairs(orig, new, threshold=MATCH_THRESHOLD):
+    """
+    Pairs (i, j) that survive n-gram blocking and the length-ratio bound.
+
+    orig, new: lists of already-normalised fact strings.
+    """
+    index = defaultdict(list)
+    short_new = []
+    for j, text in enumerate(new):
+        if len(text) < MIN_BLOCKING_LENGTH:
+            short_new.append(j)
+        for gram in _ngrams(text):
+            index[gram].append(j)
+
+    len_new = np.array([len(t) for t in new])
+    pairs = []
+    for i, text in enumerate(orig):
+        if len(text) < MIN_BLOCKING_LENGTH:
+            cands = range(len(new))
+        else:
+            cands = set(short_new)
+            for gram in _ngrams(text):
+                cands.update(index.get(gram, ()))
+        la = len(text)
+        for j in cands:
+            lb = len_new[j]
+            if la + lb == 0 or 2 * min(la, lb) / (la + lb) > threshold:
+                pairs.append((i, j))
+    return pairs
+
+
+def score_candidates(orig, new, pairs, threshold=MATCH_THRESHOLD):
+    """
+    Similarity matrix (n_orig x n_new) holding ratio() for candidate pairs
+    that exceed the threshold, 0 elsewhere.
+
+    Pairs are grouped by new fact so SequenceMatcher analyses each new fact
+    (its seq2) only once.
+    """
+    scores = np.zeros((len(orig), len(new)))
+    by_new = defaultdict(list)
+    for i, j in pairs:
+        by_new[j].append(i)
+
+    matcher = SequenceMatcher(None)
+    for j, rows in by_new.items():
+        matcher.set_seq2(new[j])
+        for i in rows:
+            matcher.set_seq1(orig[i])
+            if matcher.real_quick_ratio() <= threshold:
+                continue
+            if matcher.quick_ratio() <= threshold:
+                continue
+            ratio = matcher.ratio()
+            if ratio > threshold:
+                scores[i, j] = ratio
+    return scores
+
+
+def match_facts(orig_facts, new_facts, threshold=MATCH_THRESHOLD):
+    """
+    Optimal one-to-one fuzzy matching of two fact lists.
+
+    Returns a list of (orig_index, new_index, score) tuples, sorted by
+    orig_index, for matched pairs with similarity above `threshold`.
+    """
+    orig = [f.lower() for f in orig_facts]
+    new = [f.lower() for f in new_facts]
+    if not orig or not new:
+        return []
+
+    scores = score_candidates(orig, new, candidate_pairs(orig, new, threshold), threshold)
+    rows_used = np.flatnonzero(scores.any(axis=1))
+    cols_used = np.flatnonzero(scores.any(axis=0))
+    if len(rows_used) == 0:
+        return []
+
+    sub = scores[np.ix_(rows_used, cols_used)]
+    # Scores are <= 1, so a bonus above the largest possible match count makes
+    # one more pair worth more than any difference in total similarity
+    bonus = min(sub.shape) + 1
+    row_ind, col_ind = linear_sum_assignment(np.where(sub > 0, sub + bonus, 0.0),
+                                             maximize=True)
+    matches = [
+        (int(rows_used[r]), int(cols_used[c]), float(sub[r, c]))
+        for r, c in zip(row_ind, col_ind) if sub[r, c] > threshold
+    ]
+    return sorted(matches)
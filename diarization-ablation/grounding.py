@@ -0,0 +1,148 @@
+"""
+Grounding atomic facts in transcript segments with a sparse BM25 index.
+
+For one transcript, every segment becomes a row of a sparse (segments x terms)
+matrix of BM25 term weights,
+
+    w(t, s) = idf(t) * tf(t, s) * (k1 + 1) / (tf(t, s) + k1 * (1 - b + b * len(s) / avg_len))
+    idf(t)  = log(1 + (N - df(t) + 0.5) / (df(t) + 0.5)),
+
+and the facts of the video become a sparse (facts x terms) matrix of query
+term indicators. All BM25 scores are then a single sparse product
+facts x segments, from which the top-k segments per fact are taken with one
+stable row-wise sort (ties go to the earlier segment), instead of scoring
+every (fact, segment) pair in Python.
+
+Scores are also reported normalised to [0, 1]: divided by the largest score
+the fact could reach, sum over its distinct terms of idf(t) * (k1 + 1), where
+a term that never occurs in the transcript gets the idf of an unseen term. A
+fact whose words all occur in one short segment scores close to 1; one whose
+words are not said anywhere scores 0.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from text_metrics import tokenize
+from transcripts import ParsedTranscript
+
+K1 = 1.5
+B = 0.75
+TOP_K = 3
+
+
+class SegmentIndex:
+    """
+    BM25 index over the segments of one transcript.
+
+    Attributes:
+        weights:   (n_segments, n_terms) CSR matrix of BM25 term weights
+        vocab:     term -> column
+        idf:       idf of each column
+        idf_unseen: idf of a term that occurs in no segment
+        texts, speakers, starts, ends: per-segment data, in index order
+    """
+
+    def __init__(self, texts, speakers=None, starts=None, ends=None, k1=K1, b=B):
+        n = len(texts)
+        self.texts = list(texts)
+        self.speakers = list(speakers) if speakers is not None else [''] * n
+        self.starts = np.asarray(starts if starts is not None else np.full(n, np.nan), dtype=float)
+        self.ends = np.asarray(ends if ends is not None else np.full(n, np.nan), dtype=float)
+        self.k1 = k1
+
+        tokens = [tokenize(text) for text in self.texts]
+        self.vocab = {}
+        cols = np.array([self.vocab.setdefault(tok, len(self.vocab))
+                         for toks in tokens for tok in toks], dtype=np.int64)
+        lengths = np.array([len(toks) for toks in tokens], dtype=np.int64)
+        rows = np.repeat(np.arange(n), lengths)
+
+        # Term frequencies: duplicate (row, col) entries are summed
+        tf = sparse.csr_matrix((np.ones(len(cols)), (rows, cols)),
+                               shape=(n, len(self.vocab)))
+        tf.sum_duplicates()
+        df = np.bincount(tf.indices, minlength=len(self.vocab))
+        self.idf = np.log1p((n - df + 0.5) / (df + 0.5))
+        self.idf_unseen = float(np.log1p((n + 0.5) / 0.5))
+
+        avg_len = lengths.mean() if n and lengths.sum() else 1.0
+        norm = k1 * (1 - b + b * lengths / avg_len)
+        entry_rows = np.repeat(np.arange(n), np.diff(tf.indptr))
+        tf.data = (self.idf[tf.indices] * tf.data * (k1 + 1)
+                   / (tf.data + norm[entry_rows]))
+        self.weights = tf
+
+    @classmethod
+    def from_transcript(cls, transcript, **kw):
+        """Index a transcript JSON ([{start, end, text, speaker}, ...]) or ParsedTranscript."""
+        parsed = (transcript if isinstance(transcript, ParsedTranscript)
+                  else ParsedTranscript(transcript))
+        speakers = [parsed.labels[c] for c in parsed.codes]
+        return cls(parsed.texts, speakers, parsed.starts, parsed.ends, **kw)
+
+    def __len__(self):
+        return self.weights.shape[0]
+
+    def query_matrix(self, queries):
+        """
+        (n_queries, n_terms) CSR indicator matrix of the queries' distinct
+        known terms, and each query's largest attainable score.
+        """
+        rows, cols, best = [], [], np.zeros(len(queries))
+        for q, text in enumerate(queries):
+            terms = set(tokenize(text))
+            known = [self.vocab[t] for t in terms if t in self.vocab]
+            rows += [q] * len(known)
+            cols += known
+            best[q] = (self.idf[known].sum()
+                       + self.idf_unseen * (len(terms) - len(known))) * (self.k1 + 1)
+        matrix = sparse.csr_matrix((np.ones(len(cols)), (rows, cols)),
+                                   shape=(len(queries), len(self.vocab)))
+        return matrix, best
+
+    def scores(self, queries):
+        """(n_queries, n_segments) BM25 scores and the same normalised to [0, 1]."""
+        matrix, best = self.query_matrix(queries)
+        raw = (matrix @ self.weights.T).toarray()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            normalised = np.where(best[:, None] > 0, raw / best[:, None], 0.0)
+        return raw, normalised
+
+    def top_k(self, queries, k=TOP_K):
+        """
+        The k best-scoring segments per query, one row each: query, rank,
+        segment, score, match_score (normalised), match_text, match_speaker,
+        match_start, match_end. Segments scoring 0 are left out.
+        """
+        columns = ['query', 'rank', 'segment', 'score', 'match_score', 'match_text',
+                   'match_speaker', 'match_start', 'match_end']
+        if not len(queries) or not len(self):
+            return pd.DataFrame(columns=columns)
+        raw, normalised = self.scores(queries)
+        k = min(k, raw.shape[1])
+        # Stable sort: ties (also at the k-th place) go to the earlier segment
+        best = np.argsort(-raw, axis=1, kind='stable')[:, :k]
+
+        query = np.repeat(np.arange(len(queries)), k)
+        segment = best.ravel()
+        score = raw[query, segment]
+        keep = score > 0
+        query, segment, score = query[keep], segment[keep], score[keep]
+        return pd.DataFrame({
+            'query': query,
+            'rank': np.tile(np.arange(1, k + 1), len(queries))[keep],
+            'segment': segment,
+            'score': score,
+            'match_score': normalised[query, segment],
+            'match_text': [self.texts[s] for s in segment],
+            'match_speaker': [self.speakers[s] for s in segment],
+            'match_start': self.starts[segment],
+            'match_end': self.ends[segment],
+        }, columns=columns)
+
+
+def ground_facts(transcript, facts, k=TOP_K):
+    """Top-k supporting segments of each fact (see SegmentIndex.top_k; query = fact index)."""
+    return SegmentIndex.from_transcript(transcript).top_k(facts, k)
@@ -0,0 +1,167 @@
+"""
+Near-duplicate detection for atomic facts with MinHash and LSH.
+
+Comparing every fact with every other fact of the corpus (all videos, all
+model variants) is quadratic. Instead:
+
+1. Each fact is normalised (lower-cased word tokens, see text_metrics) and cut
+   into overlapping character k-grams ("shingles"). All shingles of all facts
+   are hashed at once with a polynomial rolling hash over one byte buffer.
+2. MinHash: for each of NUM_PERM random hash functions
+   h(x) = ((a * x + b) mod (2^61 - 1)) mod 2^32, a fact's signature entry is
+   the minimum over its shingles (np.minimum.reduceat). Two facts agree on an entry with
+   probability equal to the Jaccard similarity of their shingle sets.
+3. LSH: the signature is split into BANDS bands of NUM_PERM / BANDS rows;
+   facts that agree on a whole band share a bucket and become candidate
+   pairs. Pairs with Jaccard s are found with probability 1 - (1 - s^r)^b, so
+   near-duplicates are (almost) always candidates and dissimilar facts
+   (almost) never are.
+4. Candidates are kept if their signature agreement (the estimated Jaccard)
+   is at least `threshold`; clusters are the connected components.
+
+Identical normalised texts (the same fact in several variants) are collapsed
+before hashing, and buckets larger than MAX_BUCKET are linked to their first
+member only, so the work stays roughly linear in the number of facts.
+"""
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse.csgraph import connected_components
+
+from text_metrics import tokenize
+
+SHINGLE = 5
+NUM_PERM = 128
+BANDS = 32
+THRESHOLD = 0.7
+MAX_BUCKET = 64
+# Permutations hashed per pass, so (shingles x chunk) stays small
+PERM_CHUNK = 16
+
+_MERSENNE = np.uint64((1 << 61) - 1)
+_MASK32 = np.uint64(0xFFFFFFFF)
+_BASE = np.uint64(1099511628211)
+
+
+def normalise(text):
+    """Lower-cased word tokens joined by single spaces."""
+    return ' '.join(tokenize(text))
+
+
+def shingle_hashes(texts, k=SHINGLE):
+    """
+    32-bit hashes of the character k-grams of every text, and the index of
+    the text each belongs to (sorted by text). A text shorter than k is a
+    single shingle; every text has at least one.
+    """
+    encoded = [t.encode('utf-8') for t in texts]
+    lengths = np.array([len(e) for e in encoded], dtype=np.int64)
+    # One buffer, each text padded to at least k bytes so it has a window
+    padded = np.maximum(lengths, k)
+    buf = np.zeros(padded.sum(), dtype=np.uint64)
+    starts = np.concatenate([[0], np.cumsum(padded)[:-1]])
+    flat = np.frombuffer(b''.join(encoded), dtype=np.uint8).astype(np.uint64)
+    owner_bytes = np.repeat(np.arange(len(texts)), lengths)
+    offset = np.arange(len(flat)) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+    buf[starts[owner_bytes] + offset] = flat + np.uint64(1)
+
+    # Rolling polynomial hash of every window (uint64 arithmetic wraps)
+    powers = _BASE ** np.arange(k - 1, -1, -1, dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        windows = np.lib.stride_tricks.sliding_window_view(buf, k) @ powers
+    # Windows that start inside a text and end inside the same text
+    n_windows = padded - k + 1
+    owner = np.repeat(np.arange(len(texts)), n_windows)
+    first = np.concatenate([[0], np.cumsum(padded)[:-1]])
+    positions = (np.arange(n_windows.sum())
+                 - np.repeat(np.cumsum(n_windows) - n_windows, n_windows)
+                 + np.repeat(first, n_windows))
+    hashes = windows[positions]
+    hashes = (hashes ^ (hashes >> np.uint64(32))) & _MASK32
+    return hashes, owner
+
+
+class MinHasher:
+    """NUM_PERM universal hash functions, shared so signatures are comparable."""
+
+    def __init__(self, num_perm=NUM_PERM, seed=0):
+        rng = np.random.default_rng(seed)
+        self.a = rng.integers(1, int(_MERSENNE), num_perm, dtype=np.uint64)
+        self.b = rng.integers(0, int(_MERSENNE), num_perm, dtype=np.uint64)
+
+    @property
+    def num_perm(self):
+        return len(self.a)
+
+    def signatures(self, texts, k=SHINGLE):
+        """(n_texts, num_perm) MinHash signatures of the texts' k-shingles."""
+        hashes, owner = shingle_hashes(texts, k)
+        starts = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+        sig = np.empty((len(texts), self.num_perm), dtype=np.uint32)
+        for s in range(0, self.num_perm, PERM_CHUNK):
+            a, b = self.a[s:s + PERM_CHUNK], self.b[s:s + PERM_CHUNK]
+            # a * x + b wraps modulo 2^64; keeping the low 32 bits of the
+            # residue mixes the wrapped product well enough for min-wise hashing
+            with np.errstate(over='ignore'):
+                values = ((hashes[:, None] * a + b) % _MERSENNE) & _MASK32
+            sig[:, s:s + PERM_CHUNK] = np.minimum.reduceat(values, starts, axis=0)
+        return sig
+
+
+def lsh_candidates(signatures, bands=BANDS, max_bucket=MAX_BUCKET):
+    """Candidate pairs (i, j), i < j, that share a bucket in at least one band."""
+    n, num_perm = signatures.shape
+    rows = num_perm // bands
+    pairs = []
+    for band in range(bands):
+        block = np.ascontiguousarray(signatures[:, band * rows:(band + 1) * rows])
+        _, bucket = np.unique(block.view([('', block.dtype)] * rows).ravel(),
+                              return_inverse=True)
+        order = np.argsort(bucket, kind='stable')
+        bounds = np.flatnonzero(np.diff(bucket[order])) + 1
+        for members in np.split(order, bounds):
+            if len(members) < 2:
+                continue
+            if len(members) > max_bucket:
+                # Large bucket: link everything to its first member
+                pairs.append(np.column_stack([np.full(len(members) - 1, members[0]),
+                                              members[1:]]))
+            else:
+                i, j = np.triu_indices(len(members), k=1)
+                pairs.append(np.column_stack([members[i], members[j]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.int64)
+    pairs = np.sort(np.concatenate(pairs), axis=1)
+    return np.unique(pairs, axis=0)
+
+
+def estimated_jaccard(signatures, pairs, chunk=1 << 16):
+    """Share of equal signature entries for each pair (row of `pairs`)."""
+    out = np.empty(len(pairs))
+    for s in range(0, len(pairs), chunk):
+        i, j = pairs[s:s + chunk, 0], pairs[s:s + chunk, 1]
+        out[s:s + chunk] = (signatures[i] == signatures[j]).mean(axis=1)
+    return out
+
+
+def near_duplicate_clusters(texts, threshold=THRESHOLD, k=SHINGLE,
+                            num_perm=NUM_PERM, bands=BANDS, seed=0):
+    """
+    Cluster label for every text (texts in the same cluster are linked by a
+    chain of near-duplicates with estimated shingle Jaccard >= threshold),
+    plus the verified pairs as (i, j, similarity) over the input positions
+    of the first occurrence of each distinct normalised text.
+    """
+    normalised = [normalise(t) for t in texts]
+    unique, first, inverse = np.unique(np.array(normalised, dtype=object),
+                                       return_index=True, return_inverse=True)
+    signatures = MinHasher(num_perm, seed).signatures(list(unique), k)
+    pairs = lsh_candidates(signatures, bands)
+    similarity = estimated_jaccard(signatures, pairs)
+    keep = similarity >= threshold
+    pairs, similarity = pairs[keep], similarity[keep]
+
+    graph = sparse.coo_matrix((np.ones(len(pairs)), (pairs[:, 0], pairs[:, 1])),
+                              shape=(len(unique), len(unique)))
+    _, labels = connected_components(graph, directed=False)
+    return labels[inverse.ravel()], (first[pairs[:, 0]], first[pairs[:, 1]], similarity)
@@ -0,0 +1,89 @@
+"""
+Monte-Carlo power analysis for the diarization ablation.
+
+Question: how many videos must be human-coded with the re-diarized narratives
+to detect the accuracy improvement that better diarization could plausibly
+produce?
+
+Simulation model, per simulated study of n videos:
+  - videos are drawn (with replacement) from the observed per-video data in
+    merged_analysis.csv, keeping their observed inaccuracy rate;
+  - the true per-video accuracy gain is
+        inaccuracy_i * diarization_error_fraction * fix_rate
+    where diarization_error_fraction is the share of inaccurate facts that are
+    speaker misattributions (error taxonomy) and fix_rate is the fraction of
+    those the new diarizer fixes (the effect size being varied);
+  - the observed paired delta adds measurement noise. By default its SD is
+    estimated from coder disagreement: with two coders, SD(maya - nasser) / sqrt(2)
+    is the SD of the difference of two mean-of-coders measurements.
+  - the study "succeeds" if a two-sided paired t-test rejects at alpha.
+
+All studies for one sample size (every effect size x every simulation) are one
+batched NumPy array, so tens of thousands of simulated studies take seconds.
+"""
+
+import numpy as np
+import pandas as pd
+
+SAMPLE_SIZES = (10, 15, 20, 25, 30, 40, 50, 60, 80, 100, 112)
+FIX_RATES = (0.1, 0.25, 0.5, 0.75, 1.0)
+N_SIMULATIONS = 5000
+TARGET_POWER = 0.8
+# Used when the per-coder accuracy columns are not available
+DEFAULT_NOISE_SD = 0.10
+
+
+def estimate_noise_sd(per_video):
+    """Measurement-noise SD of a paired delta, from coder disagreement if possible."""
+    if {'maya_accuracy', 'nasser_accuracy'} <= set(per_video.columns):
+        diff = (per_video['maya_accuracy'] - per_video['nasser_accuracy']).dropna()
+        if len(diff) > 2:
+            return float(diff.std(ddof=1) / np.sqrt(2))
+    return DEFAULT_NOISE_SD
+
+
+def simulate_power(inaccuracy, diarization_fraction, sample_sizes=SAMPLE_SIZES,
+                   fix_rates=FIX_RATES, noise_sd=DEFAULT_NOISE_SD,
+                   n_simulations=N_SIMULATIONS, alpha=0.05, rng=None):
+    """
+    Simulated power of a paired t-test for every (sample size, fix rate).
+
+    inaccuracy: observed per-video inaccuracy rates (the pool to resample from).
+
+    Returns a long-form DataFrame with columns n_videos, fix_rate,
+    expected_improvement and power.
+    """
+    from scipy import stats
+
+    rng = np.random.default_rng(rng)
+    pool = np.asarray(inaccuracy, dtype=float)
+    pool = pool[~np.isnan(pool)]
+    fixes = np.asarray(fix_rates, dtype=float)[:, None, None]
+
+    rows = []
+    for n in sample_sizes:
+        idx = rng.integers(0, len(pool), size=(n_simulations, n))
+        gain = pool[idx][None, :, :] * diarization_fraction * fixes   # (F, S, n)
+        deltas = gain + rng.normal(0.0, noise_sd, size=gain.shape)
+
+        mean = deltas.mean(axis=2)
+        se = deltas.std(axis=2, ddof=1) / np.sqrt(n)
+        t = np.divide(mean, se, out=np.zeros_like(mean), where=se > 0)
+        p = 2 * stats.t.sf(np.abs(t), df=n - 1)
+        power = (p < alpha).mean(axis=1)
+
+        for fix, pw in zip(fix_rates, power):
+            rows.append({
+                'n_videos': n,
+                'fix_rate': fix,
+                'expected_improvement': pool.mean() * diarization_fraction * fix,
+                'power': pw,
+            })
+    return pd.DataFrame(rows)
+
+
+def required_sample_size(power_df, target=TARGET_POWER):
+    """Smallest simulated n reaching the target power, per fix rate (NaN if none)."""
+    reached = power_df[power_df['power'] >= target]
+    smallest = reached.groupby('fix_rate')['n_videos'].min()
+    return smallest.reindex(sorted(power_df['fix_rate'].unique()))
@@ -0,0 +1,243 @@
+"""
+Per-(video, model, metric) result cache for the comparison scripts.
+
+Every cached row is keyed by the content hashes of the input files it was
+computed from plus a hash of the source code of the metric functions and of the
+local helpers and constants they use (see code_version). Adding a video or a
+model to DIARIZATION_MODELS therefore only computes the new rows; editing a
+metric function or anything it calls invalidates exactly the rows produced by
+it. The aggregated CSVs and figures are always rebuilt from the full set of
+rows.
+
+Layout on disk (one JSON file per metric):
+
+    output/cache/<metric>.json   →   {"<model>/<video_id>": {"key": ..., "row": {...}}}
+"""
+
+import hashlib
+import inspect
+import json
+import re
+from pathlib import Path
+
+import numpy as np
+
+# Helpers defined in this directory are followed by code_version
+_LOCAL_DIR = Path(__file__).resolve().parent
+
+# (path, mtime_ns, size) -> sha256 hex digest, so each file is hashed once per run
+_DIGESTS = {}
+
+
+def file_digest(path):
+    """SHA-256 of a file's contents, memoised on (path, mtime, size)."""
+    path = Path(path)
+    st = path.stat()
+    memo_key = (str(path.resolve()), st.st_mtime_ns, st.st_size)
+    digest = _DIGESTS.get(memo_key)
+    if digest is None:
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                h.update(chunk)
+        digest = h.hexdigest()
+        _DIGESTS[memo_key] = digest
+    return digest
+
+
+def _is_local(obj):
+    """True for functions/classes/modules defined in this directory (not libraries)."""
+    try:
+        path = inspect.getfile(obj)
+    except TypeError:   # built-in
+        return False
+    return Path(path).resolve().parent == _LOCAL_DIR
+
+
+def _global_names(code):
+    """Global names referenced by a code object, including nested functions,
+    lambdas and comprehensions."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _global_names(const)
+    return names
+
+
+def _methods(cls):
+    """Functions behind the methods, static/class methods and properties written in `cls`."""
+    funcs = []
+    for attr in vars(cls).values():
+        if isinstance(attr, (staticmethod, classmethod)):
+            funcs.append(attr.__func__)
+        elif isinstance(attr, property):
+            funcs += [attr.fget, attr.fset, attr.fdel]
+        else:
+            funcs.append(attr)
+    source_file = inspect.getsourcefile(cls)
+    return [f for f in funcs
+            if inspect.isfunction(f) and f.__code__.co_filename == source_file]
+
+
+def _constant(value):
+    """Stable text of an immutable constant (None for anything else)."""
+    if isinstance(value, re.Pattern):
+        return f"re.compile({value.pattern!r}, {value.flags})"
+    if isinstance(value, (set, frozenset)):
+        return repr(sorted(value, key=repr))
+    if isinstance(value, (str, bytes, int, float, tuple, np.generic)):
+        return repr(value)
+    return None
+
+
+def _fingerprint(obj, seen, parts, with_source=True):
+    """Append the source of `obj` and of everything local it uses to `parts`."""
+    if id(obj) in seen:
+        return
+    seen.add(id(obj))
+    if inspect.isclass(obj):
+        parts.append(inspect.getsource(obj))
+        # The methods' source is part of the class's; follow what they use
+        for method in _methods(obj):
+            _fingerprint(method, seen, parts, with_source=False)
+        return
+    func = inspect.unwrap(obj)
+    if with_source:
+        parts.append(inspect.getsource(func))
+    # Default values are evaluated at definition time, e.g. threshold=MATCH_THRESHOLD
+    defaults = (func.__defaults__ or ()) + tuple((func.__kwdefaults__ or {}).values())
+    parts += [text for text in map(_constant, defaults) if text is not None]
+    for name in sorted(_global_names(func.__code__)):
+        value = func.__globals__.get(name)
+        if (inspect.isfunction(value) or inspect.isclass(value)) and _is_local(value):
+            _fingerprint(value, seen, parts)
+        elif inspect.ismodule(value) and _is_local(value):
+            if id(value) not in seen:
+                seen.add(id(value))
+                parts.append(inspect.getsource(value))
+        else:
+            text = _constant(value)
+            if text is not None:
+                parts.append(f"{name} = {text}")
+
+
+def code_version(*funcs):
+    """
+    Hash of the source code of the functions (or classes) that produce a
+    metric and, recursively, of every local helper function, class and module
+    they use, plus the values of the constants they read (including default
+    argument values), so editing e.g. a private helper of text_metrics or a
+    threshold invalidates the rows that depend on it.
+    """
+    seen, parts = set(), []
+    for func in funcs:
+        _fingerprint(func, seen, parts)
+    return hashlib.sha256('\n'.join(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def _to_builtin(obj):
+    """json.dump fallback for NumPy scalars and arrays."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class ResultCache:
+    """
+    Cache of per-(video, model) metric rows.
+
+    Usage:
+        cache = ResultCache(CACHE_DIR)
+        row = cache.get_or_compute('agreement', vid, model,
+                                   inputs=[orig_path, new_path],
+                                   code=code_version(compute_speaker_agreement),
+                                   compute=lambda: {...})
+        ...
+        cache.save()
+    """
+
+    def __init__(self, cache_dir, enabled=True):
+        self.cache_dir = Path(cache_dir)
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._tables = {}
+        self._dirty = set()
+
+    def _table(self, metric):
+        if metric not in self._tables:
+            path = self.cache_dir / f"{metric}.json"
+            table = {}
+            if self.enabled and path.exists():
+                try:
+                    with open(path) as f:
+                        table = json.load(f)
+                except (OSError, json.JSONDecodeError):
+                    print(f"  WARNING: unreadable cache {path.name}, recomputing")
+            self._tables[metric] = table
+        return self._tables[metric]
+
+    @staticmethod
+    def make_key(inputs, code):
+        """
+        Combine the input digests and the metric code version into one key.
+        Inputs are file paths or, for data that is not a file of its own (e.g.
+        a blob of the packed corpus), its bytes; both hash to the SHA-256 of
+        the contents.
+        """
+        h = hashlib.sha256(code.encode('utf-8'))
+        for item in inputs:
+            if isinstance(item, (bytes, bytearray, memoryview)):
+                digest = hashlib.sha256(item).hexdigest()
+            else:
+                digest = file_digest(item)
+            h.update(digest.encode('utf-8'))
+        return h.hexdigest()
+
+    def get_or_compute(self, metric, video_id, model, inputs, code, compute):
+        """
+        Return the cached row for (metric, video, model) if its inputs and code
+        are unchanged, otherwise call compute() and cache the result.
+
+        compute() may return None (e.g. nothing to compare), which is not cached.
+        The returned dict is a fresh copy, so callers may add columns to it.
+        """
+        key = self.make_key(inputs, code)
+        table = self._table(metric)
+        entry_id = f"{model}/{video_id}"
+
+        entry = table.get(entry_id)
+        if self.enabled and entry is not None and entry.get('key') == key:
+            self.hits += 1
+            return dict(entry['row'])
+
+        self.misses += 1
+        row = compute()
+        if row is not None:
+            # Round-trip through JSON so cached and fresh rows look identical
+            row = json.loads(json.dumps(row, default=_to_builtin))
+            table[entry_id] = {'key': key, 'row': row}
+            self._dirty.add(metric)
+            return dict(row)
+        return None
+
+    def save(self):
+        """Write every metric table that changed during this run."""
+        if not self.enabled or not self._dirty:
+            return
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for metric in sorted(self._dirty):
+            path = self.cache_dir / f"{metric}.json"
+            tmp = path.with_suffix('.json.tmp')
+            with open(tmp, 'w') as f:
+                json.dump(self._tables[metric], f, default=_to_builtin)
+            tmp.replace(path)
+        self._dirty.clear()
+
+    def summary(self):
+        """One-line hit/miss summary for the end-of-run printout."""
+        if not self.enabled:
+            return "cache disabled"
+        return f"{self.hits} cached rows reused, {self.misses} recomputed"
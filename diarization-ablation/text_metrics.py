@@ -0,0 +1,209 @@
+"""
+Word/character error rates between transcript variants.
+
+Tokens are interned into integer ids (a Vocabulary shared across the whole run),
+so every comparison works on int arrays. Two edit-distance kernels are used:
+
+- levenshtein():  bit-parallel (Myers/Hyyrö) distance. The pattern is held in a
+                  Python big int, so one step over the other sequence updates
+                  the whole DP column in O(len/64) machine words. Used for CER
+                  on long character sequences and to size the band below.
+- edit_ops():     banded DP with backtrace, giving substitution / insertion /
+                  deletion counts. An optimal path with distance d never leaves
+                  the diagonal band |i - j| <= d, so only that band is filled,
+                  one NumPy-vectorised row at a time.
+"""
+
+import re
+
+import numpy as np
+
+_TOKEN_RE = re.compile(r"[a-z0-9']+")
+
+# Backtrace codes stored per band cell
+_DIAG, _DEL, _INS = 0, 1, 2
+
+
+def tokenize(text):
+    """Lower-cased word tokens (punctuation dropped)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+class Vocabulary:
+    """Maps tokens to dense integer ids, growing as new tokens are seen."""
+
+    def __init__(self):
+        self.ids = {}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def encode(self, tokens):
+        ids = self.ids
+        return np.array([ids.setdefault(tok, len(ids)) for tok in tokens], dtype=np.int64)
+
+
+# One vocabulary per process so token ids are comparable across transcripts
+VOCAB = Vocabulary()
+
+
+def _pattern_masks(pattern):
+    """For each symbol in `pattern`, a big-int bitmask of the positions it occupies."""
+    symbols, inverse = np.unique(pattern, return_inverse=True)
+    masks = {}
+    for k, sym in enumerate(symbols.tolist()):
+        bits = np.packbits(inverse == k, bitorder='little')
+        masks[sym] = int.from_bytes(bits.tobytes(), 'little')
+    return masks
+
+
+def _trim_common(a, b):
+    """Strip the common prefix and suffix (they are all hits)."""
+    n = min(len(a), len(b))
+    if n == 0:
+        return a, b
+    diff = np.flatnonzero(a[:n] != b[:n])
+    pre = diff[0] if len(diff) else n
+    a, b = a[pre:], b[pre:]
+    n = min(len(a), len(b))
+    if n == 0:
+        return a, b
+    diff = np.flatnonzero(a[len(a) - n:][::-1] != b[len(b) - n:][::-1])
+    suf = diff[0] if len(diff) else n
+    return a[:len(a) - suf], b[:len(b) - suf]
+
+
+def levenshtein(a, b):
+    """
+    Edit distance between two integer sequences (bit-parallel).
+
+    The longer sequence becomes the bit pattern so the Python-level loop runs
+    over the shorter one.
+    """
+    a, b = _trim_common(np.asarray(a), np.asarray(b))
+    if len(a) < len(b):
+        a, b = b, a
+    m = len(a)
+    if m == 0:
+        return len(b)
+    if len(b) == 0:
+        return m
+
+    peq = _pattern_masks(a)
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+
+    for c in b.tolist():
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return score
+
+
+def edit_ops(ref, hyp, band=None):
+    """
+    Substitutions, insertions and deletions turning `ref` into `hyp`.
+
+    band: half-width of the diagonal band; defaults to the exact distance from
+    levenshtein(), which is always wide enough for an optimal alignment.
+
+    Returns a dict with substitutions, insertions, deletions, hits and distance.
+    """
+    n_total = len(ref)
+    ref, hyp = _trim_common(np.asarray(ref), np.asarray(hyp))
+    n, m = len(ref), len(hyp)
+    if band is None:
+        band = levenshtein(ref, hyp)
+    k = max(int(band), abs(n - m))
+    width = 2 * k + 1
+
+    big = np.iinfo(np.int32).max // 2
+    prev = np.full(m + 1, big, dtype=np.int32)
+    cur = np.full(m + 1, big, dtype=np.int32)
+    hi0 = min(m, k)
+    prev[:hi0 + 1] = np.arange(hi0 + 1)
+    # ops[i, j - i + k]: how cell (i, j) was reached
+    ops = np.full((n + 1, width), _INS, dtype=np.uint8)
+
+    for i in range(1, n + 1):
+        lo, hi = max(0, i - k), min(m, i + k)
+        js = np.arange(lo, hi + 1)
+        up = prev[lo:hi + 1] + 1
+        diag = np.full(len(js), big, dtype=np.int32)
+        start = 1 if lo == 0 else 0
+        diag[start:] = prev[lo + start - 1:hi] + (hyp[lo + start - 1:hi] != ref[i - 1])
+
+        best = np.minimum(diag, up)
+        # Insertions within the row: D[j] = min_k<=j (best[k] + j - k)
+        row = js + np.minimum.accumulate(best - js)
+        cur[lo:hi + 1] = row
+
+        op = np.full(len(js), _INS, dtype=np.uint8)
+        op[row == up] = _DEL
+        op[row == diag] = _DIAG
+        ops[i, js - i + k] = op
+        prev, cur = cur, prev
+
+    distance = int(prev[m])
+
+    # Backtrace
+    subs = ins = dels = 0
+    i, j = n, m
+    while i > 0 or j > 0:
+        op = ops[i, j - i + k] if i > 0 else _INS
+        if j == 0:
+            op = _DEL
+        if op == _DIAG:
+            subs += int(ref[i - 1] != hyp[j - 1])
+            i -= 1
+            j -= 1
+        elif op == _DEL:
+            dels += 1
+            i -= 1
+        else:
+            ins += 1
+            j -= 1
+
+    return {
+        'substitutions': subs,
+        'insertions': ins,
+        'deletions': dels,
+        'hits': n_total - subs - dels,
+        'distance': distance,
+    }
+
+
+def word_error_rate(ref_ids, hyp_ids):
+    """WER of hypothesis token ids against reference token ids, with S/I/D counts."""
+    counts = edit_ops(ref_ids, hyp_ids)
+    n_ref = len(ref_ids)
+    return {
+        'wer': counts['distance'] / n_ref if n_ref else float(len(hyp_ids) > 0),
+        'word_substitutions': counts['substitutions'],
+        'word_insertions': counts['insertions'],
+        'word_deletions': counts['deletions'],
+        'ref_words': n_ref,
+        'hyp_words': len(hyp_ids),
+    }
+
+
+def char_error_rate(ref_tokens, hyp_tokens):
+    """CER over the space-joined normalised token strings (distance only)."""
+    ref = ' '.join(ref_tokens)
+    hyp = ' '.join(hyp_tokens)
+    ref_codes = np.frombuffer(ref.encode('utf-32-le'), dtype=np.uint32)
+    hyp_codes = np.frombuffer(hyp.encode('utf-32-le'), dtype=np.uint32)
+    if len(ref_codes) == 0:
+        return float(len(hyp_codes) > 0)
+    return levenshtein(ref_codes, hyp_codes) / len(ref_codes)
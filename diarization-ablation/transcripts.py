@@ -0,0 +1,187 @@
+"""
+Parsed, time-sorted transcript representation shared by the comparison scripts.
+
+A transcript JSON ([{start, end, text, speaker}, ...]) is parsed once into
+NumPy arrays sorted by start time, with speaker labels integer-coded. Comparing
+two parsed transcripts then only needs the cheap overlap step: a sorted sweep
+(two searchsorted calls) that finds every temporally overlapping segment pair,
+instead of scanning every segment of B for every segment of A.
+"""
+
+import json
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+
+from text_metrics import VOCAB, tokenize
+
+# Labels that never take part in speaker mapping
+NON_SPEAKERS = {'UNKNOWN', ''}
+
+
+def load_transcript(path):
+    """Load a transcript JSON file."""
+    with open(path) as f:
+        return json.load(f)
+
+
+class ParsedTranscript:
+    """
+    Transcript segments as arrays sorted by start time.
+
+    Attributes:
+        starts, ends:  float arrays of segment boundaries (sorted by start)
+        max_end:       running maximum of ends (lets the sweep skip segments
+                       that finished before a given time, even if segments nest)
+        labels:        sorted list of distinct speaker labels
+        codes:         int array, index into `labels` for each segment
+        texts:         segment texts in sorted order
+        order:         original index of each sorted segment
+        tokens:        normalised word tokens of the joined text (lazy)
+        token_ids:     the same tokens interned into the shared VOCAB (lazy)
+    """
+
+    def __init__(self, transcript):
+        starts = np.array([seg['start'] for seg in transcript], dtype=float)
+        ends = np.array([seg['end'] for seg in transcript], dtype=float)
+        order = np.argsort(starts, kind='stable')
+
+        # A segment without a speaker key is unlabelled (''), as in the original 03
+        raw_labels = [transcript[i].get('speaker', '') for i in order]
+        self.labels = sorted(set(raw_labels))
+        label_index = {label: k for k, label in enumerate(self.labels)}
+
+        self.order = order
+        self.starts = starts[order]
+        self.ends = ends[order]
+        self.max_end = (np.maximum.accumulate(self.ends) if len(self.ends)
+                        else self.ends)
+        self.codes = np.array([label_index[label] for label in raw_labels], dtype=np.intp)
+        self.texts = [transcript[i].get('text', '').strip() for i in order]
+        self._words = None
+        self._tokens = None
+        self._token_ids = None
+
+    def __len__(self):
+        return len(self.starts)
+
+    @property
+    def speakers(self):
+        """Real speaker labels (excluding UNKNOWN / empty)."""
+        return [label for label in self.labels if label not in NON_SPEAKERS]
+
+    @property
+    def n_speakers(self):
+        return len(self.speakers)
+
+    @property
+    def words(self):
+        """Lower-cased word set of the joined text (computed once)."""
+        if self._words is None:
+            self._words = set(' '.join(self.texts).lower().split())
+        return self._words
+
+    @property
+    def tokens(self):
+        if self._tokens is None:
+            self._tokens = tokenize(' '.join(self.texts))
+        return self._tokens
+
+    @property
+    def token_ids(self):
+        if self._token_ids is None:
+            self._token_ids = VOCAB.encode(self.tokens)
+        return self._token_ids
+
+
+def parse_transcript(transcript):
+    """Parse a transcript list (or an already-parsed transcript) once."""
+    if isinstance(transcript, ParsedTranscript):
+        return transcript
+    return ParsedTranscript(transcript)
+
+
+def overlap_pairs(pa, pb):
+    """
+    All segment pairs (i in A, j in B) that overlap in time.
+
+    For each segment of A the candidate range in B is [lo, hi): segments before
+    `lo` all ended (running max end) before A's segment starts, segments from
+    `hi` on start after it ends. The ranges are expanded into flat index arrays
+    and filtered to strictly positive overlap.
+
+    Returns:
+        (i, j, overlap) arrays, indices into the sorted segment order.
+    """
+    if len(pa) == 0 or len(pb) == 0:
+        empty = np.zeros(0, dtype=np.intp)
+        return empty, empty, np.zeros(0)
+
+    lo = np.searchsorted(pb.max_end, pa.starts, side='right')
+    hi = np.searchsorted(pb.starts, pa.ends, side='left')
+    counts = np.maximum(hi - lo, 0)
+    total = int(counts.sum())
+
+    i = np.repeat(np.arange(len(pa)), counts)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    j = np.repeat(lo, counts) + offsets
+
+    overlap = (np.minimum(pa.ends[i], pb.ends[j]) -
+               np.maximum(pa.starts[i], pb.starts[j]))
+    keep = overlap > 0
+    return i[keep], j[keep], overlap[keep]
+
+
+def overlap_matrix(pa, pb, pairs=None):
+    """Overlap duration between every label of A (rows) and of B (columns)."""
+    i, j, overlap = pairs if pairs is not None else overlap_pairs(pa, pb)
+    n_a, n_b = len(pa.labels), len(pb.labels)
+    flat = pa.codes[i] * n_b + pb.codes[j]
+    return np.bincount(flat, weights=overlap, minlength=n_a * n_b).reshape(n_a, n_b)
+
+
+def speaker_mapping(pa, pb, overlap=None):
+    """
+    Best one-to-one mapping of B's speakers onto A's speakers (Hungarian
+    algorithm maximising temporal overlap).
+
+    Returns a dict mapping speaker labels in B to their best match in A.
+    """
+    if overlap is None:
+        overlap = overlap_matrix(pa, pb)
+
+    rows = [k for k, label in enumerate(pa.labels) if label not in NON_SPEAKERS]
+    cols = [k for k, label in enumerate(pb.labels) if label not in NON_SPEAKERS]
+    if not rows or not cols:
+        return {}
+
+    sub = overlap[np.ix_(rows, cols)]
+    row_ind, col_ind = linear_sum_assignment(sub, maximize=True)
+    return {pb.labels[cols[c]]: pa.labels[rows[r]] for r, c in zip(row_ind, col_ind)}
+
+
+def mapped_codes(pa, pb, mapping):
+    """For each label code of B, the code of its mapped label in A (-1 if unmapped)."""
+    index_a = {label: k for k, label in enumerate(pa.labels)}
+    return np.array([index_a.get(mapping.get(label), -1) for label in pb.labels],
+                    dtype=np.intp)
+
+
+def speaker_agreement(pa, pb, mapping, overlap=None):
+    """
+    After aligning speakers via mapping, the fraction of overlapping speech
+    time whose speaker labels match. A's unlabelled ('') segments match B's
+    unmapped speakers (UNKNOWN, '' or left out of the mapping), which are
+    compared as '' (as in the original per-pair comparison).
+    """
+    if overlap is None:
+        overlap = overlap_matrix(pa, pb)
+    total = overlap.sum()
+    if total <= 0:
+        return 0
+    target = mapped_codes(pa, pb, mapping)
+    if '' in pa.labels:
+        target[target < 0] = pa.labels.index('')
+    cols = np.flatnonzero(target >= 0)
+    matching = overlap[target[cols], cols].sum()
+    return matching / total
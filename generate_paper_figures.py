@@ -7,7 +7,7 @@ the coded data CSVs. It does NOT require running the diarization ablation
 pipeline or any API calls — just the data files in results/.
 
 Requirements:
-    pip install pandas numpy scipy matplotlib seaborn scikit-learn statsmodels
+    pip install pandas numpy scipy matplotlib
 
 Usage:
     python generate_paper_figures.py
@@ -15,30 +15,55 @@ Usage:
     # Or from a different directory:
     python generate_paper_figures.py --data-dir /path/to/results --output-dir /path/to/output
 
+    # Only some outputs (glob patterns on output names or function names), in parallel:
+    python generate_paper_figures.py --only "fig*" --exclude feature_correlations --jobs 4
+    python generate_paper_figures.py --list
+
+    # Outputs whose input CSVs and code are unchanged are skipped (see
+    # .build_cache.json in the output dir); --force rebuilds, --watch keeps
+    # rebuilding as CSVs change. CSVs are read lazily and cached in binary
+    # form under .data_cache/ (Feather with pyarrow, else pickle)
+    python generate_paper_figures.py --watch
+
+    # Per-video figures switch to binned quantile summaries above
+    # --summary-rows videos (see SCALING)
+    python generate_paper_figures.py --data-dir big_results --summary-rows 5000
+
 Outputs:
     figures/    — PDF + PNG for each figure
     tables/     — .tex file for each table
 """
 
 import argparse
+import contextlib
+import hashlib
+import importlib.util
+import inspect
+import io
+import json
 import os
 import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from fnmatch import fnmatch
 from pathlib import Path
+from typing import Callable, NamedTuple
 
-import matplotlib
-matplotlib.use("Agg")
-import matplotlib.pyplot as plt
-import matplotlib.ticker as mticker
 import numpy as np
 import pandas as pd
-import seaborn as sns
-from scipy import stats
-from scipy.optimize import linear_sum_assignment
+
+from paper_metrics import (
+    LABELS, accuracy_regression, agreement_stats, confusion_matrix, likert_agreement,
+    policy_rates, summary_intervals,
+)
+from paper_plots import bar_collection, binned_quantiles, quantile_band, row_segments
+from corpus import CORPUS_FILE, Corpus
 
 # ---------------------------------------------------------------------------
 # Styling defaults — publication-quality, serif font, no chartjunk
 # ---------------------------------------------------------------------------
-plt.rcParams.update({
+STYLE = {
     "font.size": 10,
     "font.family": "serif",
     "axes.labelsize": 11,
@@ -46,7 +71,31 @@ plt.rcParams.update({
     "figure.dpi": 150,
     "savefig.dpi": 300,
     "savefig.bbox": "tight",
-})
+}
+
+
+def _pyplot():
+    """
+    matplotlib.pyplot (Agg backend, STYLE applied), imported on first use so
+    tables-only runs and --help never load matplotlib.
+    """
+    import matplotlib
+    if "matplotlib.pyplot" not in sys.modules:
+        matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.rcParams.update(STYLE)
+    return plt
+
+
+# Per-video figures (fig1, fig2, coder comparison) draw each layer as one
+# collection artist. Above dense_rows videos those layers are rasterised
+# inside the vector PDF; above summary_rows videos the figures show binned
+# quantiles (summary_bins bins) instead of one mark per video.
+SCALING = {
+    "dense_rows": 500,
+    "summary_rows": 2000,
+    "summary_bins": 100,
+}
 
 # Consistent color palette across all figures
 C_ACCURATE  = "#2ecc71"
@@ -54,44 +103,196 @@ C_INACCURATE = "#e74c3c"
 C_HALLUCINATION = "#9b59b6"
 
 
+# Pipeline outputs in results/ by data key: the CSVs, plus the packed corpus
+# of narratives and atomic facts (see corpus.py)
+DATA_FILES = {
+    "facts":           "all_fact_labels.csv",
+    "likert":          "all_likert_labels.csv",
+    "consensus":       "consensus_labels.csv",
+    "per_video":       "per_video_scores.csv",
+    "merged":          "merged_analysis.csv",
+    "errors_consensus":"grounded_error_taxonomy.csv",
+    "errors_broad":    "grounded_error_taxonomy_broad.csv",
+    "agreement":       "per_video_agreement.csv",
+    "corpus":          CORPUS_FILE,
+}
+
+
+# ===================================================================
+# RENDER REGISTRY
+# ===================================================================
+
+class Artifact(NamedTuple):
+    name: str          # output file stem, e.g. "fig1_inaccuracy_vs_hallucination"
+    kind: str          # "figure" (written to figures/) or "table" (tables/)
+    func: Callable     # func(data, out_dir)
+    inputs: tuple      # keys of load_all_data() the function reads
+
+
+# Every figure and table, in paper order (filled by @register)
+ARTIFACTS: dict = {}
+
+
+def register(kind: str, name: str, inputs: tuple = ()):
+    """
+    Add a render function to ARTIFACTS under its output name. `inputs` lists
+    the data keys it consumes; the build cache rebuilds it only when one of
+    those CSVs (or its code) changes.
+    """
+    unknown = set(inputs) - set(DATA_FILES)
+    if unknown:
+        raise ValueError(f"{name}: unknown data inputs {sorted(unknown)}")
+
+    def decorator(func):
+        ARTIFACTS[name] = Artifact(name, kind, func, tuple(inputs))
+        return func
+    return decorator
+
+
 # ===================================================================
 # DATA LOADING
 # ===================================================================
 
-def load_all_data(data_dir: Path) -> dict:
-    """Load every CSV produced by the analysis pipeline."""
-    d = {}
-    files = {
-        "facts":           "all_fact_labels.csv",
-        "likert":          "all_likert_labels.csv",
-        "consensus":       "consensus_labels.csv",
-        "per_video":       "per_video_scores.csv",
-        "merged":          "merged_analysis.csv",
-        "errors_consensus":"grounded_error_taxonomy.csv",
-        "errors_broad":    "grounded_error_taxonomy_broad.csv",
-        "agreement":       "per_video_agreement.csv",
-    }
-    for key, fname in files.items():
-        path = data_dir / fname
-        if path.exists():
-            d[key] = pd.read_csv(path)
-            print(f"  Loaded {fname}: {len(d[key])} rows")
-        else:
-            print(f"  WARNING: {fname} not found — some outputs will be skipped")
-            d[key] = None
-    return d
+# Every `<coder>_label` column is read as this categorical
+LABEL_DTYPE = pd.CategoricalDtype(LABELS)
+
+# Explicit dtypes per data key (columns not listed are inferred)
+_TEXT_COLUMNS = {"video_id": str, "fact_text": str}
+SCHEMAS = {
+    "facts":            _TEXT_COLUMNS,
+    "consensus":        _TEXT_COLUMNS,
+    "likert":           {"video_id": str, "question": str},
+    "per_video":        {"video_id": str},
+    "merged":           {"video_id": str, "error_type": str},
+    "errors_consensus": {**_TEXT_COLUMNS, "error_type": str, "match_text": str,
+                         "match_speaker": str},
+    "errors_broad":     {**_TEXT_COLUMNS, "error_type": str, "match_text": str,
+                         "match_speaker": str},
+    "agreement":        {"video_id": str},
+}
+# Part of every cache key, so changing a schema invalidates the cached frames
+_SCHEMA_VERSION = hashlib.sha256(
+    repr((sorted((k, sorted((c, str(t)) for c, t in v.items()))
+                 for k, v in SCHEMAS.items()), LABELS, pd.__version__)).encode()
+).hexdigest()[:12]
+
+# Feather needs pyarrow; found without importing it
+_CACHE_FORMAT = "feather" if importlib.util.find_spec("pyarrow") else "pickle"
+
+
+def read_csv_typed(key: str, path: Path) -> pd.DataFrame:
+    """Read one pipeline CSV with its schema applied."""
+    columns = pd.read_csv(path, nrows=0).columns
+    dtypes = {c: t for c, t in SCHEMAS.get(key, {}).items() if c in columns}
+    dtypes.update({c: LABEL_DTYPE for c in columns if c.endswith("_label")})
+    return pd.read_csv(path, dtype=dtypes)
+
+
+class LazyData(dict):
+    """
+    The pipeline CSVs by data key (see DATA_FILES), each read on first access
+    (None if the file is missing).
+
+    With a cache_dir, every parsed frame is also stored as Feather (pickle
+    without pyarrow) under a name derived from the CSV's mtime and size, so
+    later runs skip CSV parsing until the CSV changes.
+    """
+
+    def __init__(self, data_dir: Path, cache_dir: Path = None, verbose: bool = True):
+        super().__init__()
+        self.data_dir = Path(data_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.verbose = verbose
+
+    def __missing__(self, key):
+        if key not in DATA_FILES:
+            raise KeyError(key)
+        frame = self._load(key)
+        self[key] = frame
+        return frame
+
+    def _cache_path(self, path: Path):
+        st = path.stat()
+        token = f"{path.resolve()}|{st.st_mtime_ns}|{st.st_size}|{_SCHEMA_VERSION}"
+        digest = hashlib.sha256(token.encode()).hexdigest()[:16]
+        return self.cache_dir / f"{path.stem}-{digest}.{_CACHE_FORMAT}"
+
+    def _load(self, key):
+        fname = DATA_FILES[key]
+        path = self.data_dir / fname
+        if not path.exists():
+            if self.verbose:
+                print(f"  WARNING: {fname} not found — some outputs will be skipped")
+            return None
+        if key == "corpus":
+            # Memory-mapped: nothing to parse, so nothing to cache
+            corpus = Corpus(path)
+            if self.verbose:
+                print(f"  Opened {fname}: {len(corpus)} videos")
+            return corpus
+
+        cached = self._cache_path(path) if self.cache_dir is not None else None
+        if cached is not None and cached.exists():
+            try:
+                frame = (pd.read_feather(cached) if _CACHE_FORMAT == "feather"
+                         else pd.read_pickle(cached))
+                if self.verbose:
+                    print(f"  Loaded {fname}: {len(frame)} rows (cached)")
+                return frame
+            except Exception:
+                pass  # unreadable cache file: fall back to the CSV
+
+        frame = read_csv_typed(key, path)
+        if self.verbose:
+            print(f"  Loaded {fname}: {len(frame)} rows")
+        if cached is not None:
+            self._store(frame, cached, path.stem)
+        return frame
+
+    def _store(self, frame, cached, stem):
+        try:
+            cached.parent.mkdir(parents=True, exist_ok=True)
+            for old in cached.parent.glob(f"{stem}-*.{_CACHE_FORMAT}"):
+                old.unlink()
+            tmp = cached.with_suffix(".tmp")
+            if _CACHE_FORMAT == "feather":
+                frame.to_feather(tmp)
+            else:
+                frame.to_pickle(tmp)
+            tmp.replace(cached)
+        except OSError:
+            pass  # read-only output dir: just don't cache
+
+
+def load_all_data(data_dir: Path, verbose: bool = True, cache_dir: Path = None) -> dict:
+    """All CSVs produced by the analysis pipeline, loaded lazily by key."""
+    return LazyData(data_dir, cache_dir=cache_dir, verbose=verbose)
+
+
+def corpus_columns(corpus, video_ids) -> pd.DataFrame:
+    """Narrative length (words) and number of atomic facts per video (NaN if absent)."""
+    words, facts = [], []
+    for video in video_ids:
+        narrative = corpus.narrative(video)
+        words.append(len(narrative.split()) if narrative is not None else np.nan)
+        facts.append(corpus.n_facts(video) if video in corpus else np.nan)
+    return pd.DataFrame({"narrative_words": words, "narrative_facts": facts},
+                        index=video_ids.index)
 
 
 # ===================================================================
 # FIGURE 1: Per-video inaccuracy vs. hallucination (paired dot plot)
 # ===================================================================
 
+@register("figure", "fig1_inaccuracy_vs_hallucination", inputs=("merged",))
 def fig_inaccuracy_vs_hallucination(data, fig_dir):
     """
     Paired lollipop plot. Each row is one video, sorted by the gap between
     inaccuracy and hallucination. Red dot = inaccuracy rate, purple dot =
     hallucination rate, gray line connects them. The visual argument: in
-    virtually every video, red is to the right of purple.
+    virtually every video, red is to the right of purple. For large corpora
+    (see SCALING) the rows are binned and each rate is shown as its median
+    and interquartile band.
     """
     merged = data["merged"]
     if merged is None:
@@ -101,27 +302,43 @@ def fig_inaccuracy_vs_hallucination(data, fig_dir):
     df["gap"] = df["mean_inaccuracy"] - df["mean_hallucination"]
     df = df.sort_values("gap", ascending=True).reset_index(drop=True)
 
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(7, 10))
     y = np.arange(len(df))
+    summarise = len(df) > SCALING["summary_rows"]
+
+    if summarise:
+        # Median and interquartile range of each rate per bin of videos
+        bins = binned_quantiles(df, ["mean_inaccuracy", "mean_hallucination"],
+                                SCALING["summary_bins"])
+        for col, color, label in [("mean_inaccuracy", C_INACCURATE, "Inaccuracy rate"),
+                                  ("mean_hallucination", C_HALLUCINATION,
+                                   "Hallucination rate")]:
+            quantile_band(ax, bins["position"], bins[f"{col}_q25"], bins[f"{col}_q50"],
+                          bins[f"{col}_q75"], color=color, horizontal=True,
+                          label=f"{label} (median, IQR)", linewidth=1.2)
+    else:
+        dense = len(df) > SCALING["dense_rows"]
+        size = 28 if not dense else 6
 
-    # Connecting lines
-    for i, row in df.iterrows():
-        ax.plot(
-            [row["mean_hallucination"], row["mean_inaccuracy"]], [i, i],
-            color="#bdc3c7", linewidth=1, zorder=1,
-        )
+        # Connecting lines
+        row_segments(ax, df["mean_hallucination"], df["mean_inaccuracy"], y,
+                     colors="#bdc3c7", linewidths=1, zorder=1, rasterized=dense)
 
-    # Dots
-    ax.scatter(df["mean_inaccuracy"], y, color=C_INACCURATE, s=28, zorder=2,
-               label="Inaccuracy rate", edgecolors="#c0392b", linewidth=0.5)
-    ax.scatter(df["mean_hallucination"], y, color=C_HALLUCINATION, s=28, zorder=2,
-               label="Hallucination rate", edgecolors="#8e44ad", linewidth=0.5)
+        # Dots
+        ax.scatter(df["mean_inaccuracy"], y, color=C_INACCURATE, s=size, zorder=2,
+                   label="Inaccuracy rate", edgecolors="#c0392b", linewidth=0.5,
+                   rasterized=dense)
+        ax.scatter(df["mean_hallucination"], y, color=C_HALLUCINATION, s=size, zorder=2,
+                   label="Hallucination rate", edgecolors="#8e44ad", linewidth=0.5,
+                   rasterized=dense)
 
     ax.set_yticks([])
     ax.set_xlabel("Rate")
     ax.set_title(
         f"Per-Video Inaccuracy vs. Hallucination Rate\n"
-        f"(n = {len(df)} reports, sorted by gap)",
+        f"(n = {len(df)} reports, sorted by gap"
+        + (f"; {len(bins)} bins" if summarise else "") + ")",
         fontweight="bold",
     )
     ax.set_xlim(-0.02, 0.75)
@@ -148,11 +365,13 @@ def fig_inaccuracy_vs_hallucination(data, fig_dir):
 # FIGURE 2: Ranked accuracy waterfall with tail risk
 # ===================================================================
 
+@register("figure", "fig2_ranked_accuracy", inputs=("merged",))
 def fig_ranked_accuracy(data, fig_dir):
     """
     Bar chart of every video's accuracy, sorted worst-to-best, color-coded
     red→orange→yellow→green. Shaded region on the left highlights the
-    bottom 10% ("tail risk"). Mean line across the middle.
+    bottom 10% ("tail risk"). Mean line across the middle. For large
+    corpora (see SCALING) each bar is the median of a bin of videos.
     """
     merged = data["merged"]
     if merged is None:
@@ -162,6 +381,7 @@ def fig_ranked_accuracy(data, fig_dir):
     n = len(sorted_acc)
     n_tail = max(1, int(n * 0.10))
 
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(8, 5))
     x = np.arange(n)
 
@@ -170,19 +390,22 @@ def fig_ranked_accuracy(data, fig_dir):
     ax.axvline(n_tail - 0.5, color=C_INACCURATE, linewidth=1,
                linestyle="--", alpha=0.7)
 
+    # One bar per video, or per bin of videos (its median) for large corpora
+    if n > SCALING["summary_rows"]:
+        bins = binned_quantiles(sorted_acc.to_frame(), ["mean_accuracy"],
+                                SCALING["summary_bins"], quantiles=(0.5,))
+        x, heights, width = bins["position"], bins["mean_accuracy_q50"], bins["count"]
+    else:
+        heights, width = sorted_acc, 1.0
+
     # Color each bar by accuracy level
-    colors = []
-    for v in sorted_acc:
-        if v < 0.5:
-            colors.append("#e74c3c")
-        elif v < 0.7:
-            colors.append("#e67e22")
-        elif v < 0.85:
-            colors.append("#f1c40f")
-        else:
-            colors.append("#2ecc71")
+    colors = np.select(
+        [heights < 0.5, heights < 0.7, heights < 0.85],
+        ["#e74c3c", "#e67e22", "#f1c40f"], default="#2ecc71",
+    )
 
-    ax.bar(x, sorted_acc, color=colors, width=1.0, edgecolor="none", alpha=0.85)
+    bar_collection(ax, x, heights, width=width, facecolors=colors, edgecolors="none",
+                   alpha=0.85, rasterized=n > SCALING["dense_rows"])
 
     # Mean line
     mean_acc = sorted_acc.mean()
@@ -238,6 +461,7 @@ def fig_ranked_accuracy(data, fig_dir):
 # FIGURE 3: Error taxonomy with pipeline attribution
 # ===================================================================
 
+@register("figure", "fig3_pipeline_error_attribution", inputs=("errors_consensus",))
 def fig_pipeline_error_attribution(data, fig_dir):
     """
     Two-part figure. Top: pipeline flow diagram (BWC Audio → WhisperX ASR +
@@ -276,6 +500,7 @@ def fig_pipeline_error_attribution(data, fig_dir):
         stage = STAGE_MAP.get(etype, "Ambiguous")
         stage_counts[stage] = stage_counts.get(stage, 0) + count
 
+    plt = _pyplot()
     fig = plt.figure(figsize=(10, 7))
 
     # ---------- Top half: pipeline diagram ----------
@@ -379,6 +604,7 @@ def fig_pipeline_error_attribution(data, fig_dir):
 # FIGURE 4: Inter-rater agreement (confusion matrix + scatter)
 # ===================================================================
 
+@register("figure", "inter_rater_agreement", inputs=("consensus", "per_video"))
 def fig_inter_rater_agreement(data, fig_dir):
     """
     Left panel: 3×3 confusion matrix heatmap (Maya rows × Nasser columns).
@@ -389,26 +615,13 @@ def fig_inter_rater_agreement(data, fig_dir):
     if consensus is None or per_video is None:
         return
 
-    # -- Build confusion matrix --
-    labels_order = ["accurate", "inaccurate", "unsupported"]
-    label_display = ["Accurate", "Inaccurate", "Unsupported"]
-    cm = np.zeros((3, 3), dtype=int)
-    for _, row in consensus.iterrows():
-        ml = row["maya_label"]
-        nl = row["nasser_label"]
-        if ml in labels_order and nl in labels_order:
-            cm[labels_order.index(ml), labels_order.index(nl)] += 1
-
+    label_display = [label.capitalize() for label in LABELS]
+    cm = confusion_matrix(consensus)
     n_total = cm.sum()
-    raw_agreement = np.trace(cm) / n_total
-
-    # Cohen's kappa
-    p_o = raw_agreement
-    row_sums = cm.sum(axis=1) / n_total
-    col_sums = cm.sum(axis=0) / n_total
-    p_e = np.sum(row_sums * col_sums)
-    kappa = (p_o - p_e) / (1 - p_e) if (1 - p_e) != 0 else 0
+    kappa = agreement_stats(consensus).loc["cohen_kappa", "estimate"]
 
+    from scipy import stats
+    plt = _pyplot()
     fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 5))
 
     # -- Left: heatmap --
@@ -458,12 +671,14 @@ def fig_inter_rater_agreement(data, fig_dir):
 # FIGURE 5: Accuracy distributions (triple histogram)
 # ===================================================================
 
+@register("figure", "accuracy_distributions_actual", inputs=("merged",))
 def fig_accuracy_distributions(data, fig_dir):
     """Three overlaid histograms: accuracy, inaccuracy, hallucination rates."""
     merged = data["merged"]
     if merged is None:
         return
 
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(8, 5))
     bins = np.linspace(0, 1, 25)
 
@@ -488,18 +703,21 @@ def fig_accuracy_distributions(data, fig_dir):
 # FIGURE 6: Accuracy vs. narrative quality scatter
 # ===================================================================
 
+@register("figure", "accuracy_vs_quality_actual", inputs=("merged",))
 def fig_accuracy_vs_quality(data, fig_dir):
     """Scatter of mean accuracy vs. narrative quality with regression line."""
     merged = data["merged"]
     if merged is None or "narrative_quality" not in merged.columns:
         return
 
+    from scipy import stats
     valid = merged.dropna(subset=["mean_accuracy", "narrative_quality"])
     r_val, p_val = stats.pearsonr(valid["mean_accuracy"],
                                    valid["narrative_quality"])
     rho, rho_p = stats.spearmanr(valid["mean_accuracy"],
                                   valid["narrative_quality"])
 
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(7, 5))
     ax.scatter(valid["mean_accuracy"], valid["narrative_quality"],
                alpha=0.5, s=40, color="#3498db", edgecolors="#2980b9",
@@ -524,9 +742,10 @@ def fig_accuracy_vs_quality(data, fig_dir):
 # FIGURE 7: Sensitivity analysis (grouped bars)
 # ===================================================================
 
+@register("figure", "sensitivity_analysis", inputs=("facts", "merged"))
 def fig_sensitivity(data, fig_dir):
     """
-    Grouped bar chart: 4 approaches to resolving coder disagreements,
+    Grouped bar chart: approaches to resolving coder disagreements,
     each showing accuracy / inaccuracy / hallucination rates.
     """
     facts = data["facts"]
@@ -534,54 +753,26 @@ def fig_sensitivity(data, fig_dir):
     if facts is None or merged is None:
         return
 
-    both = facts.dropna(subset=["maya_label", "nasser_label"])
-    n = len(both)
-
-    # Strict
-    s_acc = ((both["maya_label"] == "accurate") &
-             (both["nasser_label"] == "accurate")).sum() / n
-    s_ina = ((both["maya_label"] == "inaccurate") &
-             (both["nasser_label"] == "inaccurate")).sum() / n
-    s_hal = ((both["maya_label"] == "unsupported") &
-             (both["nasser_label"] == "unsupported")).sum() / n
-
-    # Mean of coders
-    m_acc = merged["mean_accuracy"].mean()
-    m_ina = merged["mean_inaccuracy"].mean()
-    m_hal = merged["mean_hallucination"].mean()
-
-    # Lenient (either says accurate → accurate)
-    def _lenient(r):
-        if r["maya_label"] == "accurate" or r["nasser_label"] == "accurate":
-            return "accurate"
-        if r["maya_label"] == "unsupported" or r["nasser_label"] == "unsupported":
-            return "unsupported"
-        return "inaccurate"
-
-    lenient = both.apply(_lenient, axis=1)
-    l_acc = (lenient == "accurate").sum() / n
-    l_ina = (lenient == "inaccurate").sum() / n
-    l_hal = (lenient == "unsupported").sum() / n
-
-    # Generous (all disagreements → accurate)
-    def _generous(r):
-        if r["maya_label"] == r["nasser_label"]:
-            return r["maya_label"]
-        return "accurate"
-
-    generous = both.apply(_generous, axis=1)
-    g_acc = (generous == "accurate").sum() / n
-    g_ina = (generous == "inaccurate").sum() / n
-    g_hal = (generous == "unsupported").sum() / n
-
-    approaches = ["Strict\n(both agree)", "Mean of\ncoders",
-                  "Lenient\n(either acc.)", "Generous\n(disagree→acc.)"]
-    acc_vals = [s_acc, m_acc, l_acc, g_acc]
-    ina_vals = [s_ina, m_ina, l_ina, g_ina]
-    hal_vals = [s_hal, m_hal, l_hal, g_hal]
-
-    fig, ax = plt.subplots(figsize=(8, 4))
-    x = np.arange(4)
+    # Strict / mean of coders / (majority / reliability-weighted with >2
+    # coders) / lenient (either says accurate → accurate) / generous (all
+    # disagreements → accurate)
+    rates = policy_rates(facts, merged)
+    display = {
+        "strict": "Strict\n(both agree)",
+        "mean": "Mean of\ncoders",
+        "majority": "Majority\nvote",
+        "weighted": "Reliability-\nweighted",
+        "lenient": "Lenient\n(either acc.)",
+        "generous": "Generous\n(disagree→acc.)",
+    }
+    approaches = [display[policy] for policy in rates.index]
+    acc_vals = rates["accuracy"].tolist()
+    ina_vals = rates["inaccuracy"].tolist()
+    hal_vals = rates["hallucination"].tolist()
+
+    plt = _pyplot()
+    fig, ax = plt.subplots(figsize=(2 * len(approaches), 4))
+    x = np.arange(len(approaches))
     w = 0.25
     ax.bar(x - w, acc_vals, w, label="Accuracy", color=C_ACCURATE)
     ax.bar(x, ina_vals, w, label="Inaccuracy", color=C_INACCURATE)
@@ -603,21 +794,36 @@ def fig_sensitivity(data, fig_dir):
 # FIGURE 8: Coder comparison (side-by-side per-video accuracy bars)
 # ===================================================================
 
+@register("figure", "coder_comparison", inputs=("per_video",))
 def fig_coder_comparison(data, fig_dir):
-    """Side-by-side bars showing Maya vs Nasser accuracy for each video."""
+    """
+    Side-by-side bars showing Maya vs Nasser accuracy for each video; for
+    large corpora, each coder's median and IQR per bin of videos.
+    """
     pv = data["per_video"]
     if pv is None:
         return
 
     pv_sorted = pv.sort_values("mean_accuracy").reset_index(drop=True)
+    plt = _pyplot()
     fig, ax = plt.subplots(figsize=(10, 6))
     x = np.arange(len(pv_sorted))
     w = 0.4
-
-    ax.bar(x - w / 2, pv_sorted["maya_accuracy"], w, label="Maya",
-           color="#3498db", alpha=0.8)
-    ax.bar(x + w / 2, pv_sorted["nasser_accuracy"], w, label="Nasser",
-           color="#e67e22", alpha=0.8)
+    coders = [("maya_accuracy", "Maya", "#3498db", -w / 2),
+              ("nasser_accuracy", "Nasser", "#e67e22", w / 2)]
+
+    if len(pv_sorted) > SCALING["summary_rows"]:
+        bins = binned_quantiles(pv_sorted, [col for col, *_ in coders],
+                                SCALING["summary_bins"])
+        for col, label, color, _ in coders:
+            quantile_band(ax, bins["position"], bins[f"{col}_q25"], bins[f"{col}_q50"],
+                          bins[f"{col}_q75"], color=color, label=f"{label} (median, IQR)")
+        ax.set_ylim(bottom=0)
+    else:
+        dense = len(pv_sorted) > SCALING["dense_rows"]
+        for col, label, color, offset in coders:
+            bar_collection(ax, x + offset, pv_sorted[col], width=w, label=label,
+                           facecolors=color, alpha=0.8, rasterized=dense)
 
     ax.set_ylabel("Accuracy Rate")
     ax.set_xlabel("Videos (sorted by mean accuracy)")
@@ -634,6 +840,7 @@ def fig_coder_comparison(data, fig_dir):
 # FIGURE 9: Feature correlations
 # ===================================================================
 
+@register("figure", "feature_correlations", inputs=("merged",))
 def fig_feature_correlations(data, fig_dir):
     """Scatter matrix of transcript features vs accuracy."""
     merged = data["merged"]
@@ -647,6 +854,8 @@ def fig_feature_correlations(data, fig_dir):
     if len(available) < 2:
         return
 
+    from scipy import stats
+    plt = _pyplot()
     fig, axes = plt.subplots(1, len(available), figsize=(4 * len(available), 4))
     if len(available) == 1:
         axes = [axes]
@@ -671,56 +880,44 @@ def fig_feature_correlations(data, fig_dir):
 # TABLES
 # ===================================================================
 
+@register("table", "irr", inputs=("consensus", "likert"))
 def tab_irr(data, tab_dir):
-    """Inter-rater reliability table."""
+    """Inter-rater reliability table with video-clustered bootstrap CIs."""
     consensus = data["consensus"]
     if consensus is None:
         return
 
-    labels_order = ["accurate", "inaccurate", "unsupported"]
-    cm = np.zeros((3, 3), dtype=int)
-    for _, row in consensus.iterrows():
-        ml, nl = row["maya_label"], row["nasser_label"]
-        if ml in labels_order and nl in labels_order:
-            cm[labels_order.index(ml), labels_order.index(nl)] += 1
+    irr = agreement_stats(consensus)
+    n_total, n_coders = irr["n_units"].iloc[0], irr["n_coders"].iloc[0]
+    kappa, alpha = irr.loc["cohen_kappa", "estimate"], irr.loc["alpha", "estimate"]
 
-    n_total = cm.sum()
-    p_o = np.trace(cm) / n_total
-    row_sums = cm.sum(axis=1) / n_total
-    col_sums = cm.sum(axis=0) / n_total
-    p_e = np.sum(row_sums * col_sums)
-    kappa = (p_o - p_e) / (1 - p_e) if (1 - p_e) != 0 else 0
-
-    # Krippendorff's alpha (nominal) — simplified computation
-    # Using the observed disagreement / expected disagreement approach
-    labels = {"accurate": 0, "inaccurate": 1, "unsupported": 2}
-    vals = []
-    for _, row in consensus.iterrows():
-        if row["maya_label"] in labels and row["nasser_label"] in labels:
-            vals.append((labels[row["maya_label"]], labels[row["nasser_label"]]))
-    n_items = len(vals)
-    D_o = sum(1 for a, b in vals if a != b) / n_items
-    cats = [0, 1, 2]
-    freqs = {c: sum(1 for a, b in vals for v in (a, b) if v == c) for c in cats}
-    total_annotations = 2 * n_items
-    D_e = 1 - sum(freqs[c] * (freqs[c] - 1) for c in cats) / (
-        total_annotations * (total_annotations - 1))
-    alpha = 1 - D_o / D_e if D_e != 0 else 0
+    rows = [
+        ("Raw agreement", irr.loc["percent_agreement"]),
+        ("Cohen's $\\kappa$ (unweighted)" if n_coders == 2
+         else "Light's $\\kappa$ (mean pairwise Cohen's)", irr.loc["cohen_kappa"]),
+        ("Fleiss' $\\kappa$", irr.loc["fleiss_kappa"]),
+        ("Krippendorff's $\\alpha$ (nominal)", irr.loc["alpha"]),
+    ]
+    likert = data["likert"]
+    if likert is not None:
+        ordinal = likert_agreement(likert)
+        rows.append(("Krippendorff's $\\alpha$ (ordinal, Likert items)",
+                     ordinal.loc["alpha"]))
 
     with open(tab_dir / "irr.tex", "w") as f:
         f.write(r"""\begin{table}[t]
-\caption{Inter-Rater Reliability}
+\caption{Inter-Rater Reliability (95\% CIs: bootstrap over videos)}
 \label{tab:irr}
 \small
-\begin{tabular}{lr}
+\begin{tabular}{lrc}
 \toprule
-\textbf{Metric} & \textbf{Value} \\
+\textbf{Metric} & \textbf{Value} & \textbf{95\% CI} \\
 \midrule
 """)
-        f.write(f"N (jointly coded facts) & {n_total:,} \\\\\n")
-        f.write(f"Raw agreement & {p_o:.3f} \\\\\n")
-        f.write(f"Cohen's $\\kappa$ (unweighted) & {kappa:.3f} \\\\\n")
-        f.write(f"Krippendorff's $\\alpha$ (nominal) & {alpha:.3f} \\\\\n")
+        f.write(f"N (jointly coded facts) & {n_total:,} & \\\\\n")
+        for label, stat in rows:
+            f.write(f"{label} & {stat['estimate']:.3f} & "
+                    f"[{stat['ci_low']:.3f}, {stat['ci_high']:.3f}] \\\\\n")
         f.write(r"""\bottomrule
 \end{tabular}
 \end{table}
@@ -728,39 +925,44 @@ def tab_irr(data, tab_dir):
     print(f"  table: irr.tex  (κ={kappa:.3f}, α={alpha:.3f})")
 
 
+@register("table", "summary_stats_actual", inputs=("facts", "merged"))
 def tab_summary_stats(data, tab_dir):
-    """Summary statistics with 95% CIs."""
+    """
+    Summary statistics with 95% percentile and BCa CIs from a bootstrap
+    over videos (facts are clustered within videos).
+    """
     merged = data["merged"]
     if merged is None:
         return
 
-    def _ci(col):
-        m = col.mean()
-        se = col.std() / np.sqrt(len(col))
-        return m, m - 1.96 * se, m + 1.96 * se, col.std(), col.min(), col.max()
-
+    stats = summary_intervals(data["facts"], merged)
     metrics = [
-        ("Accuracy Rate",    merged["mean_accuracy"]),
-        ("Inaccuracy Rate",  merged["mean_inaccuracy"]),
-        ("Hallucination Rate", merged["mean_hallucination"]),
+        ("Accuracy Rate",    "accuracy"),
+        ("Inaccuracy Rate",  "inaccuracy"),
+        ("Hallucination Rate", "hallucination"),
+        ("Narrative Quality", "quality"),
     ]
-    if "narrative_quality" in merged.columns:
-        metrics.append(("Narrative Quality", merged["narrative_quality"]))
 
     with open(tab_dir / "summary_stats_actual.tex", "w") as f:
         f.write(r"""\begin{table}[t]
-\caption{Summary Statistics (Mean-of-Coders)}
+\caption{Summary Statistics (Mean-of-Coders). 95\% CIs from a bootstrap
+over videos (percentile and BCa).}
 \label{tab:summary}
 \small
-\begin{tabular}{lcccc}
+\begin{tabular}{lccccc}
 \toprule
-\textbf{Metric} & \textbf{Mean} & \textbf{95\% CI} & \textbf{SD} & \textbf{Range} \\
+\textbf{Metric} & \textbf{Mean} & \textbf{95\% CI (pct.)} & \textbf{95\% CI (BCa)}
+& \textbf{SD} & \textbf{Range} \\
 \midrule
 """)
-        for label, col in metrics:
-            m, lo, hi, sd, mn, mx = _ci(col.dropna())
-            f.write(f"{label} & {m:.3f} & [{lo:.3f}, {hi:.3f}] "
-                    f"& {sd:.3f} & [{mn:.3f}, {mx:.3f}] \\\\\n")
+        for label, name in metrics:
+            if name not in stats.index:
+                continue
+            row = stats.loc[name]
+            f.write(f"{label} & {row['estimate']:.3f} "
+                    f"& [{row['pct_low']:.3f}, {row['pct_high']:.3f}] "
+                    f"& [{row['bca_low']:.3f}, {row['bca_high']:.3f}] "
+                    f"& {row['sd']:.3f} & [{row['min']:.3f}, {row['max']:.3f}] \\\\\n")
         f.write(r"""\bottomrule
 \end{tabular}
 \end{table}
@@ -768,51 +970,24 @@ def tab_summary_stats(data, tab_dir):
     print(f"  table: summary_stats_actual.tex")
 
 
+@register("table", "sensitivity", inputs=("facts", "merged"))
 def tab_sensitivity(data, tab_dir):
-    """Sensitivity analysis table (4 approaches)."""
+    """Sensitivity analysis table (one row per resolution approach)."""
     facts = data["facts"]
     merged = data["merged"]
     if facts is None or merged is None:
         return
 
-    both = facts.dropna(subset=["maya_label", "nasser_label"])
-    n = len(both)
-
-    rows = []
-
-    # Strict
-    rows.append(("Strict (both agree)",
-                 ((both["maya_label"] == "accurate") & (both["nasser_label"] == "accurate")).sum() / n,
-                 ((both["maya_label"] == "inaccurate") & (both["nasser_label"] == "inaccurate")).sum() / n,
-                 ((both["maya_label"] == "unsupported") & (both["nasser_label"] == "unsupported")).sum() / n))
-
-    # Mean of coders
-    rows.append(("Mean-of-coders",
-                 merged["mean_accuracy"].mean(),
-                 merged["mean_inaccuracy"].mean(),
-                 merged["mean_hallucination"].mean()))
-
-    # Lenient
-    def _len(r):
-        if r["maya_label"] == "accurate" or r["nasser_label"] == "accurate":
-            return "accurate"
-        if r["maya_label"] == "unsupported" or r["nasser_label"] == "unsupported":
-            return "unsupported"
-        return "inaccurate"
-    lenient = both.apply(_len, axis=1)
-    rows.append(("Lenient (either accurate)",
-                 (lenient == "accurate").sum() / n,
-                 (lenient == "inaccurate").sum() / n,
-                 (lenient == "unsupported").sum() / n))
-
-    # Generous
-    def _gen(r):
-        return r["maya_label"] if r["maya_label"] == r["nasser_label"] else "accurate"
-    generous = both.apply(_gen, axis=1)
-    rows.append(("Generous (disagree$\\rightarrow$accurate)",
-                 (generous == "accurate").sum() / n,
-                 (generous == "inaccurate").sum() / n,
-                 (generous == "unsupported").sum() / n))
+    rates = policy_rates(facts, merged)
+    display = {
+        "strict": "Strict (both agree)",
+        "mean": "Mean-of-coders",
+        "majority": "Majority vote",
+        "weighted": "Reliability-weighted vote",
+        "lenient": "Lenient (either accurate)",
+        "generous": "Generous (disagree$\\rightarrow$accurate)",
+    }
+    rows = [(display[policy], *rates.loc[policy]) for policy in rates.index]
 
     with open(tab_dir / "sensitivity.tex", "w") as f:
         f.write(r"""\begin{table}[t]
@@ -834,6 +1009,7 @@ def tab_sensitivity(data, tab_dir):
     print(f"  table: sensitivity.tex")
 
 
+@register("table", "grounded_error_taxonomy", inputs=("errors_consensus",))
 def tab_error_taxonomy(data, tab_dir):
     """Grounded error taxonomy table."""
     errors = data["errors_consensus"]
@@ -865,12 +1041,18 @@ def tab_error_taxonomy(data, tab_dir):
     print(f"  table: grounded_error_taxonomy.tex")
 
 
+@register("table", "tail_analysis", inputs=("merged", "corpus"))
 def tab_tail_analysis(data, tab_dir):
-    """Tail analysis: bottom 10% vs rest."""
+    """Tail analysis: bottom 10% vs rest (report length from the corpus, if built)."""
     merged = data["merged"]
     if merged is None:
         return
 
+    from scipy import stats
+
+    if data["corpus"] is not None:
+        merged = merged.join(corpus_columns(data["corpus"], merged["video_id"]))
+
     n_tail = max(1, int(len(merged) * 0.10))
     sorted_df = merged.sort_values("mean_accuracy")
     tail = sorted_df.head(n_tail)
@@ -883,7 +1065,9 @@ def tab_tail_analysis(data, tab_dir):
                         ("narrative_quality", "Narrative Quality"),
                         ("n_speakers", "N Speakers"),
                         ("total_transcript_words", "Transcript Words"),
-                        ("transcript_duration_sec", "Duration (sec)")]:
+                        ("transcript_duration_sec", "Duration (sec)"),
+                        ("narrative_words", "Report Words"),
+                        ("narrative_facts", "Report Atomic Facts")]:
         if col not in merged.columns:
             continue
         t_mean = tail[col].mean()
@@ -919,6 +1103,7 @@ def tab_tail_analysis(data, tab_dir):
     print(f"  table: tail_analysis.tex")
 
 
+@register("table", "likert_items", inputs=("likert", "merged"))
 def tab_likert_items(data, tab_dir):
     """Per-item Likert statistics + Cronbach's alpha."""
     likert = data["likert"]
@@ -929,8 +1114,9 @@ def tab_likert_items(data, tab_dir):
     val_map = {"strongly_disagree": 1, "disagree": 2, "agree": 3,
                "strongly_agree": 4, "not_applicable": np.nan}
 
-    likert["maya_num"] = likert["maya_value"].map(val_map)
-    likert["nasser_num"] = likert["nasser_value"].map(val_map)
+    # On a copy: data["likert"] is shared with (and memoised by) paper_metrics
+    likert = likert.assign(maya_num=likert["maya_value"].map(val_map),
+                           nasser_num=likert["nasser_value"].map(val_map))
     likert["mean_num"] = likert[["maya_num", "nasser_num"]].mean(axis=1)
 
     item_stats = likert.groupby("question").agg(
@@ -982,28 +1168,20 @@ def tab_likert_items(data, tab_dir):
     print(f"  table: likert_items.tex  (α={alpha:.3f})")
 
 
+@register("table", "regression", inputs=("merged",))
 def tab_regression(data, tab_dir):
     """Multiple regression: predictors of accuracy."""
     merged = data["merged"]
     if merged is None:
         return
 
-    predictors = ["n_speakers", "total_transcript_words", "transcript_duration_sec"]
-    available = [p for p in predictors if p in merged.columns]
-    if not available:
+    fits = accuracy_regression(merged)
+    if fits is None:
         return
+    model = fits.full
 
-    valid = merged.dropna(subset=["mean_accuracy"] + available)
-    X = valid[available]
-    y = valid["mean_accuracy"]
-
-    try:
-        import statsmodels.api as sm
-        X_const = sm.add_constant(X)
-        model = sm.OLS(y, X_const).fit()
-
-        with open(tab_dir / "regression.tex", "w") as f:
-            f.write(r"""\begin{table}[t]
+    with open(tab_dir / "regression.tex", "w") as f:
+        f.write(r"""\begin{table}[t]
 \caption{Multiple Regression: Predictors of Factual Accuracy}
 \label{tab:regression}
 \small
@@ -1012,29 +1190,80 @@ def tab_regression(data, tab_dir):
 \textbf{Predictor} & \textbf{$\beta$} & \textbf{SE} & \textbf{$t$} & \textbf{$p$} \\
 \midrule
 """)
-            f.write(f"(Intercept) & {model.params['const']:.4f} & "
-                    f"{model.bse['const']:.4f} & {model.tvalues['const']:.2f} & "
-                    f"{model.pvalues['const']:.3f} \\\\\n")
-            for pred in available:
-                label = pred.replace("_", " ").title()
-                f.write(f"{label} & {model.params[pred]:.4f} & "
-                        f"{model.bse[pred]:.4f} & {model.tvalues[pred]:.2f} & "
-                        f"{model.pvalues[pred]:.3f} \\\\\n")
-            f.write(f"\\midrule\n\\multicolumn{{5}}{{l}}"
-                    f"{{$R^2$ = {model.rsquared:.3f}, "
-                    f"Adj. $R^2$ = {model.rsquared_adj:.3f}, "
-                    f"F({model.df_model:.0f},{model.df_resid:.0f}) = "
-                    f"{model.fvalue:.2f}, p = {model.f_pvalue:.4f}}} \\\\\n")
-            f.write(r"""\bottomrule
+        for i, term in enumerate(fits.terms):
+            label = "(Intercept)" if term == "const" else term.replace("_", " ").title()
+            f.write(f"{label} & {model.params[0, i]:.4f} & "
+                    f"{model.bse[0, i]:.4f} & {model.tvalues[0, i]:.2f} & "
+                    f"{model.pvalues[0, i]:.3f} \\\\\n")
+        f.write(f"\\midrule\n\\multicolumn{{5}}{{l}}"
+                f"{{$R^2$ = {model.rsquared[0]:.3f}, "
+                f"Adj. $R^2$ = {model.rsquared_adj[0]:.3f}, "
+                f"F({model.df_model:.0f},{model.df_resid[0]:.0f}) = "
+                f"{model.fvalue[0]:.2f}, p = {model.f_pvalue[0]:.4f}}} \\\\\n")
+        f.write(r"""\bottomrule
 \end{tabular}
 \end{table}
 """)
-        print(f"  table: regression.tex  (R²={model.rsquared:.3f})")
+    print(f"  table: regression.tex  (R²={model.rsquared[0]:.3f})")
 
-    except ImportError:
-        print("  WARNING: statsmodels not installed, skipping regression table")
 
+@register("table", "regression_stability", inputs=("merged",))
+def tab_regression_stability(data, tab_dir):
+    """
+    Stability of the accuracy regression: HC3 robust SEs, the range of each
+    coefficient over leave-one-video-out fits, bootstrap CIs over videos,
+    and the coefficients refitted within each subset (model / error type).
+    """
+    merged = data["merged"]
+    if merged is None:
+        return
 
+    fits = accuracy_regression(merged)
+    if fits is None:
+        return
+    labels = ["(Intercept)" if t == "const" else t.replace("_", " ").title()
+              for t in fits.terms]
+    beta = fits.full.params[0]
+    boot = fits.bootstrap.params
+    boot_lo, boot_hi = np.nanquantile(boot, [0.025, 0.975], axis=0)
+    same_sign = (np.sign(boot) == np.sign(beta)).mean(axis=0)
+
+    with open(tab_dir / "regression_stability.tex", "w") as f:
+        f.write(rf"""\begin{{table}}[t]
+\caption{{Stability of the Accuracy Regression ({len(boot)} bootstrap resamples
+of videos, {len(fits.loo.params)} leave-one-video-out fits)}}
+\label{{tab:regression_stability}}
+\small
+\begin{{tabular}}{{lccccc}}
+\toprule
+\textbf{{Predictor}} & \textbf{{$\beta$}} & \textbf{{HC3 SE}} & \textbf{{LOO range}}
+& \textbf{{Bootstrap 95\% CI}} & \textbf{{Same sign}} \\
+\midrule
+""")
+        for i, label in enumerate(labels):
+            f.write(f"{label} & {beta[i]:.4f} & {fits.robust.bse[0, i]:.4f} & "
+                    f"[{np.nanmin(fits.loo.params[:, i]):.4f}, "
+                    f"{np.nanmax(fits.loo.params[:, i]):.4f}] & "
+                    f"[{boot_lo[i]:.4f}, {boot_hi[i]:.4f}] & "
+                    f"{same_sign[i] * 100:.0f}\\% \\\\\n")
+        f.write("\\bottomrule\n\\end{tabular}\n")
+
+        if fits.subsets:
+            f.write("\n\\vspace{1ex}\n"
+                    f"\\begin{{tabular}}{{l{'c' * (len(labels) + 1)}}}\n\\toprule\n"
+                    "\\textbf{Subset} & \\textbf{$n$} & "
+                    + " & ".join(f"\\textbf{{{label}}}" for label in labels)
+                    + " \\\\\n\\midrule\n")
+            for (column, value, n), params in zip(fits.subsets, fits.subset_fits.params):
+                name = _tex_escape(f"{column.replace('_', ' ')} = {value}")
+                f.write(f"{name} & {n} & "
+                        + " & ".join(f"{b:.4f}" for b in params) + " \\\\\n")
+            f.write("\\bottomrule\n\\end{tabular}\n")
+        f.write("\\end{table}\n")
+    print(f"  table: regression_stability.tex  ({len(fits.subsets)} subsets)")
+
+
+@register("table", "error_examples", inputs=("errors_consensus",))
 def tab_error_examples(data, tab_dir):
     """Representative error examples with source transcript."""
     errors = data["errors_consensus"]
@@ -1084,6 +1313,7 @@ def tab_error_examples(data, tab_dir):
     print(f"  table: error_examples.tex  ({len(examples)} examples)")
 
 
+@register("table", "disagreement_patterns", inputs=("consensus",))
 def tab_disagreement_patterns(data, tab_dir):
     """How the coders disagree: which label swaps dominate."""
     consensus = data["consensus"]
@@ -1093,7 +1323,8 @@ def tab_disagreement_patterns(data, tab_dir):
     disagree = consensus[consensus["maya_label"] != consensus["nasser_label"]]
     n_disagree = len(disagree)
 
-    patterns = disagree.groupby(["maya_label", "nasser_label"]).size().sort_values(
+    patterns = disagree.groupby(["maya_label", "nasser_label"],
+                                observed=True).size().sort_values(
         ascending=False)
 
     with open(tab_dir / "disagreement_patterns.tex", "w") as f:
@@ -1126,7 +1357,7 @@ def _save(fig, fig_dir, name):
     """Save figure as PDF and PNG."""
     fig.savefig(fig_dir / f"{name}.pdf")
     fig.savefig(fig_dir / f"{name}.png")
-    plt.close(fig)
+    _pyplot().close(fig)
     print(f"  figure: {name}.pdf")
 
 
@@ -1138,6 +1369,310 @@ def _tex_escape(s):
     return s
 
 
+# ===================================================================
+# BUILD CACHE
+# ===================================================================
+
+BUILD_CACHE_FILE = ".build_cache.json"
+DATA_CACHE_DIR = ".data_cache"
+_SCRIPT_DIR = Path(__file__).resolve().parent
+
+# (path, mtime_ns, size) -> sha256, so unchanged CSVs are hashed once
+_DIGESTS = {}
+
+
+def _file_digest(path: Path) -> str:
+    """SHA-256 of a file's contents ("missing" if it does not exist)."""
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return "missing"
+    key = (str(path), st.st_mtime_ns, st.st_size)
+    if key not in _DIGESTS:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        _DIGESTS[key] = h.hexdigest()
+    return _DIGESTS[key]
+
+
+def _is_local(obj) -> bool:
+    """True for functions/modules defined in this directory (not libraries)."""
+    path = getattr(inspect.getmodule(obj), "__file__", None)
+    return path is not None and Path(path).resolve().parent == _SCRIPT_DIR
+
+
+def _global_names(code) -> set:
+    """Global names referenced by a code object, including nested lambdas and
+    comprehensions."""
+    names = set(code.co_names)
+    for const in code.co_consts:
+        if inspect.iscode(const):
+            names |= _global_names(const)
+    return names
+
+
+def _methods(cls) -> list:
+    """
+    Plain functions behind the methods, static/class methods and properties
+    written in `cls`'s source (not those generated, e.g. by @dataclass).
+    """
+    funcs = []
+    for attr in vars(cls).values():
+        if isinstance(attr, (staticmethod, classmethod)):
+            funcs.append(attr.__func__)
+        elif isinstance(attr, property):
+            funcs += [attr.fget, attr.fset, attr.fdel]
+        else:
+            funcs.append(attr)
+    source_file = inspect.getsourcefile(cls)
+    return [f for f in funcs
+            if inspect.isfunction(f) and f.__code__.co_filename == source_file]
+
+
+def _code_fingerprint(func, seen=None) -> str:
+    """
+    Source of `func` plus the source of every local helper function or class
+    it uses (recursively, including those imported from sibling modules such
+    as paper_metrics or reliability, and the helpers their methods call) and
+    the values of the constants it uses, so editing e.g. _save(),
+    ReliabilityStats or a colour invalidates the outputs that depend on it.
+    """
+    seen = set() if seen is None else seen
+    func = inspect.unwrap(func)
+    parts = [inspect.getsource(func)]
+    for name in sorted(_global_names(func.__code__) - seen):
+        seen.add(name)
+        value = func.__globals__.get(name)
+        if inspect.isfunction(value) and _is_local(value):
+            parts.append(_code_fingerprint(value, seen))
+        elif inspect.isclass(value) and _is_local(value):
+            parts.append(inspect.getsource(value))
+            for method in _methods(value):
+                parts.append(_code_fingerprint(method, seen))
+        elif inspect.ismodule(value) and _is_local(value):
+            parts.append(inspect.getsource(value))
+        elif isinstance(value, (str, int, float, tuple)):
+            parts.append(f"{name} = {value!r}")
+    return "\n".join(parts)
+
+
+def _output_paths(artifact, fig_dir, tab_dir) -> list:
+    if artifact.kind == "figure":
+        return [fig_dir / f"{artifact.name}.pdf", fig_dir / f"{artifact.name}.png"]
+    return [tab_dir / f"{artifact.name}.tex"]
+
+
+class BuildCache:
+    """
+    Record of the input hashes each output was last built from, stored as
+    .build_cache.json in the output directory. An output is stale when the
+    hash of its declared input CSVs, its code, the plot style or the scaling
+    thresholds changed, or
+    when one of its files is missing.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.entries = {}
+        if path.exists():
+            try:
+                self.entries = json.loads(path.read_text())
+            except (OSError, json.JSONDecodeError):
+                self.entries = {}
+
+    def key(self, artifact, data_dir) -> str:
+        h = hashlib.sha256()
+        h.update(_code_fingerprint(artifact.func).encode())
+        h.update(repr(sorted(STYLE.items())).encode())
+        h.update(repr(sorted(SCALING.items())).encode())
+        for name in artifact.inputs:
+            digest = _file_digest(data_dir / DATA_FILES[name])
+            h.update(f"{name}:{digest}\n".encode())
+        return h.hexdigest()
+
+    def is_stale(self, artifact, key, fig_dir, tab_dir) -> bool:
+        entry = self.entries.get(artifact.name)
+        if entry is None or entry.get("key") != key:
+            return True
+        return not all(p.exists() for p in _output_paths(artifact, fig_dir, tab_dir))
+
+    def record(self, artifact, key, fig_dir, tab_dir):
+        """Remember a successful build (skipped if it wrote no output, e.g.
+        because its data was missing)."""
+        if all(p.exists() for p in _output_paths(artifact, fig_dir, tab_dir)):
+            self.entries[artifact.name] = {"key": key, "inputs": list(artifact.inputs)}
+
+    def save(self):
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.entries, indent=1, sort_keys=True))
+        tmp.replace(self.path)
+
+
+# ===================================================================
+# RENDERING
+# ===================================================================
+
+def select_artifacts(only=None, exclude=None) -> list:
+    """
+    Registered artifacts matching any --only pattern and no --exclude pattern.
+    Patterns are globs matched against the output name ("fig2_*") and the
+    function name ("tab_*"); "figure" / "table" select a whole kind.
+    """
+    def matches(art, patterns):
+        return any(
+            p == art.kind or fnmatch(art.name, p) or fnmatch(art.func.__name__, p)
+            for p in patterns
+        )
+
+    selected = list(ARTIFACTS.values())
+    if only:
+        selected = [a for a in selected if matches(a, only)]
+    if exclude:
+        selected = [a for a in selected if not matches(a, exclude)]
+    return selected
+
+
+def _render(artifact, data, fig_dir, tab_dir) -> float:
+    """Render one artifact; returns elapsed seconds."""
+    out_dir = fig_dir if artifact.kind == "figure" else tab_dir
+    start = time.perf_counter()
+    artifact.func(data, out_dir)
+    return time.perf_counter() - start
+
+
+# Per-process state of pool workers (set by _init_worker)
+_WORKER = {}
+
+
+def _init_worker(data_dir, fig_dir, tab_dir, cache_dir, scaling):
+    """Set up the (lazily loaded) data once per worker process."""
+    SCALING.update(scaling)
+    _WORKER["data"] = load_all_data(data_dir, verbose=False, cache_dir=cache_dir)
+    _WORKER["dirs"] = (fig_dir, tab_dir)
+
+
+def _render_in_worker(name):
+    """Render by name in a worker; returns (name, seconds, captured stdout)."""
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        elapsed = _render(ARTIFACTS[name], _WORKER["data"], *_WORKER["dirs"])
+    return name, elapsed, log.getvalue()
+
+
+def render_all(selected, data, fig_dir, tab_dir, jobs=1) -> dict:
+    """
+    Render the selected artifacts, sequentially or in a process pool.
+
+    Every worker is a separate process with its own matplotlib (Agg) state
+    and its own lazily loaded copy of the data (same data and cache
+    directories as `data`), so figures never share pyplot globals and each
+    worker only reads the CSVs its outputs need.
+    Returns {name: seconds}.
+    """
+    timings = {}
+    if jobs <= 1 or len(selected) <= 1:
+        for art in selected:
+            timings[art.name] = _render(art, data, fig_dir, tab_dir)
+        return timings
+
+    with ProcessPoolExecutor(
+        max_workers=min(jobs, len(selected)),
+        initializer=_init_worker,
+        initargs=(data.data_dir, fig_dir, tab_dir, data.cache_dir, dict(SCALING)),
+    ) as pool:
+        futures = [pool.submit(_render_in_worker, art.name) for art in selected]
+        for future in as_completed(futures):
+            name, elapsed, log = future.result()
+            timings[name] = elapsed
+            print(log, end="")
+    return timings
+
+
+def build(selected, cache, data_dir, fig_dir, tab_dir, jobs=1, force=False,
+          data_cache=None) -> dict:
+    """
+    Render the stale subset of `selected` (all of it with force=True), record
+    the rebuilt outputs in the build cache and report render times.
+    `data_cache` is the LazyData cache directory.
+    Returns {name: seconds} for the outputs that were rendered.
+    """
+    keys = {art.name: cache.key(art, data_dir) for art in selected}
+    stale = [art for art in selected
+             if force or cache.is_stale(art, keys[art.name], fig_dir, tab_dir)]
+    if not stale:
+        print(f"\nAll {len(selected)} selected outputs are up to date "
+              f"(use --force to rebuild).")
+        return {}
+
+    # Fresh on every build so --watch sees the changed CSVs; nothing is read
+    # until a render function asks for it
+    data = load_all_data(data_dir, cache_dir=data_cache)
+
+    print(f"\nRendering {len(stale)} of {len(selected)} selected outputs "
+          f"({len(selected) - len(stale)} up to date; "
+          f"{'sequentially' if jobs <= 1 else f'{jobs} workers'})...")
+    start = time.perf_counter()
+    timings = render_all(stale, data, fig_dir, tab_dir, jobs=jobs)
+    wall = time.perf_counter() - start
+
+    for art in stale:
+        cache.record(art, keys[art.name], fig_dir, tab_dir)
+    cache.save()
+
+    print("\nRender times:")
+    for art in stale:
+        print(f"  {art.kind:<6}  {art.name:<36} {timings[art.name]:6.2f}s")
+    print(f"  total {sum(timings.values()):.2f}s of rendering in {wall:.2f}s wall time")
+    return timings
+
+
+def _input_stamps(data_dir) -> dict:
+    """(mtime_ns, size) of every data CSV (None if missing)."""
+    stamps = {}
+    for key, fname in DATA_FILES.items():
+        try:
+            st = (data_dir / fname).stat()
+            stamps[key] = (st.st_mtime_ns, st.st_size)
+        except FileNotFoundError:
+            stamps[key] = None
+    return stamps
+
+
+def watch(selected, cache, data_dir, fig_dir, tab_dir, jobs=1, interval=2.0,
+          data_cache=None):
+    """
+    Poll the data CSVs and rebuild the outputs that read a changed file.
+    The build cache still compares content hashes, so a CSV that was only
+    touched (or rewritten unchanged) triggers no rendering.
+    """
+    stamps = _input_stamps(data_dir)
+    print(f"\nWatching {data_dir} every {interval:g}s (Ctrl-C to stop)...")
+    try:
+        while True:
+            time.sleep(interval)
+            current = _input_stamps(data_dir)
+            changed = {key for key in current if current[key] != stamps[key]}
+            stamps = current
+            if not changed:
+                continue
+            print(f"\nChanged: {', '.join(sorted(DATA_FILES[k] for k in changed))}")
+            affected = [art for art in selected if changed & set(art.inputs)]
+            if not affected:
+                print("  (no selected output reads these files)")
+                continue
+            try:
+                build(affected, cache, data_dir, fig_dir, tab_dir, jobs=jobs,
+                      data_cache=data_cache)
+            except Exception:
+                # Keep watching: the CSV may be half-written or the fix is
+                # one save away
+                traceback.print_exc()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+
+
 # ===================================================================
 # MAIN
 # ===================================================================
@@ -1156,8 +1691,64 @@ def main():
         help="Path to write figures/ and tables/ "
              "(default: same directory as this script)",
     )
+    parser.add_argument(
+        "--only", nargs="+", metavar="PATTERN", default=None,
+        help="Render only outputs matching these globs (output name, function "
+             "name, or 'figure'/'table')",
+    )
+    parser.add_argument(
+        "--exclude", nargs="+", metavar="PATTERN", default=None,
+        help="Skip outputs matching these globs",
+    )
+    parser.add_argument(
+        "--jobs", "-j", type=int, default=1,
+        help="Worker processes for rendering (0 = one per CPU; default: 1)",
+    )
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Rebuild the selected outputs even if they are up to date",
+    )
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="After building, keep polling the data CSVs and rebuild the "
+             "outputs that depend on a changed file",
+    )
+    parser.add_argument(
+        "--watch-interval", type=float, default=2.0,
+        help="Seconds between polls in --watch mode (default: 2)",
+    )
+    parser.add_argument(
+        "--no-data-cache", action="store_true",
+        help="Always parse the CSVs (don't read or write the binary data cache)",
+    )
+    parser.add_argument(
+        "--summary-rows", type=int, default=SCALING["summary_rows"],
+        help="Per-video figures with more videos than this show binned "
+             f"quantiles instead of one mark per video (default: {SCALING['summary_rows']})",
+    )
+    parser.add_argument(
+        "--summary-bins", type=int, default=SCALING["summary_bins"],
+        help=f"Number of bins in those summaries (default: {SCALING['summary_bins']})",
+    )
+    parser.add_argument(
+        "--list", action="store_true",
+        help="List the available outputs and exit",
+    )
     args = parser.parse_args()
 
+    if args.list:
+        for art in ARTIFACTS.values():
+            print(f"{art.kind:<6}  {art.name:<36} {art.func.__name__}")
+        return
+
+    SCALING.update(summary_rows=args.summary_rows, summary_bins=args.summary_bins)
+
+    selected = select_artifacts(args.only, args.exclude)
+    if not selected:
+        parser.error("no outputs match the --only/--exclude patterns "
+                     "(see --list)")
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+
     script_dir = Path(__file__).resolve().parent
 
     data_dir = Path(args.data_dir) if args.data_dir else (script_dir.parent / "results")
@@ -1175,38 +1766,19 @@ def main():
     print(f"  Tables:  {tab_dir}")
     print("=" * 60)
 
-    # Load data
-    print("\nLoading data...")
-    data = load_all_data(data_dir)
-
-    # Generate figures
-    print("\nGenerating figures...")
-    fig_inaccuracy_vs_hallucination(data, fig_dir)
-    fig_ranked_accuracy(data, fig_dir)
-    fig_pipeline_error_attribution(data, fig_dir)
-    fig_inter_rater_agreement(data, fig_dir)
-    fig_accuracy_distributions(data, fig_dir)
-    fig_accuracy_vs_quality(data, fig_dir)
-    fig_sensitivity(data, fig_dir)
-    fig_coder_comparison(data, fig_dir)
-    fig_feature_correlations(data, fig_dir)
-
-    # Generate tables
-    print("\nGenerating tables...")
-    tab_irr(data, tab_dir)
-    tab_summary_stats(data, tab_dir)
-    tab_sensitivity(data, tab_dir)
-    tab_error_taxonomy(data, tab_dir)
-    tab_tail_analysis(data, tab_dir)
-    tab_likert_items(data, tab_dir)
-    tab_regression(data, tab_dir)
-    tab_error_examples(data, tab_dir)
-    tab_disagreement_patterns(data, tab_dir)
+    cache = BuildCache(output_dir / BUILD_CACHE_FILE)
+    data_cache = None if args.no_data_cache else output_dir / DATA_CACHE_DIR
+    build(selected, cache, data_dir, fig_dir, tab_dir, jobs=jobs, force=args.force,
+          data_cache=data_cache)
 
     print("\n" + "=" * 60)
     print("Done! All outputs in:", output_dir)
     print("=" * 60)
 
+    if args.watch:
+        watch(selected, cache, data_dir, fig_dir, tab_dir, jobs=jobs,
+              interval=args.watch_interval, data_cache=data_cache)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,384 @@
+#!/usr/bin/env python3
+"""
+Ingest the survey app's coder responses into the label tables.
+
+The survey app keeps one file per coder, survey-app/responses/<username>.json,
+rewritten whole on every save:
+
+    {"video_01": {"likertQuestions": [{"id", "question", "value"}, ...],
+                  "atomicFacts":     [{"id", "fact", "value"}, ...],
+                  "timestamp": ...}, ...}
+
+Each file is parsed into long-form answer tables (one row per answered fact /
+Likert item) that are cached under <data-dir>/.ingest_cache/ together with
+the file's SHA-256, so a rerun only parses the files of coders who saved
+something since the last run. The answers of all coders are then joined to
+the fact lists in survey-app/data/Atomic Facts/atomic_facts_NN.txt by
+(video, fact index); an answer whose fact text no longer matches its index
+(the fact list was edited after coding) is re-matched by its text within the
+video, and dropped with a warning if that fails.
+
+Updates, in the data directory:
+
+  - all_fact_labels.csv: one row per fact of every coded video, a
+    `<coder>_label` column per coder,
+  - consensus_labels.csv: the facts labelled by every coder of their video,
+  - all_likert_labels.csv: one row per video × Likert item, a
+    `<coder>_value` column per coder.
+
+Only the columns of coders with a response file are replaced; other coders'
+columns (e.g. from an earlier coding round) and rows are kept; a table from
+before fact ids were recorded (video_id, fact_text, <coder>_label) is matched
+by fact text instead. With --scores the per-video score tables are
+re-derived afterwards (see derive_scores.py).
+
+Usage:
+    python ingest_responses.py
+    python ingest_responses.py --scores
+    python ingest_responses.py --responses-dir survey-app/responses --data-dir results
+"""
+
+import argparse
+import hashlib
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+from label_resolution import LABEL_SUFFIX, coder_names
+
+CACHE_DIR = ".ingest_cache"
+STATE_FILE = "state.json"
+# Bump when the cached answer tables change shape
+CACHE_VERSION = 1
+
+FACTS_FILE = "all_fact_labels.csv"
+CONSENSUS_FILE = "consensus_labels.csv"
+LIKERT_FILE = "all_likert_labels.csv"
+VALUE_SUFFIX = "_value"
+
+FACT_KEY = ["video_id", "fact_id"]
+LIKERT_KEY = ["video_id", "question_id"]
+
+_SCRIPT_DIR = Path(__file__).resolve().parent
+
+
+# ===================================================================
+# PARSING
+# ===================================================================
+
+def file_digest(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _answers(items, text_key: str, id_name: str, text_name: str, video_id: str) -> list:
+    """(video_id, id, text, value) rows of the answered entries of one list."""
+    rows = []
+    for i, item in enumerate(items or []):
+        if not isinstance(item, dict) or not item.get("value"):
+            continue  # unanswered slots are saved as null
+        rows.append({
+            "video_id": video_id,
+            id_name: int(item.get("id", i)),
+            text_name: item.get(text_key),
+            "value": item["value"],
+        })
+    return rows
+
+
+def parse_responses(path: Path):
+    """
+    Long-form fact answers (video_id, fact_id, fact, value) and Likert
+    answers (video_id, question_id, question, value) of one response file.
+    """
+    with open(path, encoding="utf-8") as f:
+        responses = json.load(f)
+    fact_rows, likert_rows = [], []
+    for video_id, response in responses.items():
+        if not isinstance(response, dict):
+            continue
+        fact_rows += _answers(response.get("atomicFacts"), "fact",
+                              "fact_id", "fact", video_id)
+        likert_rows += _answers(response.get("likertQuestions"), "question",
+                                "question_id", "question", video_id)
+    facts = pd.DataFrame(fact_rows, columns=["video_id", "fact_id", "fact", "value"])
+    likert = pd.DataFrame(likert_rows, columns=["video_id", "question_id", "question", "value"])
+    return facts, likert
+
+
+class ResponseCache:
+    """
+    Parsed answer tables per coder, stored under `cache_dir` as pickles next
+    to a state.json recording the SHA-256 of the response file each was
+    parsed from. `load` re-parses a coder's file only when its hash changed.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = Path(cache_dir)
+        self.state = {}
+        state_path = self.cache_dir / STATE_FILE
+        if state_path.exists():
+            try:
+                state = json.loads(state_path.read_text())
+                if state.get("version") == CACHE_VERSION:
+                    self.state = state["coders"]
+            except (OSError, json.JSONDecodeError, KeyError):
+                self.state = {}
+
+    def _paths(self, coder: str):
+        return (self.cache_dir / f"{coder}.facts.pkl",
+                self.cache_dir / f"{coder}.likert.pkl")
+
+    def load(self, coder: str, path: Path):
+        """(facts, likert, parsed) for one coder; parsed is False on a cache hit."""
+        digest = file_digest(path)
+        facts_path, likert_path = self._paths(coder)
+        if (self.state.get(coder, {}).get("sha256") == digest
+                and facts_path.exists() and likert_path.exists()):
+            try:
+                return pd.read_pickle(facts_path), pd.read_pickle(likert_path), False
+            except Exception:
+                pass  # unreadable cache file: parse again
+
+        facts, likert = parse_responses(path)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for frame, target in ((facts, facts_path), (likert, likert_path)):
+            tmp = target.with_suffix(".tmp")
+            frame.to_pickle(tmp)
+            tmp.replace(target)
+        self.state[coder] = {"sha256": digest, "facts": len(facts), "likert": len(likert)}
+        return facts, likert, True
+
+    def prune(self, coders):
+        """Forget coders whose response file is gone."""
+        for coder in set(self.state) - set(coders):
+            del self.state[coder]
+            for target in self._paths(coder):
+                target.unlink(missing_ok=True)
+
+    def save(self):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        path = self.cache_dir / STATE_FILE
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "coders": self.state},
+                                  indent=1, sort_keys=True))
+        tmp.replace(path)
+
+
+# ===================================================================
+# JOINING
+# ===================================================================
+
+def load_fact_lists(facts_dir: Path, video_ids) -> pd.DataFrame:
+    """(video_id, fact_id, fact_text) of the given videos, as the survey app shows them."""
+    rows = []
+    for video_id in sorted(set(video_ids)):
+        match = re.fullmatch(r"video_(\d+)", video_id)
+        if not match:
+            continue
+        path = facts_dir / f"atomic_facts_{int(match.group(1)):02d}.txt"
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            lines = [line.strip() for line in f]
+        rows += [(video_id, i, text) for i, text in enumerate(t for t in lines if t)]
+    return pd.DataFrame(rows, columns=["video_id", "fact_id", "fact_text"])
+
+
+def join_facts(answers: pd.DataFrame, fact_lists: pd.DataFrame):
+    """
+    Answers with fact_id/fact_text taken from the fact lists, plus the number
+    of answers that could not be matched.
+
+    Answers are matched on (video, index); where the text saved with the
+    answer differs from the fact at that index, the answer is matched on its
+    text instead (if it occurs exactly once in the video's list).
+    """
+    joined = answers.merge(fact_lists, on=FACT_KEY, how="left")
+    ok = joined["fact_text"].notna() & (
+        joined["fact"].isna() | (joined["fact"].str.strip() == joined["fact_text"]))
+
+    unique_text = fact_lists.drop_duplicates(["video_id", "fact_text"], keep=False)
+    moved = (joined.loc[~ok, ["video_id", "fact", "value"]]
+             .assign(fact=lambda d: d["fact"].str.strip())
+             .merge(unique_text, left_on=["video_id", "fact"],
+                    right_on=["video_id", "fact_text"], how="inner"))
+    matched = pd.concat([joined.loc[ok], moved], ignore_index=True)
+    matched = matched.drop_duplicates(FACT_KEY, keep="first")
+    return matched[FACT_KEY + ["fact_text", "value"]], len(answers) - len(matched)
+
+
+def wide_labels(per_coder: dict, key: list, text: str, suffix: str) -> pd.DataFrame:
+    """One row per key, a `<coder><suffix>` column per coder (outer join)."""
+    table = None
+    for coder, answers in per_coder.items():
+        frame = answers[key + [text, "value"]].rename(columns={"value": f"{coder}{suffix}"})
+        if table is None:
+            table = frame
+        else:
+            table = table.merge(frame, on=key, how="outer", suffixes=("", "_new"))
+            table[text] = table[text].fillna(table.pop(f"{text}_new"))
+    return table
+
+
+def update_labels(existing: pd.DataFrame, ingested: pd.DataFrame,
+                  key: list, text: str, suffix: str) -> pd.DataFrame:
+    """
+    `existing` with the coder columns present in `ingested` replaced; other
+    coder columns are kept, rows are the union of both, sorted by key.
+
+    A table without the id column (e.g. video_id, fact_text, <coder>_label, as
+    written before ids were recorded) is joined on (video_id, text) instead;
+    its rows that match no ingested row keep an empty id.
+    """
+    if existing is None:
+        return ingested.sort_values(key, ignore_index=True)
+    on = key
+    if not set(key) <= set(existing.columns):
+        on = [key[0], text]
+        if not set(on) <= set(existing.columns):
+            raise ValueError(f"existing table has neither {key} nor {on} columns")
+    new_coders = [c for c in ingested.columns if c.endswith(suffix)]
+    kept = existing.drop(columns=[c for c in new_coders if c in existing.columns])
+    table = kept.merge(ingested, on=on, how="outer", suffixes=("_old", ""))
+    if f"{text}_old" in table.columns:
+        table[text] = table[text].fillna(table.pop(f"{text}_old"))
+    for col in key:
+        if table[col].isna().any() and pd.api.types.is_float_dtype(table[col]):
+            table[col] = table[col].astype("Int64")
+    order = [c for c in existing.columns if c in table.columns]
+    # An id column the existing table lacked goes next to the other key columns
+    order[1:1] = [c for c in key if c not in order]
+    table = table[order + [c for c in table.columns if c not in order]]
+    return table.sort_values(key, ignore_index=True)
+
+
+def consensus(labels: pd.DataFrame) -> pd.DataFrame:
+    """
+    Facts labelled by every coder who coded the video (labelled any of its
+    facts), for videos with at least two such coders.
+    """
+    coders = [f"{c}{LABEL_SUFFIX}" for c in coder_names(labels)]
+    labelled = labels[coders].notna()
+    coded_video = labelled.groupby(labels["video_id"]).transform("any")
+    complete = (labelled | ~coded_video).all(axis=1) & (coded_video.sum(axis=1) >= 2)
+    return labels[complete].reset_index(drop=True)
+
+
+# ===================================================================
+# MAIN
+# ===================================================================
+
+def _read(path: Path):
+    return pd.read_csv(path, dtype={"video_id": str}) if path.exists() else None
+
+
+def _write(table: pd.DataFrame, path: Path):
+    tmp = path.with_suffix(".tmp")
+    table.to_csv(tmp, index=False)
+    tmp.replace(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Ingest survey-app coder responses into the label tables."
+    )
+    parser.add_argument(
+        "--responses-dir", type=str, default=None,
+        help="Directory of <username>.json response files "
+             "(default: survey-app/responses/ next to this script)",
+    )
+    parser.add_argument(
+        "--facts-dir", type=str, default=None,
+        help="Directory of atomic_facts_NN.txt files "
+             "(default: survey-app/data/Atomic Facts/ next to this script)",
+    )
+    parser.add_argument(
+        "--data-dir", type=str, default=None,
+        help="Path to results/ directory with the label CSVs "
+             "(default: ../results/ relative to this script)",
+    )
+    parser.add_argument("--scores", action="store_true",
+                        help="Re-derive the per-video score tables afterwards")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Re-parse every response file")
+    args = parser.parse_args()
+
+    responses_dir = (Path(args.responses_dir) if args.responses_dir
+                     else _SCRIPT_DIR / "survey-app" / "responses")
+    facts_dir = (Path(args.facts_dir) if args.facts_dir
+                 else _SCRIPT_DIR / "survey-app" / "data" / "Atomic Facts")
+    data_dir = Path(args.data_dir) if args.data_dir else (_SCRIPT_DIR.parent / "results")
+
+    start = time.perf_counter()
+    files = sorted(responses_dir.glob("*.json"))
+    if not files:
+        print(f"ERROR: no response files in {responses_dir}")
+        sys.exit(1)
+
+    # ============================================================
+    # 1. Parse the response files that changed since the last run
+    # ============================================================
+    cache = ResponseCache(data_dir / CACHE_DIR)
+    if args.no_cache:
+        cache.state = {}
+    fact_answers, likert_answers, parsed = {}, {}, []
+    for path in files:
+        coder = path.stem
+        fact_answers[coder], likert_answers[coder], was_parsed = cache.load(coder, path)
+        if was_parsed:
+            parsed.append(coder)
+    cache.prune(fact_answers)
+    cache.save()
+    print(f"Read {len(files)} response files ({len(parsed)} changed"
+          + (f": {', '.join(parsed)}" if parsed else "") + ")")
+
+    # ============================================================
+    # 2. Join to the fact lists
+    # ============================================================
+    coded_videos = pd.concat([a["video_id"] for a in fact_answers.values()]).unique()
+    fact_lists = load_fact_lists(facts_dir, coded_videos)
+    for coder, answers in fact_answers.items():
+        fact_answers[coder], n_dropped = join_facts(answers, fact_lists)
+        if n_dropped:
+            print(f"  WARNING: {coder}: {n_dropped} answers match no fact "
+                  f"in {facts_dir.name} and were dropped")
+
+    # All facts of every coded video, so unanswered facts show up as missing
+    ingested = fact_lists.merge(
+        wide_labels(fact_answers, FACT_KEY, "fact_text", LABEL_SUFFIX).drop(columns="fact_text"),
+        on=FACT_KEY, how="left")
+    likert = wide_labels(likert_answers, LIKERT_KEY, "question", VALUE_SUFFIX)
+
+    # ============================================================
+    # 3. Update the label tables
+    # ============================================================
+    data_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        labels = update_labels(_read(data_dir / FACTS_FILE), ingested,
+                               FACT_KEY, "fact_text", LABEL_SUFFIX)
+        likert = update_labels(_read(data_dir / LIKERT_FILE), likert,
+                               LIKERT_KEY, "question", VALUE_SUFFIX)
+    except ValueError as e:
+        print(f"ERROR: cannot update the label tables in {data_dir}: {e}")
+        sys.exit(1)
+    agreed = consensus(labels)
+    for name, table in ((FACTS_FILE, labels), (CONSENSUS_FILE, agreed), (LIKERT_FILE, likert)):
+        _write(table, data_dir / name)
+        print(f"  {name}: {len(table)} rows")
+
+    if args.scores:
+        from derive_scores import derive_scores, write_scores
+        write_scores(derive_scores(labels, likert), data_dir)
+    print(f"Done in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
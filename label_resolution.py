@@ -0,0 +1,182 @@
+"""
+Resolving coder disagreements over a facts × coders label matrix.
+
+Labels are integer-coded (index into LABELS, MISSING = -1 where a coder gave
+no valid label), so the number of coders is not fixed and every resolution
+policy is a few array operations over the whole matrix instead of a Python
+function per row. A policy returns one code per fact, or DISPUTED where it
+leaves the fact unresolved (e.g. strict, when coders disagree).
+
+Policies:
+  strict     all coders of the fact agree, else disputed
+  majority   the label with the most votes, disputed on a tie
+  weighted   like majority, but each vote is weighted by the coder's
+             reliability (mean pairwise Cohen's kappa with the other coders)
+  lenient    accurate if any coder says accurate, else unsupported if any
+             says unsupported, else inaccurate
+  generous   all coders agree → that label, else accurate
+
+With two coders, majority and weighted reduce to strict (every disagreement
+is a tie).
+"""
+
+import numpy as np
+import pandas as pd
+
+from reliability import ReliabilityStats, cohen_kappa
+
+LABELS = ("accurate", "inaccurate", "unsupported")
+# Rate reported for each label, same order as LABELS
+RATE_NAMES = ("accuracy", "inaccuracy", "hallucination")
+ACCURATE, INACCURATE, UNSUPPORTED = range(len(LABELS))
+MISSING = -1
+DISPUTED = -2
+
+LABEL_SUFFIX = "_label"
+
+
+def coder_names(frame: pd.DataFrame) -> list:
+    """Coders with a `<coder>_label` column, in column order."""
+    return [c[:-len(LABEL_SUFFIX)] for c in frame.columns if c.endswith(LABEL_SUFFIX)]
+
+
+class LabelMatrix:
+    """
+    Integer label codes, one row per fact and one column per coder.
+
+    Attributes:
+        codes:    (n_facts, n_coders) int8 array of label codes / MISSING
+        coders:   coder names, one per column
+        index:    row labels of the source frame
+        counts:   (n_facts, n_labels) number of coders giving each label
+        n_coded:  number of coders with a valid label for each fact
+    """
+
+    def __init__(self, codes, coders, index=None):
+        self.codes = np.asarray(codes, dtype=np.int8)
+        self.coders = list(coders)
+        self.index = index if index is not None else pd.RangeIndex(len(self.codes))
+        self.counts = (self.codes[:, :, None] == np.arange(len(LABELS))).sum(axis=1)
+        self.n_coded = self.counts.sum(axis=1)
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame, coders=None) -> "LabelMatrix":
+        """Build from `<coder>_label` columns; unknown labels count as missing."""
+        coders = list(coders) if coders is not None else coder_names(frame)
+        codes = np.column_stack([
+            pd.Categorical(frame[f"{c}{LABEL_SUFFIX}"], categories=LABELS).codes
+            for c in coders
+        ]) if coders else np.empty((len(frame), 0), dtype=np.int8)
+        return cls(codes, coders, frame.index)
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def n_coders(self):
+        return len(self.coders)
+
+    def subset(self, mask) -> "LabelMatrix":
+        return LabelMatrix(self.codes[mask], self.coders, self.index[mask])
+
+    def jointly_coded(self, min_coders=2) -> np.ndarray:
+        """Mask of facts labelled by at least `min_coders` coders."""
+        return self.n_coded >= min(min_coders, self.n_coders)
+
+
+# ===================================================================
+# RELIABILITY WEIGHTS
+# ===================================================================
+
+def coder_reliability(matrix: LabelMatrix) -> np.ndarray:
+    """Mean pairwise Cohen's kappa of each coder with every other coder."""
+    n = matrix.n_coders
+    if n < 2:
+        return np.ones(n)
+    stats = ReliabilityStats(matrix.codes, np.zeros(len(matrix)), len(LABELS))
+    kappas = np.full((n, n), np.nan)
+    for (i, j), kappa in zip(stats.pairs, cohen_kappa(stats.confusion[0])):
+        kappas[i, j] = kappas[j, i] = kappa
+    return np.nanmean(kappas, axis=1)
+
+
+# ===================================================================
+# POLICIES
+# ===================================================================
+
+POLICIES = {}
+
+
+def register_policy(name):
+    """Make a policy function(matrix, **options) -> codes available by name."""
+    def decorator(func):
+        POLICIES[name] = func
+        return func
+    return decorator
+
+
+def _unique_argmax(scores, tol=1e-12) -> np.ndarray:
+    """Row-wise argmax of `scores`, DISPUTED where the maximum is tied."""
+    top = scores.argmax(axis=1)
+    best = scores[np.arange(len(scores)), top]
+    ties = (scores >= best[:, None] - tol).sum(axis=1) > 1
+    return np.where(ties | (best <= 0), DISPUTED, top)
+
+
+def _unanimous(matrix) -> np.ndarray:
+    return (matrix.n_coded > 0) & (matrix.counts.max(axis=1) == matrix.n_coded)
+
+
+@register_policy("strict")
+def strict(matrix):
+    return np.where(_unanimous(matrix), matrix.counts.argmax(axis=1), DISPUTED)
+
+
+@register_policy("majority")
+def majority(matrix):
+    return _unique_argmax(matrix.counts)
+
+
+@register_policy("weighted")
+def weighted(matrix, weights=None):
+    if weights is None:
+        weights = coder_reliability(matrix)
+    # Unreliable coders (kappa <= 0) get no say
+    weights = np.clip(np.nan_to_num(np.asarray(weights, dtype=float)), 0, None)
+    one_hot = matrix.codes[:, :, None] == np.arange(len(LABELS))
+    scores = np.einsum("fck,c->fk", one_hot, weights)
+    return _unique_argmax(scores)
+
+
+@register_policy("lenient")
+def lenient(matrix):
+    return np.select(
+        [matrix.counts[:, ACCURATE] > 0, matrix.counts[:, UNSUPPORTED] > 0],
+        [ACCURATE, UNSUPPORTED], default=INACCURATE,
+    )
+
+
+@register_policy("generous")
+def generous(matrix):
+    return np.where(_unanimous(matrix), matrix.counts.argmax(axis=1), ACCURATE)
+
+
+def resolve(matrix: LabelMatrix, policy: str, **options) -> np.ndarray:
+    """Resolved code per fact under a named policy."""
+    return POLICIES[policy](matrix, **options)
+
+
+def resolution_rates(matrix: LabelMatrix, policies, min_coders=2) -> pd.DataFrame:
+    """
+    Share of jointly coded facts (at least `min_coders` coders) resolved to
+    each label, one row per policy. Disputed facts count in the denominator
+    only.
+    """
+    pool = matrix.subset(matrix.jointly_coded(min_coders))
+    n = len(pool)
+    rows = {}
+    for policy in policies:
+        codes = resolve(pool, policy)
+        counts = np.bincount(codes[codes >= 0], minlength=len(LABELS))
+        rows[policy] = counts / n if n else np.full(len(LABELS), np.nan)
+    return pd.DataFrame.from_dict(rows, orient="index", columns=list(RATE_NAMES))
@@ -0,0 +1,217 @@
+"""
+Derived metrics shared by the paper figures and tables.
+
+Several outputs of generate_paper_figures.py need the same quantities (the
+coder confusion matrix, Cohen's kappa and Krippendorff's alpha, the rates
+under each disagreement-resolution policy). They are computed here once,
+vectorised, and memoised per loaded DataFrame: the first figure or table to
+ask pays for the computation, the others get the cached result.
+
+The cache is keyed on the identity of the input frames and entries are
+dropped when the frame is garbage-collected, so reloading the data (e.g. in
+--watch mode) never returns stale results. Callers must not modify the
+frames in place.
+"""
+
+import functools
+import weakref
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from batched_ols import OLSResults, add_constant, batched_ols, pad_designs
+from cluster_bootstrap import (
+    N_BOOTSTRAP, RatioStatistics, cluster_bootstrap, cluster_weights,
+    mean_of_coders_rates, per_video_counts,
+)
+from label_resolution import LABELS, RATE_NAMES, LabelMatrix, resolution_rates
+from reliability import reliability
+
+# Likert answers from lowest to highest
+LIKERT_SCALE = ("strongly_disagree", "disagree", "agree", "strongly_agree")
+
+# Resolution policies in the order they appear in the paper; majority and
+# weighted are only reported with more than two coders (with two they
+# coincide with strict)
+POLICIES = ("strict", "mean", "majority", "weighted", "lenient", "generous")
+
+# Predictors of per-video accuracy in the regression tables
+REGRESSION_PREDICTORS = ("n_speakers", "total_transcript_words", "transcript_duration_sec")
+# Columns of merged whose groups are each refitted in the stability diagnostics
+REGRESSION_SUBSETS = ("model", "error_type")
+
+# (function name, ids of input frames) -> result
+_CACHE = {}
+
+
+def memoised(func):
+    """Cache func(*frames) for as long as every input frame is alive
+    (None stands for missing data)."""
+    @functools.wraps(func)
+    def wrapper(*frames):
+        key = (func.__name__,) + tuple(id(f) for f in frames)
+        if key in _CACHE:
+            return _CACHE[key]
+        result = func(*frames)
+        _CACHE[key] = result
+        for frame in frames:
+            if frame is not None:
+                weakref.finalize(frame, _CACHE.pop, key, None)
+        return result
+    return wrapper
+
+
+# ===================================================================
+# CODER AGREEMENT
+# ===================================================================
+
+@memoised
+def confusion_matrix(labels: pd.DataFrame) -> np.ndarray:
+    """3×3 counts of maya_label (rows) × nasser_label (columns), in LABELS
+    order. Facts with a missing or unknown label are left out."""
+    valid = labels["maya_label"].isin(LABELS) & labels["nasser_label"].isin(LABELS)
+    table = pd.crosstab(labels.loc[valid, "maya_label"],
+                        labels.loc[valid, "nasser_label"])
+    return (table.reindex(index=LABELS, columns=LABELS, fill_value=0)
+            .to_numpy(dtype=int))
+
+
+@memoised
+def agreement_stats(labels: pd.DataFrame) -> pd.DataFrame:
+    """
+    Percent agreement, Cohen's (Light's for > 2 coders) kappa, Fleiss' kappa
+    and nominal Krippendorff's alpha over all `<coder>_label` columns, with
+    bootstrap CIs clustered by video (see reliability.reliability).
+    """
+    matrix = LabelMatrix.from_frame(labels)
+    return reliability(matrix.codes, labels["video_id"], len(LABELS))
+
+
+@memoised
+def likert_agreement(likert: pd.DataFrame) -> pd.DataFrame:
+    """Ordinal reliability of the Likert ratings (`<coder>_value` columns,
+    not_applicable counts as missing)."""
+    coders = [c for c in likert.columns if c.endswith("_value")]
+    codes = np.column_stack([
+        pd.Categorical(likert[c], categories=LIKERT_SCALE).codes for c in coders
+    ])
+    return reliability(codes, likert["video_id"], len(LIKERT_SCALE), metric="ordinal")
+
+
+# ===================================================================
+# DISAGREEMENT-RESOLUTION POLICIES
+# ===================================================================
+
+@memoised
+def label_matrix(facts: pd.DataFrame) -> LabelMatrix:
+    """Facts × coders label codes from the `<coder>_label` columns."""
+    return LabelMatrix.from_frame(facts)
+
+
+@memoised
+def policy_rates(facts: pd.DataFrame, merged: pd.DataFrame) -> pd.DataFrame:
+    """
+    Accuracy / inaccuracy / hallucination rate under each policy (rows in
+    POLICIES order). Per-fact policies (see label_resolution) are pooled over
+    all jointly coded facts; "mean" is the mean over videos of the
+    mean-of-coders rates.
+    """
+    matrix = label_matrix(facts)
+    per_fact = ["strict", "lenient", "generous"]
+    if matrix.n_coders > 2:
+        per_fact += ["majority", "weighted"]
+
+    rates = resolution_rates(matrix, per_fact)
+    rates.loc["mean"] = [merged[f"mean_{name}"].mean() for name in RATE_NAMES]
+    return rates.loc[[p for p in POLICIES if p in rates.index]]
+
+
+# ===================================================================
+# SUMMARY STATISTICS
+# ===================================================================
+
+@memoised
+def summary_intervals(facts: pd.DataFrame, merged: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mean over videos of the mean-of-coders accuracy / inaccuracy /
+    hallucination rates and of narrative quality, with percentile and BCa
+    intervals from a bootstrap over videos (see cluster_bootstrap).
+
+    The rates are recomputed from the per-video label counts in `facts`
+    (from merged's mean_<rate> columns if facts is None); quality comes from
+    merged. Rows are RATE_NAMES plus "quality"; columns as returned by
+    cluster_bootstrap plus the SD, min and max of the per-video values.
+    """
+    if facts is not None:
+        matrix = label_matrix(facts)
+        videos, counts, coded = per_video_counts(matrix.codes, facts["video_id"],
+                                                 len(LABELS))
+        per_video = pd.DataFrame(mean_of_coders_rates(counts, coded),
+                                 index=videos, columns=list(RATE_NAMES))
+    else:
+        per_video = merged.set_index("video_id")[[f"mean_{name}" for name in RATE_NAMES]]
+        per_video.columns = list(RATE_NAMES)
+
+    if "narrative_quality" in merged.columns:
+        quality = merged.groupby("video_id")["narrative_quality"].mean()
+        per_video = per_video.join(quality.rename("quality"), how="outer")
+
+    stats = RatioStatistics(per_video.to_numpy(), 1.0, per_video.columns)
+    table = cluster_bootstrap(stats)
+    table["sd"] = per_video.std()
+    table["min"] = per_video.min()
+    table["max"] = per_video.max()
+    return table
+
+
+# ===================================================================
+# REGRESSION
+# ===================================================================
+
+class RegressionFits(NamedTuple):
+    """The accuracy regression and its stability refits (see batched_ols)."""
+    terms: list            # "const" then the predictors, in column order
+    full: OLSResults       # one fit, classical SEs
+    robust: OLSResults     # one fit, HC3 SEs
+    loo: OLSResults        # one fit per left-out video
+    bootstrap: OLSResults  # one fit per bootstrap resample of videos
+    subsets: list          # (column, value, n_videos) per subset fit
+    subset_fits: OLSResults
+
+
+@memoised
+def accuracy_regression(merged: pd.DataFrame):
+    """
+    OLS of mean_accuracy on the available REGRESSION_PREDICTORS, refitted
+    leaving out each video, on N_BOOTSTRAP resamples of videos and within
+    each group of the REGRESSION_SUBSETS columns (groups with too few videos
+    to fit are skipped). All refits of a kind are one batched_ols call.
+    None if no predictor is available.
+    """
+    available = [p for p in REGRESSION_PREDICTORS if p in merged.columns]
+    if not available:
+        return None
+    valid = merged.dropna(subset=["mean_accuracy"] + available).reset_index(drop=True)
+    X = add_constant(valid[available].to_numpy(dtype=float))
+    y = valid["mean_accuracy"].to_numpy(dtype=float)
+    n, p = X.shape
+
+    subsets, designs = [], []
+    for column in REGRESSION_SUBSETS:
+        if column not in valid.columns:
+            continue
+        for value, rows in valid.groupby(column).indices.items():
+            if len(rows) > p + 1:
+                subsets.append((column, value, len(rows)))
+                designs.append((X[rows], y[rows]))
+
+    return RegressionFits(
+        terms=["const"] + available,
+        full=batched_ols(X, y),
+        robust=batched_ols(X, y, cov_type="HC3"),
+        loo=batched_ols(X, y, 1 - np.eye(n)),
+        bootstrap=batched_ols(X, y, cluster_weights(n, N_BOOTSTRAP, rng=0)),
+        subsets=subsets,
+        subset_fits=batched_ols(*pad_designs(designs)) if designs else None,
+    )
@@ -0,0 +1,94 @@
+"""
+Plotting primitives for per-video figures that must scale to large corpora.
+
+At ~100 videos one artist per video is fine; at thousands of reports the
+per-video `ax.plot` / `ax.bar` calls dominate render time and every bar or
+line becomes a separate PDF object. The helpers here draw a whole layer as a
+single collection artist (one LineCollection / PolyCollection instead of n
+Line2D / Rectangle objects), can rasterise that layer inside an otherwise
+vector PDF, and summarise sorted rows as binned quantiles for figures with
+too many rows to show individually.
+
+matplotlib is imported inside the drawing functions so that importing this
+module (e.g. for a tables-only build) does not load it.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def row_segments(ax, x_start, x_end, y, rasterized=False, **kwargs):
+    """One horizontal segment per row, from x_start to x_end at height y."""
+    from matplotlib.collections import LineCollection
+
+    y = np.asarray(y, dtype=float)
+    start = np.column_stack([np.asarray(x_start, dtype=float), y])
+    end = np.column_stack([np.asarray(x_end, dtype=float), y])
+    lines = LineCollection(np.stack([start, end], axis=1), rasterized=rasterized,
+                           **kwargs)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    return lines
+
+
+def bar_collection(ax, x, heights, width=0.8, bottom=0.0, rasterized=False, **kwargs):
+    """
+    Vertical bars centred on x as a single PolyCollection (pass facecolors=
+    a colour or one colour per bar). Missing heights draw no bar.
+    """
+    from matplotlib.collections import PolyCollection
+
+    x = np.asarray(x, dtype=float)
+    top = bottom + np.nan_to_num(np.asarray(heights, dtype=float))
+    left, right = x - width / 2, x + width / 2
+    base = np.full_like(x, bottom)
+    verts = np.stack([
+        np.column_stack([left, base]), np.column_stack([left, top]),
+        np.column_stack([right, top]), np.column_stack([right, base]),
+    ], axis=1)
+    bars = PolyCollection(verts, rasterized=rasterized, **kwargs)
+    # Like ax.bar: no autoscale margin below the baseline
+    bars.sticky_edges.y.append(bottom)
+    ax.add_collection(bars)
+    ax.autoscale_view()
+    return bars
+
+
+def binned_quantiles(frame: pd.DataFrame, columns, n_bins,
+                     quantiles=(0.25, 0.5, 0.75)) -> pd.DataFrame:
+    """
+    Quantiles of `columns` over consecutive blocks of rows of an already
+    sorted frame, in at most n_bins bins of (almost) equal size.
+
+    Returns one row per bin with its centre `position` in row units (so it
+    can be drawn on the same axis as the per-row plot), its number of rows
+    `count` (= its width in row units), and a `<column>_q<percent>` column
+    per quantile.
+    """
+    n = len(frame)
+    bins = np.arange(n) * min(n_bins, n) // max(n, 1)
+    summary = (frame[list(columns)].groupby(bins).quantile(list(quantiles))
+               .unstack())
+    summary.columns = [f"{col}_q{round(q * 100)}" for col, q in summary.columns]
+    count = np.bincount(bins)
+    first = np.concatenate([[0], np.cumsum(count)[:-1]])
+    summary.insert(0, "position", first + (count - 1) / 2)
+    summary.insert(1, "count", count)
+    return summary.reset_index(drop=True)
+
+
+def quantile_band(ax, position, low, mid, high, color, label=None,
+                  horizontal=False, alpha=0.25, **kwargs):
+    """
+    Median line with a shaded low–high band along `position` (the x axis, or
+    the y axis with horizontal=True, where the values run along x).
+    """
+    if horizontal:
+        ax.fill_betweenx(position, low, high, color=color, alpha=alpha,
+                         linewidth=0, zorder=1)
+        (line,) = ax.plot(mid, position, color=color, label=label, zorder=2, **kwargs)
+    else:
+        ax.fill_between(position, low, high, color=color, alpha=alpha,
+                        linewidth=0, zorder=1)
+        (line,) = ax.plot(position, mid, color=color, label=label, zorder=2, **kwargs)
+    return line
@@ -0,0 +1,201 @@
+"""
+Inter-rater reliability for any number of coders, with missing values, and
+bootstrap confidence intervals clustered by video.
+
+Input is a units × coders matrix of integer category codes (-1 = not coded)
+and the cluster (video) of every unit. It is reduced once to per-video
+statistics that are additive over units:
+
+  - Krippendorff's coincidence matrix,
+  - one confusion matrix per coder pair (Cohen's / Light's kappa),
+  - per-category rating totals and summed per-unit agreement (Fleiss' kappa).
+
+A bootstrap resample of videos is then a vector of draw counts, and the
+statistics of B resamples are one (B × videos) @ (videos × stats) product,
+so every estimator is evaluated on all resamples at once.
+
+Units coded by fewer than two coders carry no information about agreement
+and are dropped.
+"""
+
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+
+from cluster_bootstrap import cluster_weights
+
+N_BOOTSTRAP = 2000
+CONFIDENCE = 0.95
+METRICS = ("nominal", "ordinal", "interval")
+
+
+def _cluster_sum(values, clusters, n_clusters) -> np.ndarray:
+    """Sum the rows of `values` (units × ...) within each cluster."""
+    flat = values.reshape(len(values), -1)
+    out = np.stack([np.bincount(clusters, weights=flat[:, j], minlength=n_clusters)
+                    for j in range(flat.shape[1])], axis=1)
+    return out.reshape((n_clusters,) + values.shape[1:])
+
+
+# ===================================================================
+# ESTIMATORS (all accept arbitrary leading batch dimensions)
+# ===================================================================
+
+def _distance(n_c, metric):
+    """Squared difference function δ² between categories (…, K, K)."""
+    k = n_c.shape[-1]
+    c, g = np.meshgrid(np.arange(k), np.arange(k), indexing="ij")
+    if metric == "nominal":
+        return np.broadcast_to((c != g).astype(float), n_c.shape[:-1] + (k, k))
+    if metric == "interval":
+        return np.broadcast_to(((c - g) ** 2).astype(float), n_c.shape[:-1] + (k, k))
+    if metric == "ordinal":
+        # (sum of n_g for g between c and k) - (n_c + n_k) / 2, squared
+        lo, hi = np.minimum(c, g), np.maximum(c, g)
+        cum = np.cumsum(n_c, axis=-1)
+        between = cum[..., hi] - cum[..., lo] + n_c[..., lo]
+        return (between - (n_c[..., c] + n_c[..., g]) / 2) ** 2
+    raise ValueError(f"unknown metric {metric!r} (expected one of {METRICS})")
+
+
+def krippendorff_alpha(coincidence, metric="nominal"):
+    """Krippendorff's alpha from a coincidence matrix (…, K, K)."""
+    n_c = coincidence.sum(axis=-1)
+    n = n_c.sum(axis=-1)
+    delta = _distance(n_c, metric)
+    observed = (coincidence * delta).sum(axis=(-2, -1))
+    expected = (n_c[..., :, None] * n_c[..., None, :] * delta).sum(axis=(-2, -1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(expected > 0, 1 - (n - 1) * observed / expected, np.nan)
+
+
+def percent_agreement(coincidence):
+    """Share of pairable values matched by the same category."""
+    total = coincidence.sum(axis=(-2, -1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.trace(coincidence, axis1=-2, axis2=-1) / total
+
+
+def cohen_kappa(confusion):
+    """Unweighted Cohen's kappa from confusion matrices (…, K, K)."""
+    n = confusion.sum(axis=(-2, -1))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_o = np.trace(confusion, axis1=-2, axis2=-1) / n
+        p_e = (confusion.sum(axis=-1) * confusion.sum(axis=-2)).sum(axis=-1) / n ** 2
+        return np.where(p_e < 1, (p_o - p_e) / (1 - p_e), 0.0)
+
+
+def fleiss_kappa(agreement_sum, n_units, totals):
+    """
+    Fleiss' kappa (variable number of raters per unit) from the summed
+    per-unit agreement, the number of units and per-category totals (…, K).
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        p_bar = agreement_sum / n_units
+        p_k = totals / totals.sum(axis=-1, keepdims=True)
+        p_e = (p_k ** 2).sum(axis=-1)
+        return np.where(p_e < 1, (p_bar - p_e) / (1 - p_e), 0.0)
+
+
+# ===================================================================
+# PER-CLUSTER STATISTICS
+# ===================================================================
+
+class ReliabilityStats:
+    """
+    Per-cluster sufficient statistics of a units × coders code matrix.
+
+    Attributes (V = number of clusters, K = categories, P = coder pairs):
+        coincidence:    (V, K, K) Krippendorff coincidences
+        pairs:          the P coder index pairs (i < j)
+        confusion:      (V, P, K, K) confusion matrix of each coder pair
+        agreement_sum:  (V,) summed per-unit pairwise agreement (Fleiss)
+        n_units:        (V,) pairable units (coded by >= 2 coders)
+        totals:         (V, K) ratings per category over pairable units
+    """
+
+    def __init__(self, codes, clusters, n_categories):
+        codes = np.asarray(codes, dtype=np.int64)
+        cluster_codes, self.clusters = pd.factorize(np.asarray(clusters))
+        n_clusters, k = len(self.clusters), n_categories
+        self.n_coders = codes.shape[1]
+
+        counts = (codes[:, :, None] == np.arange(k)).sum(axis=1)
+        raters = counts.sum(axis=1)
+        pairable = raters >= 2
+        counts, raters = counts[pairable].astype(float), raters[pairable]
+        units_cluster = cluster_codes[pairable]
+
+        # Each unit contributes n_c * (n_k - [c == k]) / (m - 1) to o_ck
+        per_unit = (counts[:, :, None] * counts[:, None, :]
+                    - counts[:, :, None] * np.eye(k)) / (raters - 1)[:, None, None]
+        self.coincidence = _cluster_sum(per_unit, units_cluster, n_clusters)
+
+        agreement = (counts * (counts - 1)).sum(axis=1) / (raters * (raters - 1))
+        self.agreement_sum = _cluster_sum(agreement, units_cluster, n_clusters)
+        self.n_units = np.bincount(units_cluster, minlength=n_clusters).astype(float)
+        self.totals = _cluster_sum(counts, units_cluster, n_clusters)
+
+        self.pairs = list(combinations(range(self.n_coders), 2))
+        self.confusion = np.zeros((n_clusters, len(self.pairs), k, k))
+        for p, (a, b) in enumerate(self.pairs):
+            both = (codes[:, a] >= 0) & (codes[:, b] >= 0)
+            flat = cluster_codes[both] * k * k + codes[both, a] * k + codes[both, b]
+            self.confusion[:, p] = np.bincount(
+                flat, minlength=n_clusters * k * k).reshape(n_clusters, k, k)
+
+    def estimates(self, weights=None, metric="nominal") -> dict:
+        """
+        Every statistic for cluster weights `weights` ((V,) or (B, V) draw
+        counts; None = each cluster once).
+        """
+        if weights is None:
+            weights = np.ones(len(self.clusters))
+
+        def agg(values):
+            return np.tensordot(weights, values, axes=(-1, 0))
+
+        coincidence = agg(self.coincidence)
+        # Light's kappa: mean of pairwise Cohen's (= Cohen's for 2 coders)
+        pairwise = cohen_kappa(agg(self.confusion))
+        kappa = (np.nanmean(pairwise, axis=-1) if pairwise.shape[-1]
+                 else np.full(pairwise.shape[:-1], np.nan))
+        return {
+            "percent_agreement": percent_agreement(coincidence),
+            "cohen_kappa": kappa,
+            "fleiss_kappa": fleiss_kappa(agg(self.agreement_sum), agg(self.n_units),
+                                         agg(self.totals)),
+            "alpha": krippendorff_alpha(coincidence, metric),
+        }
+
+
+def reliability(codes, clusters, n_categories, metric="nominal",
+                n_resamples=N_BOOTSTRAP, confidence=CONFIDENCE, rng=0) -> pd.DataFrame:
+    """
+    Point estimates and cluster-bootstrap percentile CIs of percent
+    agreement, Cohen's (Light's, for > 2 coders) kappa, Fleiss' kappa and
+    Krippendorff's alpha (`metric` distance).
+
+    Returns a DataFrame indexed by statistic with columns estimate, ci_low,
+    ci_high, plus n_units / n_clusters / n_coders.
+    """
+    stats = ReliabilityStats(codes, clusters, n_categories)
+    point = stats.estimates(metric=metric)
+
+    weights = cluster_weights(len(stats.clusters), n_resamples, rng)
+    boot = stats.estimates(weights, metric=metric)
+    tail = (1 - confidence) / 2
+
+    rows = {}
+    for name, estimate in point.items():
+        samples = boot[name]
+        lo, hi = (np.nanquantile(samples, [tail, 1 - tail])
+                  if np.isfinite(samples).any() else (np.nan, np.nan))
+        rows[name] = {"estimate": float(estimate), "ci_low": lo, "ci_high": hi}
+
+    table = pd.DataFrame.from_dict(rows, orient="index")
+    table["n_units"] = int(stats.n_units.sum())
+    table["n_clusters"] = len(stats.clusters)
+    table["n_coders"] = stats.n_coders
+    return table
@@ -29,6 +29,8 @@ git reset --hard "origin/$BRANCH"
 # ── Rebuild ──────────────────────────────────────────────────────────
 npm install --production=false 2>&1
 npm run build 2>&1
+# Precompressed data bundles; without them the app falls back to the per-file API
+npm run bundle 2>&1 || echo "$LOG_PREFIX WARNING: data bundle build failed"
 
 # ── Restart ──────────────────────────────────────────────────────────
 pm2 restart "$PM2_APP_NAME" 2>&1
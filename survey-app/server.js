@@ -24,6 +24,7 @@ app.use(express.json())
 
 const DATA_DIR = path.join(__dirname, 'data')
 const RESPONSES_DIR = path.join(__dirname, 'responses')
+const BUNDLE_DIR = path.join(__dirname, 'bundles')
 
 // Ensure responses directory exists
 fs.mkdir(RESPONSES_DIR, { recursive: true }).catch(console.error)
@@ -77,8 +78,90 @@ function getNarrativeNumber(narrativeId) {
   return num >= 100 ? num.toString() : num.toString().padStart(2, '0')
 }
 
+// Precompressed data bundles built by build_data_bundle.py. The ETag table
+// is re-read whenever a build rewrites it; only names listed there are served.
+// (A Map, so a name like "constructor" is not looked up on Object.prototype.)
+let bundleEtags = { mtimeMs: 0, etags: new Map() }
+
+async function loadBundleEtags() {
+  const file = path.join(BUNDLE_DIR, 'etags.json')
+  const { mtimeMs } = await fs.stat(file)
+  if (mtimeMs !== bundleEtags.mtimeMs) {
+    const { current, previous } = JSON.parse(await fs.readFile(file, 'utf-8'))
+    bundleEtags = { mtimeMs, etags: new Map(Object.entries({ ...previous, ...current })) }
+  }
+  return bundleEtags.etags
+}
+
+// Whether an Accept-Encoding header allows `encoding`: listed (or covered by
+// "*") with a q-value above 0, e.g. "gzip, br;q=0" allows gzip but not br
+function acceptsEncoding(header, encoding) {
+  const weights = new Map()
+  for (const part of (header || '').split(',')) {
+    const [token, ...params] = part.trim().toLowerCase().split(';')
+    if (!token) continue
+    const q = params.map(p => p.trim()).find(p => p.startsWith('q='))
+    const weight = q === undefined ? 1 : parseFloat(q.slice(2))
+    weights.set(token, Number.isNaN(weight) ? 0 : weight)
+  }
+  const weight = weights.has(encoding) ? weights.get(encoding) : weights.get('*')
+  return weight !== undefined && weight > 0
+}
+
 // API Routes
 
+// Get a data bundle (manifest.json or video_XX.<hash>.json), precompressed
+app.get('/api/bundle/:name', async (req, res) => {
+  try {
+    const { name } = req.params
+    let etags
+    try {
+      etags = await loadBundleEtags()
+    } catch (error) {
+      if (error.code === 'ENOENT') {
+        return res.status(404).json({ error: 'No data bundles built' })
+      }
+      throw error
+    }
+
+    const etag = etags.get(name)
+    if (!etag) {
+      return res.status(404).json({ error: 'Bundle not found' })
+    }
+
+    res.set({
+      'Content-Type': 'application/json; charset=utf-8',
+      'ETag': etag,
+      'Vary': 'Accept-Encoding',
+      // Video bundles are named by their content hash and never change;
+      // the manifest keeps its name and is revalidated on every load
+      'Cache-Control': name === 'manifest.json'
+        ? 'no-cache'
+        : 'public, max-age=31536000, immutable'
+    })
+    const ifNoneMatch = (req.headers['if-none-match'] || '').split(',').map(tag => tag.trim())
+    if (ifNoneMatch.includes(etag)) {
+      return res.status(304).end()
+    }
+
+    const accepted = req.headers['accept-encoding']
+    for (const [encoding, suffix] of [['br', '.br'], ['gzip', '.gz'], [null, '']]) {
+      if (encoding && !acceptsEncoding(accepted, encoding)) continue
+      try {
+        const body = await fs.readFile(path.join(BUNDLE_DIR, name + suffix))
+        if (encoding) res.set('Content-Encoding', encoding)
+        return res.send(body)
+      } catch (error) {
+        if (error.code !== 'ENOENT') throw error
+      }
+    }
+    res.status(404).json({ error: 'Bundle not found' })
+  } catch (error) {
+    console.error('Error loading data bundle:', error)
+    res.status(500).json({ error: 'Failed to load data bundle' })
+  }
+})
+
 // Get all videos
 app.get('/api/videos', async (req, res) => {
   try {
@@ -1,6 +1,22 @@
 const API_BASE = '/api'
 
+// Manifest of the precompressed data bundles (see build_data_bundle.py), or
+// null when none are built; then the per-file endpoints are used instead
+let manifestPromise = null
+
+function loadManifest() {
+  if (!manifestPromise) {
+    manifestPromise = fetch(`${API_BASE}/bundle/manifest.json`)
+      .then(response => (response.ok ? response.json() : null))
+      .catch(() => null)
+  }
+  return manifestPromise
+}
+
 export async function loadVideos() {
+  const manifest = await loadManifest()
+  if (manifest) return manifest.videos
+
   const response = await fetch(`${API_BASE}/videos`)
   if (!response.ok) throw new Error('Failed to load videos')
   return response.json()
@@ -19,6 +35,24 @@ export async function loadAtomicFacts(videoId) {
   return data.facts
 }
 
+// Narrative and atomic facts of one video (a row of loadVideos()): a single
+// cached fetch of its bundle, or one request each without bundles
+export async function loadVideoData(video) {
+  if (video.bundle) {
+    const response = await fetch(`${API_BASE}/bundle/${video.bundle}`)
+    if (!response.ok) throw new Error('Failed to load video data')
+    const { narrative, facts } = await response.json()
+    if (narrative === null) throw new Error('Failed to load narrative')
+    if (facts === null) throw new Error('Failed to load atomic facts')
+    return { narrative, facts }
+  }
+  const [narrative, facts] = await Promise.all([
+    loadNarrative(video['Police Report ID']),
+    loadAtomicFacts(video.VideoID)
+  ])
+  return { narrative, facts }
+}
+
 export async function loadUserResponses(username) {
   const response = await fetch(`${API_BASE}/responses/${username}`)
   if (!response.ok) {
@@ -0,0 +1,9 @@
+"""Make the root modules and the diarization-ablation helpers importable."""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+for path in (ROOT, ROOT / "diarization-ablation"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
@@ -0,0 +1,66 @@
+"""batched_ols against one np.linalg.lstsq fit per regression."""
+
+import numpy as np
+import pytest
+
+from batched_ols import COV_TYPES, add_constant, batched_ols, pad_designs
+
+
+def reference_fit(X, y, w):
+    keep = w > 0
+    X, y, w = X[keep], y[keep], w[keep]
+    sw = np.sqrt(w)
+    params = np.linalg.lstsq(X * sw[:, None], y * sw, rcond=None)[0]
+    resid = y - X @ params
+    df_resid = w.sum() - X.shape[1]
+    xtx_inv = np.linalg.inv(X.T @ (w[:, None] * X))
+    bse = np.sqrt(np.diag(xtx_inv) * (w * resid ** 2).sum() / df_resid)
+    return params, bse
+
+
+def random_designs(n_fits, n, k, seed=0):
+    rng = np.random.default_rng(seed)
+    X = add_constant(rng.normal(size=(n_fits, n, k)))
+    y = X @ rng.normal(size=k + 1)[:, None].repeat(n_fits, 1).T[:, :, None]
+    y = y[..., 0] + rng.normal(size=(n_fits, n))
+    w = rng.integers(0, 3, size=(n_fits, n)).astype(float)
+    w[:, :k + 3] = 1.0  # enough rows in every fit
+    return X, y, w
+
+
+def test_params_and_bse_match_lstsq():
+    X, y, w = random_designs(40, 30, 3)
+    fit = batched_ols(X, y, w, chunk=16)
+    for b in range(len(y)):
+        params, bse = reference_fit(X[b], y[b], w[b])
+        np.testing.assert_allclose(fit.params[b], params, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(fit.bse[b], bse, rtol=1e-8)
+        assert fit.nobs[b] == w[b].sum()
+
+
+def test_shared_design_and_padding():
+    rng = np.random.default_rng(1)
+    designs = []
+    for n in (8, 12, 20):
+        X = add_constant(rng.normal(size=(n, 2)))
+        designs.append((X, X @ [1.0, 2.0, -1.0] + rng.normal(size=n)))
+    X, y, w = pad_designs(designs)
+    fit = batched_ols(X, y, w)
+    for b, (Xb, yb) in enumerate(designs):
+        params, bse = reference_fit(Xb, yb, np.ones(len(yb)))
+        np.testing.assert_allclose(fit.params[b], params, rtol=1e-8, atol=1e-10)
+        np.testing.assert_allclose(fit.bse[b], bse, rtol=1e-8)
+
+
+@pytest.mark.parametrize("cov_type", COV_TYPES)
+def test_robust_covariances_are_finite(cov_type):
+    X, y, w = random_designs(5, 25, 2, seed=2)
+    fit = batched_ols(X, y, w, cov_type=cov_type)
+    assert np.isfinite(fit.bse).all()
+
+
+def test_too_few_rows_give_nan():
+    X = add_constant(np.random.default_rng(3).normal(size=(2, 3)))
+    with np.errstate(all="raise"):
+        fit = batched_ols(X, np.array([1.0, 2.0]))
+    assert np.isnan(fit.params).all() and np.isnan(fit.bse).all()
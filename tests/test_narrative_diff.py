@@ -0,0 +1,49 @@
+"""lcs_alignment against the length of a plain LCS table."""
+
+import numpy as np
+
+from narrative_diff import lcs_alignment
+
+
+def reference_lcs_length(a, b):
+    prev = [0] * (len(b) + 1)
+    for x in a:
+        cur = [0]
+        for j, y in enumerate(b, 1):
+            cur.append(prev[j - 1] + 1 if x == y else max(prev[j], cur[j - 1]))
+        prev = cur
+    return prev[-1]
+
+
+def check_alignment(a, b):
+    matches = lcs_alignment(a, b)
+    assert len(matches) == reference_lcs_length(a, b)
+    for i, j in matches:
+        assert a[i] == b[j]
+    # Strictly increasing in both sequences
+    for (i0, j0), (i1, j1) in zip(matches, matches[1:]):
+        assert i0 < i1 and j0 < j1
+
+
+def test_edge_cases():
+    check_alignment([], [])
+    check_alignment([1, 2], [])
+    check_alignment([1, 2, 3], [1, 2, 3])
+    check_alignment([1, 2, 3], [4, 5, 6])
+
+
+def test_lcs_alignment_matches_dp():
+    rng = np.random.default_rng(0)
+    for _ in range(300):
+        alphabet = int(rng.integers(1, 8))
+        a = rng.integers(0, alphabet, int(rng.integers(0, 60))).tolist()
+        b = rng.integers(0, alphabet, int(rng.integers(0, 60))).tolist()
+        check_alignment(a, b)
+
+
+def test_long_sequences_recurse():
+    # Long enough that Hirschberg splits instead of filling one small table
+    rng = np.random.default_rng(1)
+    a = rng.integers(0, 20, 700).tolist()
+    b = a[:200] + rng.integers(0, 20, 50).tolist() + a[260:]
+    check_alignment(a, b)
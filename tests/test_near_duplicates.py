@@ -0,0 +1,81 @@
+"""near_duplicate_clusters against brute-force shingle Jaccard over all pairs."""
+
+import itertools
+
+import numpy as np
+
+from near_duplicates import SHINGLE, near_duplicate_clusters, normalise
+
+FACTS = [
+    "The officer stopped the vehicle on Main Street at 10 pm.",
+    "The officer stopped the vehicle on Main Street at about 10 pm.",
+    "the officer STOPPED the vehicle on main street at 10 pm",
+    "The driver said the registration had been suspended last month.",
+    "The driver said that the registration had been suspended last month.",
+    "A second unit arrived to assist with the search of the trunk.",
+    "The suspect was read his rights before being transported.",
+    "No weapons were found during the pat-down.",
+    "The passenger declined to give a statement.",
+    "Ok.",
+    "OK",
+]
+
+
+def shingles(text, k=SHINGLE):
+    data = normalise(text).encode("utf-8")
+    if len(data) <= k:
+        return {data}
+    return {data[i:i + k] for i in range(len(data) - k + 1)}
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b)
+
+
+def brute_force_components(texts, threshold):
+    sets = [shingles(t) for t in texts]
+    parent = list(range(len(texts)))
+
+    def find(i):
+        while parent[i] != i:
+            i = parent[i]
+        return i
+
+    for i, j in itertools.combinations(range(len(texts)), 2):
+        if jaccard(sets[i], sets[j]) >= threshold:
+            parent[find(j)] = find(i)
+    return [find(i) for i in range(len(texts))]
+
+
+def same_partition(a, b):
+    return all((a[i] == a[j]) == (b[i] == b[j])
+               for i, j in itertools.combinations(range(len(a)), 2))
+
+
+def test_clusters_match_brute_force():
+    # Near-duplicates here are far above the threshold and the rest far below,
+    # so the MinHash estimate cannot flip a pair
+    sets = [shingles(t) for t in FACTS]
+    for i, j in itertools.combinations(range(len(FACTS)), 2):
+        s = jaccard(sets[i], sets[j])
+        assert s >= 0.8 or s <= 0.4
+    labels, _ = near_duplicate_clusters(FACTS, threshold=0.6)
+    assert same_partition(labels, brute_force_components(FACTS, 0.6))
+
+
+def test_identical_normalised_texts_share_a_cluster():
+    labels, _ = near_duplicate_clusters(FACTS)
+    assert labels[0] == labels[2]
+    assert labels[9] == labels[10]
+
+
+def test_verified_pairs_estimate_jaccard():
+    rng = np.random.default_rng(0)
+    words = [f"w{i}" for i in range(40)]
+    base = " ".join(rng.choice(words, 60))
+    texts = [base] + [base.replace(w, "x", 1) for w in words[:5]] + [" ".join(rng.choice(words, 60))]
+    _, (i, j, similarity) = near_duplicate_clusters(texts, threshold=0.5, num_perm=256, bands=64)
+    sets = [shingles(t) for t in texts]
+    exact = np.array([jaccard(sets[a], sets[b]) for a, b in zip(i, j)])
+    assert len(exact) > 0
+    assert np.abs(similarity - exact).max() < 0.15
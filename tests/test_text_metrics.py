@@ -0,0 +1,72 @@
+"""levenshtein / edit_ops against a plain O(n*m) dynamic programme."""
+
+import numpy as np
+import pytest
+
+from text_metrics import edit_ops, levenshtein
+
+
+def reference_distance(a, b):
+    prev = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        cur = [i]
+        for j, y in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (x != y)))
+        prev = cur
+    return prev[-1]
+
+
+def random_pairs(n_cases, seed=0):
+    rng = np.random.default_rng(seed)
+    for _ in range(n_cases):
+        alphabet = int(rng.integers(1, 6))
+        a = rng.integers(0, alphabet, int(rng.integers(0, 40)))
+        b = a.copy()
+        # Mostly small edits of a, sometimes an unrelated sequence
+        if rng.random() < 0.2:
+            b = rng.integers(0, alphabet, int(rng.integers(0, 40)))
+        else:
+            for _ in range(int(rng.integers(0, 6))):
+                pos = int(rng.integers(0, len(b) + 1))
+                kind = rng.integers(3)
+                if kind == 0 and pos < len(b):
+                    b[pos] = rng.integers(0, alphabet)
+                elif kind == 1:
+                    b = np.insert(b, pos, rng.integers(0, alphabet))
+                elif pos < len(b):
+                    b = np.delete(b, pos)
+        yield a, b
+
+
+@pytest.mark.parametrize("a, b", [([], []), ([], [1, 2]), ([1, 2, 3], []),
+                                  ([1, 2, 3], [1, 2, 3]), ([1, 2, 3], [3, 2, 1])])
+def test_edge_cases(a, b):
+    assert levenshtein(a, b) == reference_distance(a, b)
+    assert edit_ops(a, b)["distance"] == reference_distance(a, b)
+
+
+def test_levenshtein_matches_dp():
+    for a, b in random_pairs(500):
+        assert levenshtein(a, b) == reference_distance(a.tolist(), b.tolist())
+
+
+def test_levenshtein_long_pattern():
+    # Patterns longer than a machine word exercise the big-int bit vectors
+    rng = np.random.default_rng(1)
+    a = rng.integers(0, 4, 300)
+    b = np.concatenate([a[:100], rng.integers(0, 4, 20), a[130:]])
+    assert levenshtein(a, b) == reference_distance(a.tolist(), b.tolist())
+
+
+def test_edit_ops_counts_are_consistent():
+    for a, b in random_pairs(500, seed=2):
+        ops = edit_ops(a, b)
+        assert ops["distance"] == reference_distance(a.tolist(), b.tolist())
+        assert ops["substitutions"] + ops["insertions"] + ops["deletions"] == ops["distance"]
+        assert ops["hits"] + ops["substitutions"] + ops["deletions"] == len(a)
+        assert ops["hits"] + ops["substitutions"] + ops["insertions"] == len(b)
+
+
+def test_edit_ops_wider_band_is_still_optimal():
+    for a, b in random_pairs(100, seed=3):
+        assert edit_ops(a, b, band=len(a) + len(b))["distance"] == levenshtein(a, b)